@@ -0,0 +1,252 @@
+"""
+Append-only write-ahead log with compacted snapshots for car bookings.
+
+State lives in ``directory`` as generations: ``snapshot-<n>.json`` holds
+every record at the start of generation n and ``wal-<n>.log`` the JSON-lines
+records appended since; ``CURRENT`` names the live generation. Startup loads
+the snapshot and replays the log. Once a log grows past ``compact_every``
+records, a new generation starts from a fresh snapshot and the old files are
+deleted.
+
+Writes are group-committed: a record is written straight away and
+``sync()`` waits for the next fsync, which covers every record written in
+the meantime, so a burst of bookings costs one fsync instead of one each.
+
+Several worker processes can share a directory. Writers hold an exclusive
+``flock`` while they catch up with records other workers appended, check
+and apply their change and append it; readers catch up under a shared lock
+before answering. Windows has no shared file locks, so there readers take
+the exclusive lock too.
+"""
+import asyncio
+import json
+import os
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DATA_DIR = os.getenv("CAR_BOOKINGS_DATA_DIR")  # unset keeps bookings in memory only
+FSYNC_INTERVAL = float(os.getenv("CAR_BOOKINGS_FSYNC_INTERVAL", 0.005))  # seconds
+COMPACT_EVERY = int(os.getenv("CAR_BOOKINGS_COMPACT_EVERY", 10_000))  # records
+
+
+def lock_file(f, shared: bool = False):
+    """
+    Blocks until this process holds the lock on ``f``.
+    """
+    if fcntl is not None:
+        fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        return
+    f.seek(0)
+    while True:
+        try:
+            # Locks the first byte; gives up with an OSError after ~10 s.
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            pass
+
+
+def unlock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f, fcntl.LOCK_UN)
+        return
+    f.seek(0)
+    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class BookingLog:
+    """
+    Durable record log in front of an in-memory state.
+
+    ``reset`` clears the state, ``apply`` applies one record to it and
+    ``records`` returns records that rebuild it, for snapshots.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        reset: Callable[[], None],
+        apply: Callable[[Dict], None],
+        records: Callable[[], Iterable[Dict]],
+        fsync_interval: float = FSYNC_INTERVAL,
+        compact_every: int = COMPACT_EVERY,
+    ):
+        self.directory = directory
+        self._reset = reset
+        self._apply = apply
+        self._records = records
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = open(os.path.join(directory, "bookings.lock"), "a+")
+        self.generation = -1
+        self._wal = None
+        self._offset = 0  # bytes of the current log already applied
+        self._wal_records = 0
+        self._pending: List[asyncio.Future] = []
+        self._sync_task: Optional[asyncio.Task] = None
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    @contextmanager
+    def _locked(self, shared: bool = False):
+        lock_file(self._lock_file, shared)
+        try:
+            yield
+        finally:
+            unlock_file(self._lock_file)
+
+    def _write_atomically(self, name: str, data: bytes):
+        temp_path = self._path(name + ".tmp")
+        with open(temp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self._path(name))
+        if os.name == "posix":
+            # Makes the rename itself durable; Windows cannot open directories.
+            directory = os.open(self.directory, os.O_RDONLY)
+            try:
+                os.fsync(directory)
+            finally:
+                os.close(directory)
+
+    def _current_generation(self) -> int:
+        try:
+            with open(self._path("CURRENT")) as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return 0
+
+    def _load(self, generation: int):
+        """
+        Rebuilds the state from a generation's snapshot and log.
+        """
+        self._reset()
+        try:
+            with open(self._path(f"snapshot-{generation}.json"), "rb") as f:
+                for record in json.load(f):
+                    self._apply(record)
+        except FileNotFoundError:
+            pass
+        if self._wal is not None:
+            self._wal.close()
+        self._wal = open(self._path(f"wal-{generation}.log"), "ab")
+        self.generation = generation
+        self._offset = 0
+        self._wal_records = 0
+        self._replay()
+
+    def _replay(self):
+        """
+        Applies complete records appended to the log after ``_offset``. A
+        torn last line (a crash mid-write) is left for a later pass.
+        """
+        with open(self._path(f"wal-{self.generation}.log"), "rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            if line:
+                self._apply(json.loads(line))
+                self._wal_records += 1
+        self._offset += end
+
+    def open(self):
+        with self._locked():
+            self._load(self._current_generation())
+            # Nobody else is writing, so a partial last line was torn by a
+            # crash; cut it off before appending after it.
+            self._wal.truncate(self._offset)
+
+    def catch_up(self):
+        """
+        Applies records other workers have written since the last call.
+        """
+        with self._locked(shared=True):
+            self._catch_up()
+
+    def _catch_up(self):
+        generation = self._current_generation()
+        if generation != self.generation:
+            self._load(generation)
+        else:
+            self._replay()
+
+    @contextmanager
+    def writing(self):
+        """
+        Holds the exclusive lock with the state caught up; ``append`` the
+        change's records inside the block.
+        """
+        with self._locked():
+            self._catch_up()
+            yield
+            if self._wal_records >= self.compact_every:
+                self._compact()
+
+    def append(self, record: Dict):
+        """
+        Writes an already applied record to the log. Call inside ``writing``.
+        """
+        line = json.dumps(record, separators=(",", ":")).encode() + b"\n"
+        os.write(self._wal.fileno(), line)
+        self._offset += len(line)
+        self._wal_records += 1
+
+    def _compact(self):
+        """
+        Starts the next generation from a snapshot of the current state.
+        """
+        old = self.generation
+        new = old + 1
+        snapshot = json.dumps(list(self._records()), separators=(",", ":")).encode()
+        self._write_atomically(f"snapshot-{new}.json", snapshot)
+        open(self._path(f"wal-{new}.log"), "ab").close()
+        self._write_atomically("CURRENT", str(new).encode())
+        self._wal.close()
+        self._wal = open(self._path(f"wal-{new}.log"), "ab")
+        self.generation = new
+        self._offset = 0
+        self._wal_records = 0
+        for name in (f"snapshot-{old}.json", f"wal-{old}.log"):
+            try:
+                os.remove(self._path(name))
+            except OSError:
+                # Gone already, or on Windows still open in another worker;
+                # a leftover generation is never read again.
+                pass
+
+    async def sync(self):
+        """
+        Waits until everything appended so far is fsynced. Concurrent
+        callers share a single fsync.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(future)
+        if self._sync_task is None or self._sync_task.done():
+            self._sync_task = asyncio.create_task(self._sync_soon())
+        await future
+
+    async def _sync_soon(self):
+        await asyncio.sleep(self.fsync_interval)
+        while self._pending:
+            waiting, self._pending = self._pending, []
+            try:
+                # On the event loop thread, so compaction cannot swap the file
+                # mid-call; one fsync per batch keeps the pause short.
+                os.fsync(self._wal.fileno())
+            except OSError as e:
+                for future in waiting:
+                    future.set_exception(e)
+                continue
+            for future in waiting:
+                future.set_result(None)
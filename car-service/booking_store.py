@@ -0,0 +1,80 @@
+"""
+In-memory car booking store with indexes by booking and user.
+
+Bookings are kept once, by id; users index them by id in booking order, so
+listing a user's bookings is a slice of that user's list and never scans
+anyone else's. Overlapping dates on the same car are rejected through the
+fleet's ``AvailabilityCalendar``, which also indexes the bookings by car.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from car_availability import AvailabilityCalendar
+
+
+class BookingStore:
+    """
+    Bookings (objects with booking_id, car_id, user_id, start_date,
+    end_date and status) indexed for lookup and listing.
+    """
+
+    def __init__(self, calendar: AvailabilityCalendar):
+        self.calendar = calendar
+        self._by_id: Dict[str, object] = {}
+        self._order: List[str] = []  # every booking id in booking order
+        self._by_user: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def clear(self):
+        """
+        Drops every booking, including their dates on the car calendars.
+        """
+        self._by_id.clear()
+        self._order.clear()
+        self._by_user.clear()
+        self.calendar.clear()
+
+    def all(self) -> list:
+        return [self._by_id[booking_id] for booking_id in self._order]
+
+    def add(self, booking, car_row: Optional[int] = None) -> bool:
+        """
+        Stores a booking. If ``car_row`` (the car's fleet row) is given and
+        the booking is not cancelled, its dates are taken on the car's
+        calendar; returns False, storing nothing, if they overlap another
+        booking of the car.
+        """
+        if car_row is not None and booking.status != 'cancelled':
+            if not self.calendar.reserve(car_row, booking.start_date, booking.end_date, booking.booking_id):
+                return False
+        self._by_id[booking.booking_id] = booking
+        self._order.append(booking.booking_id)
+        self._by_user.setdefault(booking.user_id, []).append(booking.booking_id)
+        return True
+
+    def get(self, booking_id: str):
+        return self._by_id.get(booking_id)
+
+    def cancel(self, booking_id: str, car_row: Optional[int] = None):
+        """
+        Marks a booking cancelled and gives its dates back on the calendar of
+        the car at ``car_row``. Returns the booking, or None if unknown.
+        """
+        booking = self._by_id.get(booking_id)
+        if booking is None:
+            return None
+        if car_row is not None:
+            self.calendar.release(car_row, booking_id)
+        booking.status = 'cancelled'
+        return booking
+
+    def list(self, user_id: Optional[str] = None, cursor: int = 0, limit: int = 20) -> Tuple[list, Optional[int]]:
+        """
+        Returns a page of bookings in booking order, only ``user_id``'s if
+        given, and the cursor of the next page (None on the last page).
+        """
+        ids = self._order if user_id is None else self._by_user.get(user_id, [])
+        page = ids[cursor:cursor + limit]
+        next_cursor = cursor + limit if cursor + limit < len(ids) else None
+        return [self._by_id[booking_id] for booking_id in page], next_cursor
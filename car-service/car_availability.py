@@ -0,0 +1,93 @@
+"""
+Per-car availability calendars.
+
+Each car keeps its booked date ranges sorted by start date. Ranges of the
+same car never overlap, so the only range that can clash with a request is
+the last one starting on or before the request's end date, and checking a
+car is a single binary search however many bookings it has. Dates are
+inclusive: a booking occupies every day from its start to its end date.
+Given the fleet's locations, the calendar also keeps the booked cars of each
+location, so an availability search only looks at cars where it searches.
+"""
+import bisect
+import datetime
+from typing import Dict, List, Optional, Sequence, Set
+
+
+class AvailabilityCalendar:
+    """
+    Booked (start, end) day ranges per fleet row, keyed by booking id.
+    """
+
+    def __init__(self, locations: Optional[Sequence[int]] = None):
+        # fleet row -> parallel lists sorted by start day ordinal
+        self._starts: Dict[int, List[int]] = {}
+        self._ends: Dict[int, List[int]] = {}
+        self._booking_ids: Dict[int, List[str]] = {}
+        # fleet row -> location code, and location code -> booked fleet rows
+        self._locations = locations
+        self._booked_at: Dict[int, Set[int]] = {}
+
+    def clear(self):
+        self._starts.clear()
+        self._ends.clear()
+        self._booking_ids.clear()
+        self._booked_at.clear()
+
+    def booked_cars(self, location: Optional[int] = None) -> List[int]:
+        """
+        Returns the fleet rows that have at least one booking, only those at
+        a location code if one is given and the calendar knows locations.
+        """
+        if location is None or self._locations is None:
+            return list(self._starts)
+        return list(self._booked_at.get(location, ()))
+
+    def _clash(self, car: int, start: int, end: int) -> Optional[int]:
+        """
+        Returns the index of the range overlapping [start, end], or None.
+        """
+        starts = self._starts.get(car)
+        if not starts:
+            return None
+        i = bisect.bisect_right(starts, end) - 1
+        if i >= 0 and self._ends[car][i] >= start:
+            return i
+        return None
+
+    def is_free(self, car: int, start_date: datetime.date, end_date: datetime.date) -> bool:
+        return self._clash(car, start_date.toordinal(), end_date.toordinal()) is None
+
+    def reserve(self, car: int, start_date: datetime.date, end_date: datetime.date, booking_id: str) -> bool:
+        """
+        Books the car for the dates. Returns False, booking nothing, if they
+        overlap an existing booking.
+        """
+        start, end = start_date.toordinal(), end_date.toordinal()
+        if self._clash(car, start, end) is not None:
+            return False
+        if car not in self._starts and self._locations is not None:
+            self._booked_at.setdefault(int(self._locations[car]), set()).add(car)
+        starts = self._starts.setdefault(car, [])
+        i = bisect.bisect_left(starts, start)
+        starts.insert(i, start)
+        self._ends.setdefault(car, []).insert(i, end)
+        self._booking_ids.setdefault(car, []).insert(i, booking_id)
+        return True
+
+    def release(self, car: int, booking_id: str) -> bool:
+        """
+        Removes a booking from the car's calendar.
+        """
+        booking_ids = self._booking_ids.get(car)
+        if not booking_ids or booking_id not in booking_ids:
+            return False
+        i = booking_ids.index(booking_id)
+        for column in (self._starts, self._ends, self._booking_ids):
+            del column[car][i]
+        if not booking_ids:
+            for column in (self._starts, self._ends, self._booking_ids):
+                del column[car]
+            if self._locations is not None:
+                self._booked_at[int(self._locations[car])].discard(car)
+        return True
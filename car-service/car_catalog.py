@@ -0,0 +1,163 @@
+"""
+Flattened car catalog with table-driven, batched attribute generation.
+
+The make/model templates are flattened once into NumPy arrays of small
+integer codes, one row per (type, make, model), and everything that depends
+on the car type (seat counts, price range, fuel) lives in ``TYPE_ATTRIBUTES``.
+Generating cars is then a handful of array operations for the whole batch,
+kept column-wise in a ``CarBatch``; Python objects are only created for the
+cars actually returned.
+"""
+import uuid
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+colors = ['Red', 'Blue', 'Black', 'White', 'Silver', 'Green', 'Gray', 'Yellow']
+transmissions = ['Automatic', 'Manual']
+fuel_types = ['Petrol', 'Diesel', 'Electric', 'Hybrid']
+# Rental locations, by airport code
+locations = ['LAX', 'JFK', 'ORD', 'ATL', 'DFW', 'DEN', 'SFO', 'SEA', 'MIA', 'BOS']
+features = [
+    'Sunroof', 'Leather Seats', 'Bluetooth Connectivity', 'Navigation System',
+    'Backup Camera', 'Blind Spot Monitoring', 'Adaptive Cruise Control',
+    'Air Conditioning', 'Heated Seats', 'Power Windows', 'Rear View Camera',
+    'Panorama Sunroof', 'Sunroof', 'Leather Seats', 'Bluetooth Connectivity',
+    'Navigation System', 'Backup Camera', 'Blind Spot Monitoring',
+]
+
+# car type -> (seat counts to pick from, daily price range, fuel type)
+DEFAULT_ATTRIBUTES = ([4], (20.0, 100.0), 'Petrol')
+TYPE_ATTRIBUTES: Dict[str, Tuple[List[int], Tuple[float, float], str]] = {
+    'Sedan': ([4, 5], (30.0, 150.0), 'Petrol'),
+    'Coupe': ([4, 5], (20.0, 100.0), 'Petrol'),
+    'Sports': ([4, 5], (100.0, 500.0), 'Petrol'),
+    'SUV': ([5, 6, 7, 8], (50.0, 300.0), 'Petrol'),
+    'Truck': ([5, 6, 7, 8], (50.0, 300.0), 'Diesel'),
+    'Van': ([5, 6, 7, 8], (40.0, 200.0), 'Petrol'),
+    'Minivan': ([5, 6, 7, 8], (40.0, 200.0), 'Petrol'),
+    'Luxury': ([4, 5, 6], (100.0, 500.0), 'Petrol'),
+    'Economy': ([4, 5], (30.0, 150.0), 'Petrol'),
+    'Hybrid': ([4, 5], (60.0, 250.0), 'Hybrid'),
+    'Electric': ([4, 5], (60.0, 250.0), 'Electric'),
+}
+
+MAX_SEAT_CHOICES = max(len(seats) for seats, _, _ in TYPE_ATTRIBUTES.values())
+COLORS_PER_CAR = 3
+FEATURES_PER_CAR = 4
+
+
+class CarCatalog:
+    """
+    Every (type, make, model) combination of the templates as flat arrays.
+
+    ``templates`` maps a car type to objects with ``make`` and ``model``
+    (a list of model names), e.g. the service's ``carTemplate`` list.
+    """
+
+    def __init__(self, templates: Dict[str, list]):
+        self.car_types = list(templates)
+        self.makes: List[str] = []
+        self.models: List[str] = []
+
+        type_codes, make_codes, model_codes = [], [], []
+        for type_code, car_type in enumerate(self.car_types):
+            for template in templates[car_type]:
+                make_code = self._code(self.makes, template.make)
+                for model in template.model:
+                    type_codes.append(type_code)
+                    make_codes.append(make_code)
+                    model_codes.append(self._code(self.models, model))
+
+        self.type_code = np.array(type_codes, dtype=np.int8)
+        self.make_code = np.array(make_codes, dtype=np.int16)
+        self.model_code = np.array(model_codes, dtype=np.int16)
+
+        # Per-type attribute tables, indexed by type code
+        attributes = [TYPE_ATTRIBUTES.get(car_type, DEFAULT_ATTRIBUTES) for car_type in self.car_types]
+        self.seat_choices = np.array([seats + [seats[-1]] * (MAX_SEAT_CHOICES - len(seats)) for seats, _, _ in attributes], dtype=np.int8)
+        self.seat_choice_count = np.array([len(seats) for seats, _, _ in attributes], dtype=np.int8)
+        self.price_low = np.array([low for _, (low, _), _ in attributes])
+        self.price_high = np.array([high for _, (_, high), _ in attributes])
+        self.fuel_code = np.array([fuel_types.index(fuel) for _, _, fuel in attributes], dtype=np.int8)
+
+    @staticmethod
+    def _code(table: List[str], value: str) -> int:
+        if value not in table:
+            table.append(value)
+        return table.index(value)
+
+    def __len__(self) -> int:
+        return len(self.type_code)
+
+    def generate_batch(self, rows: np.ndarray, rng: np.random.Generator) -> "CarBatch":
+        """
+        Draws every random attribute for one car per catalog row in batch.
+        """
+        n = len(rows)
+        types = self.type_code[rows]
+        # Distinct colors and features per car: the first columns of a random
+        # permutation of each table.
+        return CarBatch(
+            catalog=self,
+            rows=np.asarray(rows, dtype=np.intp),
+            ids=[str(uuid.UUID(bytes=rng.bytes(16), version=4)) for _ in range(n)],
+            year=rng.integers(2018, 2025, n).astype(np.int16),
+            seats=self.seat_choices[types, (rng.random(n) * self.seat_choice_count[types]).astype(np.intp)],
+            price=np.round(rng.uniform(self.price_low[types], self.price_high[types]), 2),
+            transmission=rng.integers(0, len(transmissions), n).astype(np.int8),
+            rating=np.round(rng.uniform(3.5, 5.0, n), 1),
+            color_order=np.argsort(rng.random((n, len(colors))), axis=1)[:, :COLORS_PER_CAR].astype(np.int8),
+            color_count=rng.integers(1, COLORS_PER_CAR + 1, n).astype(np.int8),
+            feature_order=np.argsort(rng.random((n, len(features))), axis=1)[:, :FEATURES_PER_CAR].astype(np.int8),
+            location=rng.integers(0, len(locations), n).astype(np.int8),
+        )
+
+
+class CarBatch:
+    """
+    Generated cars stored column-wise, one entry per car.
+    """
+
+    def __init__(self, catalog: CarCatalog, rows: np.ndarray, ids: List[str], **columns: np.ndarray):
+        self.catalog = catalog
+        self.rows = rows  # catalog row of each car
+        self.ids = ids
+        self.year = columns['year']
+        self.seats = columns['seats']
+        self.price = columns['price']
+        self.transmission = columns['transmission']
+        self.rating = columns['rating']
+        self.color_order = columns['color_order']
+        self.color_count = columns['color_count']
+        self.feature_order = columns['feature_order']
+        self.location = columns['location']  # home location of each car
+        self.type_code = catalog.type_code[rows]
+        self.make_code = catalog.make_code[rows]
+        self.fuel_code = catalog.fuel_code[self.type_code]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def car_fields(self, i: int) -> Dict:
+        """
+        Builds the ``Car`` fields of a single car, keyed by their JSON names.
+        """
+        catalog = self.catalog
+        row = self.rows[i]
+        return {
+            '_id': self.ids[i],
+            'make': catalog.makes[self.make_code[i]],
+            'model': catalog.models[catalog.model_code[row]],
+            'year': int(self.year[i]),
+            'color': [colors[c] for c in self.color_order[i, :self.color_count[i]]],
+            'seat': int(self.seats[i]),
+            'type': catalog.car_types[self.type_code[i]],
+            'price_per_day': float(self.price[i]),
+            'feature': '• '.join(features[f] for f in self.feature_order[i]),
+            'transmission': transmissions[self.transmission[i]],
+            'fuel_type': fuel_types[self.fuel_code[i]],
+            'rating': float(self.rating[i]),
+            'location': locations[self.location[i]],
+        }
@@ -0,0 +1,181 @@
+"""
+A stable rental fleet with secondary indexes for filtered search.
+
+The fleet is generated once from a fixed seed, so every worker and every
+restart serves the same cars with the same ids. Searches run over
+per-attribute indexes instead of the cars themselves: a price- and a
+rating-sorted order of the fleet, and packed bitmaps (one bit per car) for
+each value of the categorical attributes. A search ANDs the bitmaps it
+needs, narrows the chosen order to the price range by binary search and
+returns the next page of matches from a cursor.
+"""
+import datetime
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from car_availability import AvailabilityCalendar
+from car_catalog import CarBatch, CarCatalog, fuel_types, locations, transmissions
+
+
+FLEET_SIZE = int(os.getenv("CAR_FLEET_SIZE", 2000))
+FLEET_SEED = int(os.getenv("CAR_FLEET_SEED", 2024))
+
+SORT_KEYS = ['price', 'rating']
+
+
+class CarFleet:
+    """
+    The service's cars as a ``CarBatch`` plus search indexes over it.
+    """
+
+    def __init__(self, catalog: CarCatalog, size: int = FLEET_SIZE, seed: int = FLEET_SEED):
+        rng = np.random.default_rng(seed)
+        self.catalog = catalog
+        self.cars: CarBatch = catalog.generate_batch(rng.integers(0, len(catalog), size), rng)
+        self.id_rows: Dict[str, int] = {car_id: i for i, car_id in enumerate(self.cars.ids)}
+        cars = self.cars
+
+        # Cars sorted by each sort key (ties in fleet order), with the key
+        # column in that order for binary search
+        self.orders: Dict[str, np.ndarray] = {
+            'price': np.argsort(cars.price, kind='stable'),
+            'rating': np.argsort(-cars.rating, kind='stable'),
+        }
+        self.sorted_price = cars.price[self.orders['price']]
+
+        # attribute -> value code -> packed bitmap of the cars with that value
+        self.bitmaps: Dict[str, Dict[int, np.ndarray]] = {
+            'type': self._bitmaps(cars.type_code),
+            'make': self._bitmaps(cars.make_code),
+            'seats': self._bitmaps(cars.seats),
+            'fuel': self._bitmaps(cars.fuel_code),
+            'transmission': self._bitmaps(cars.transmission),
+            'location': self._bitmaps(cars.location),
+        }
+        self._empty = np.zeros_like(np.packbits(np.zeros(len(cars), dtype=bool)))
+
+    @staticmethod
+    def _bitmaps(column: np.ndarray) -> Dict[int, np.ndarray]:
+        return {int(value): np.packbits(column == value) for value in np.unique(column)}
+
+    def __len__(self) -> int:
+        return len(self.cars)
+
+    def find(self, car_id: str) -> Optional[int]:
+        return self.id_rows.get(car_id)
+
+    def _bitmap(self, attribute: str, codes: List[int]) -> np.ndarray:
+        """
+        ORs the bitmaps of the given values of an attribute.
+        """
+        bitmap = self._empty
+        for code in codes:
+            bitmap = bitmap | self.bitmaps[attribute].get(code, self._empty)
+        return bitmap
+
+    def search(
+        self,
+        car_type: Optional[str] = None,
+        location: Optional[str] = None,
+        make: Optional[str] = None,
+        min_seats: Optional[int] = None,
+        fuel_type: Optional[str] = None,
+        transmission: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_rating: Optional[float] = None,
+        sort_by: str = 'price',
+        cursor: int = 0,
+        limit: int = 20,
+        candidates: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, Optional[int]]:
+        """
+        Returns up to ``limit`` matching fleet rows in ``sort_by`` order
+        (price ascending or rating descending), starting at position
+        ``cursor`` of that order, and the cursor of the next page (None on
+        the last page). ``candidates`` is an optional boolean mask of cars
+        that may match, e.g. from an availability check.
+        """
+        bitmap = None
+        if car_type is not None:
+            types = [code for code, name in enumerate(self.catalog.car_types) if name == car_type]
+            bitmap = self._and(bitmap, self._bitmap('type', types))
+        if location is not None:
+            codes = [code for code, name in enumerate(locations) if name == location.upper()]
+            bitmap = self._and(bitmap, self._bitmap('location', codes))
+        if make is not None:
+            makes = [code for code, name in enumerate(self.catalog.makes) if name.lower() == make.lower()]
+            bitmap = self._and(bitmap, self._bitmap('make', makes))
+        if min_seats is not None:
+            bitmap = self._and(bitmap, self._bitmap('seats', [seats for seats in self.bitmaps['seats'] if seats >= min_seats]))
+        if fuel_type is not None:
+            bitmap = self._and(bitmap, self._bitmap('fuel', [fuel_types.index(fuel_type)]))
+        if transmission is not None:
+            bitmap = self._and(bitmap, self._bitmap('transmission', [transmissions.index(transmission)]))
+
+        order = self.orders[sort_by]
+        start, end = 0, len(order)
+        if sort_by == 'price':
+            # The price range is a contiguous block of the price order.
+            if min_price is not None:
+                start = int(np.searchsorted(self.sorted_price, min_price, side='left'))
+            if max_price is not None:
+                end = int(np.searchsorted(self.sorted_price, max_price, side='right'))
+        start = max(start, cursor)
+        rows = order[start:end]
+        positions = np.arange(start, max(start, end))
+
+        mask = None if bitmap is None else np.unpackbits(bitmap, count=len(self.cars)).view(bool)[rows]
+        if candidates is not None:
+            mask = self._and(mask, candidates[rows])
+        if sort_by != 'price':
+            if min_price is not None:
+                mask = self._and(mask, self.cars.price[rows] >= min_price)
+            if max_price is not None:
+                mask = self._and(mask, self.cars.price[rows] <= max_price)
+        if min_rating is not None:
+            mask = self._and(mask, self.cars.rating[rows] >= min_rating)
+
+        if mask is not None:
+            rows = rows[mask]
+            positions = positions[mask]
+        if len(rows) <= limit:
+            return rows, None
+        return rows[:limit], int(positions[limit])
+
+    def free_cars(
+        self, calendar: AvailabilityCalendar, start_date: datetime.date, end_date: datetime.date, location: Optional[str] = None
+    ) -> np.ndarray:
+        """
+        Returns a mask of the cars with no booking between the dates, or with
+        a ``location`` only valid for the cars there. Only the booked cars at
+        that location are looked at, with one binary search each.
+        """
+        free = np.ones(len(self.cars), dtype=bool)
+        code = None
+        if location is not None:
+            code = next((code for code, name in enumerate(locations) if name == location.upper()), -1)
+        for car in calendar.booked_cars(code):
+            if not calendar.is_free(car, start_date, end_date):
+                free[car] = False
+        return free
+
+    @staticmethod
+    def _and(mask: Optional[np.ndarray], condition: np.ndarray) -> np.ndarray:
+        return condition if mask is None else mask & condition
+
+    def car_fields(
+        self, rows, calendar: AvailabilityCalendar, start_date: datetime.date, end_date: datetime.date
+    ) -> List[Dict]:
+        """
+        Builds the ``Car`` fields of the given rows, each ``available`` if
+        the car has no booking between the dates.
+        """
+        fields = []
+        for row in rows:
+            car = self.cars.car_fields(int(row))
+            car['available'] = calendar.is_free(int(row), start_date, end_date)
+            fields.append(car)
+        return fields
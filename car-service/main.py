@@ -1,9 +1,10 @@
-from fastapi import FastAPI, HTTPException, Query, Request, Depends
+from fastapi import FastAPI, HTTPException, Query, Request, Response, Depends
 from pydantic import BaseModel, Field
 from typing import List, Literal, Dict, Optional
 import uuid
 import datetime
 import random
+from contextlib import nullcontext
 import uvicorn
 import sys
 import os
@@ -11,6 +12,12 @@ import os
 # Add shared module to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'shared'))
 from redis_rate_limit import rate_limit
+from http_cache import conditional_json_response
+from car_catalog import CarCatalog
+from car_fleet import CarFleet
+from car_availability import AvailabilityCalendar
+from booking_store import BookingStore
+from booking_log import BookingLog, DATA_DIR as BOOKINGS_DATA_DIR
 
 
 app = FastAPI(
@@ -86,56 +93,13 @@ all_cars: Dict[str, List[carTemplate]] = {
 }
 
 
-def getSeatCount(car_type: str) -> int:
-    """
-    Returns the number of seats based on the car type.
-    """
-    if car_type in ['Sedan', 'Coupe', 'Sports']:
-        return random.choice([4, 5])
-    elif car_type in ['SUV', 'Truck', 'Van', 'Minivan']:
-        return random.choice([5, 6, 7, 8])
-    elif car_type in ['Luxury']:
-        return random.choice([4, 5, 6])
-    elif car_type in ['Economy', 'Hybrid', 'Electric']:
-        return random.choice([4, 5])
-    else:
-        return 4  
-def getDailPrice(car_type: str) -> float:
-    """
-    Returns a random daily price based on the car type.
-    """
-    if car_type in ['Sports', 'Luxury']:
-        return round(random.uniform(100.0, 500.0), 2)
-    elif car_type in ['SUV', 'Truck']:
-        return round(random.uniform(50.0, 300.0), 2)
-    elif car_type in ['Sedan', 'Economy']:
-        return round(random.uniform(30.0, 150.0), 2)
-    elif car_type in ['Van', 'Minivan']:
-        return round(random.uniform(40.0, 200.0), 2)
-    elif car_type in ['Hybrid', 'Electric']:
-        return round(random.uniform(60.0, 250.0), 2)
-    else:
-        return round(random.uniform(20.0, 100.0), 2)
-
-def getFuelType(car_type: str) -> Literal['Petrol', 'Diesel', 'Electric', 'Hybrid']:
-    """
-    Returns a random fuel type based on the car type.
-    """
-    if car_type in ['Electric']:
-        return 'Electric'
-    elif car_type in ['Hybrid']:
-        return 'Hybrid'
-    elif car_type in ['Diesel', 'Truck']:
-        return 'Diesel'
-    else:
-        return 'Petrol'  # Default for most cars
-list_of_feautures = [
-    'Sunroof', 'Leather Seats', 'Bluetooth Connectivity', 'Navigation System',
-    'Backup Camera', 'Blind Spot Monitoring', 'Adaptive Cruise Control',
-    'Air Conditioning', 'Heated Seats', 'Power Windows', 'Rear View Camera',
-    'Panorama Sunroof', 'Sunroof', 'Leather Seats', 'Bluetooth Connectivity',
-    'Navigation System', 'Backup Camera', 'Blind Spot Monitoring',
-]
+# Templates flattened into arrays, with per-type seat/price/fuel tables
+car_catalog = CarCatalog(all_cars)
+# The cars for rent, generated once, with search indexes
+car_fleet = CarFleet(car_catalog)
+# Booked dates of each car in the fleet, with the booked cars per location
+car_calendar = AvailabilityCalendar(car_fleet.cars.location)
+
 class Car(BaseModel):
     """
     Represents a car available for booking.
@@ -151,8 +115,9 @@ class Car(BaseModel):
     feature: str
     transmission: Literal['Automatic', 'Manual']
     fuel_type: Literal['Petrol', 'Diesel', 'Electric', 'Hybrid']
-    available: bool = True
+    available: bool = Field(default=True, description="Whether the car is free on the searched dates (today if none)")
     rating: float = Field(default=0.0, ge=0.0, le=5.0, description="Rating of the car from 0 to 5")
+    location: Optional[str] = Field(default=None, description="Airport code of the location the car is rented from")
 
 @app.get('/')
 async def root(request: Request):
@@ -162,78 +127,106 @@ async def root(request: Request):
     await rate_limit(request, limit=10, window=60, service="car-service")
     return {"message": "Welcome to the car availability microservice!"}
 
+class CarSearch:
+    """
+    Query parameters shared by the car search endpoints.
+    """
+
+    def __init__(
+        self,
+        seats: Optional[int] = Query(None, ge=1, le=8, description="Minimum number of seats."),
+        min_price: Optional[float] = Query(None, ge=0, description="Minimum price per day."),
+        max_price: Optional[float] = Query(None, ge=0, description="Maximum price per day."),
+        fuel_type: Optional[Literal['Petrol', 'Diesel', 'Electric', 'Hybrid']] = Query(None, description="Fuel type."),
+        transmission: Optional[Literal['Automatic', 'Manual']] = Query(None, description="Transmission."),
+        make: Optional[str] = Query(None, description="Make, e.g. Toyota (case-insensitive)."),
+        location: Optional[str] = Query(None, description="Rental location airport code, e.g. LAX."),
+        min_rating: Optional[float] = Query(None, ge=0.0, le=5.0, description="Minimum rating."),
+        sort_by: Literal['price', 'rating'] = Query('price', description="Cheapest or best rated first."),
+        limit: int = Query(20, ge=1, le=100, description="Number of cars per page (1-100)."),
+        cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page."),
+    ):
+        self.filters = dict(
+            location=location,
+            make=make,
+            min_seats=seats,
+            fuel_type=fuel_type,
+            transmission=transmission,
+            min_price=min_price,
+            max_price=max_price,
+            min_rating=min_rating,
+            sort_by=sort_by,
+            limit=limit,
+        )
+        self.cursor = cursor
+
+    def run(
+        self,
+        request: Request,
+        car_type: Optional[str] = None,
+        candidates=None,
+        start_date: Optional[datetime.date] = None,
+        end_date: Optional[datetime.date] = None,
+    ):
+        """
+        Searches the fleet and returns one page of cars, with the cursor of
+        the next page in the X-Next-Cursor header. ``candidates`` optionally
+        masks the fleet rows that may be returned. Each car is ``available``
+        if it is free from ``start_date`` to ``end_date`` (today by default).
+        """
+        try:
+            cursor = int(self.cursor) if self.cursor is not None else 0
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        rows, next_cursor = car_fleet.search(car_type=car_type, cursor=max(cursor, 0), candidates=candidates, **self.filters)
+        today = datetime.date.today()
+        fields = car_fleet.car_fields(rows, car_calendar, start_date or today, end_date or today)
+        headers = {} if next_cursor is None else {"X-Next-Cursor": str(next_cursor)}
+        return conditional_json_response(request, fields, headers=headers)
+
 @app.get('/cars', response_model=List[Car])
-async def get_cars(request: Request):
+async def get_cars(request: Request, search: CarSearch = Depends()):
     """
-    Get a list of all available cars.
+    Search the fleet, cheapest first by default. Filters narrow the
+    results; pass the X-Next-Cursor response header back as ``cursor`` to
+    get the next page.
     """
     await rate_limit(request, limit=5, window=60, service="car-service")
-    available_cars: List[Car] = []
-    
-    # Get all car types and their templates
-    for car_type, car_templates in all_cars.items():
-        # Select a few cars from each type
-        selected_templates = random.sample(car_templates, min(3, len(car_templates)))
-        
-        for template in selected_templates:
-            # Pick a random model from the template
-            selected_model = random.choice(template.model)
-            get_feature = random.sample(list_of_feautures, k=4)
-            
-            available_cars.append(Car(
-                id=str(uuid.uuid4()),
-                make=template.make,
-                model=selected_model,
-                year=random.randint(2018, 2024),
-                color=random.sample(['Red', 'Blue', 'Black', 'White', 'Silver', 'Green', 'Gray', 'Yellow'], k=random.randint(1, 3)),
-                seat=getSeatCount(car_type),
-                type=car_type,
-                price_per_day=getDailPrice(car_type),
-                feature='• '.join(get_feature),
-                transmission=random.choice(['Automatic', 'Manual']),
-                fuel_type=getFuelType(car_type),
-                rating=round(random.uniform(3.5, 5.0), 1)
-            ))
-    
-    # Shuffle and limit to reasonable number
-    random.shuffle(available_cars)
-    return available_cars[:20]
+    refresh_bookings()
+    return search.run(request)
+
+@app.get('/cars/available', response_model=List[Car])
+async def get_available_cars(
+    request: Request,
+    start_date: datetime.date = Query(..., description="First day of the rental, YYYY-MM-DD."),
+    end_date: datetime.date = Query(..., description="Last day of the rental, YYYY-MM-DD."),
+    search: CarSearch = Depends(),
+):
+    """
+    Get the cars at ``location`` that are free on every day from
+    ``start_date`` to ``end_date``, with the same filters and pagination as
+    /cars.
+    """
+    await rate_limit(request, limit=5, window=60, service="car-service")
+    if search.filters['location'] is None:
+        raise HTTPException(status_code=400, detail="location is required")
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+    refresh_bookings()
+    return search.run(request, candidates=car_fleet.free_cars(car_calendar, start_date, end_date, search.filters['location']), start_date=start_date, end_date=end_date)
 
 @app.get('/cars/{car_type}', response_model=List[Car])
-async def get_cars_by_type(car_type: str, request: Request):
+async def get_cars_by_type(car_type: str, request: Request, search: CarSearch = Depends()):
     """
-    Get a list of cars of a specific type.
+    Get a list of cars of a specific type, with the same filters and
+    pagination as /cars.
     """
     await rate_limit(request, limit=5, window=60, service="car-service")
 
     if car_type not in all_cars:
         raise HTTPException(status_code=404, detail=f"Car type '{car_type}' not found")
-    
-    available_cars: List[Car] = []
-    car_templates = all_cars[car_type]
-    
-    for template in car_templates:
-        # Create multiple cars for each template with different models
-        for model in template.model[:3]:  # Limit to first 3 models per make
-            get_feature = random.sample(list_of_feautures, k=4)
-            
-            available_cars.append(Car(
-                id=str(uuid.uuid4()),
-                make=template.make,
-                model=model,
-                year=random.randint(2018, 2024),
-                color=random.sample(['Red', 'Blue', 'Black', 'White', 'Silver', 'Green', 'Gray', 'Yellow'], k=random.randint(1, 3)),
-                seat=getSeatCount(car_type),
-                type=car_type,
-                price_per_day=getDailPrice(car_type),
-                feature='• '.join(get_feature),
-                transmission=random.choice(['Automatic', 'Manual']),
-                fuel_type=getFuelType(car_type),
-                rating=round(random.uniform(3.5, 5.0), 1)
-            ))
-    
-    random.shuffle(available_cars)
-    return available_cars
+    refresh_bookings()
+    return search.run(request, car_type)
 
 
 
@@ -246,25 +239,116 @@ class CarBooking(BaseModel):
     end_date: datetime.date
     status: Literal['confirmed', 'pending', 'cancelled'] = 'pending'
 
-# In-memory bookings store (for demo)
-car_bookings: List[CarBooking] = []
+# In-memory bookings, indexed by id, user and car
+booking_store = BookingStore(car_calendar)
+
+def booking_record(booking: CarBooking) -> Dict:
+    return {"op": "add", "booking": booking.model_dump(mode="json", by_alias=True)}
+
+def cancel_record(booking_id: str) -> Dict:
+    return {"op": "cancel", "booking_id": booking_id}
+
+def apply_booking_record(record: Dict):
+    if record["op"] == "cancel":
+        booking = booking_store.get(record["booking_id"])
+        if booking is not None:
+            booking_store.cancel(booking.booking_id, car_fleet.find(booking.car_id))
+        return
+    booking = CarBooking.model_validate(record["booking"])
+    booking_store.add(booking, car_fleet.find(booking.car_id))
+
+# With CAR_BOOKINGS_DATA_DIR set, bookings are also written to a log there,
+# replayed at startup and shared with the other workers using the directory.
+booking_log: Optional[BookingLog] = None
+if BOOKINGS_DATA_DIR:
+    booking_log = BookingLog(
+        BOOKINGS_DATA_DIR,
+        reset=booking_store.clear,
+        apply=apply_booking_record,
+        records=lambda: (booking_record(booking) for booking in booking_store.all()),
+    )
+    booking_log.open()
+    print(f"Loaded {len(booking_store)} car bookings from {BOOKINGS_DATA_DIR}")
+
+def refresh_bookings():
+    """
+    Picks up bookings made by other workers sharing the booking log.
+    """
+    if booking_log is not None:
+        booking_log.catch_up()
 
 @app.post('/bookings', response_model=CarBooking)
 async def create_booking(booking: CarBooking, request: Request):
     """
-    Create a new car booking.
+    Create a new car booking. The car must be in the fleet and free on
+    every day from start_date to end_date.
     """
     await rate_limit(request, limit=5, window=60, service="car-service")
-    car_bookings.append(booking)
+    if booking.end_date < booking.start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+    car = car_fleet.find(booking.car_id)
+    if car is None:
+        raise HTTPException(status_code=404, detail=f"Car {booking.car_id} not found")
+    with booking_log.writing() if booking_log is not None else nullcontext():
+        if booking_store.get(booking.booking_id) is not None:
+            raise HTTPException(status_code=409, detail=f"Booking {booking.booking_id} already exists")
+        if not booking_store.add(booking, car):
+            raise HTTPException(status_code=409, detail=f"Car {booking.car_id} is already booked for those dates")
+        if booking_log is not None:
+            booking_log.append(booking_record(booking))
+    if booking_log is not None:
+        await booking_log.sync()
     return booking
 
 @app.get('/bookings', response_model=List[CarBooking])
-async def get_bookings(request: Request):
+async def get_bookings(
+    request: Request,
+    response: Response,
+    user_id: Optional[str] = Query(None, description="Only this user's bookings."),
+    limit: int = Query(20, ge=1, le=100, description="Number of bookings per page (1-100)."),
+    cursor: int = Query(0, ge=0, description="X-Next-Cursor of the previous page."),
+):
     """
-    Get all car bookings.
+    Get car bookings in booking order, one page at a time; the cursor of
+    the next page is in the X-Next-Cursor header.
     """
     await rate_limit(request, limit=5, window=60, service="car-service")
-    return car_bookings
+    refresh_bookings()
+    bookings, next_cursor = booking_store.list(user_id, cursor, limit)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    return bookings
+
+@app.get('/bookings/{booking_id}', response_model=CarBooking)
+async def get_booking(booking_id: str, request: Request):
+    """
+    Get a single car booking.
+    """
+    await rate_limit(request, limit=5, window=60, service="car-service")
+    refresh_bookings()
+    booking = booking_store.get(booking_id)
+    if booking is None:
+        raise HTTPException(status_code=404, detail=f"Booking {booking_id} not found")
+    return booking
+
+@app.post('/bookings/{booking_id}/cancel', response_model=CarBooking)
+async def cancel_booking(booking_id: str, request: Request):
+    """
+    Cancel a car booking, putting the car back on sale for its dates.
+    """
+    await rate_limit(request, limit=5, window=60, service="car-service")
+    with booking_log.writing() if booking_log is not None else nullcontext():
+        booking = booking_store.get(booking_id)
+        if booking is None:
+            raise HTTPException(status_code=404, detail=f"Booking {booking_id} not found")
+        if booking.status == 'cancelled':
+            return booking
+        booking_store.cancel(booking_id, car_fleet.find(booking.car_id))
+        if booking_log is not None:
+            booking_log.append(cancel_record(booking_id))
+    if booking_log is not None:
+        await booking_log.sync()
+    return booking
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="localhost", port=8010, reload=True)
\ No newline at end of file
@@ -0,0 +1,112 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from booking_log import BookingLog
+
+
+class State:
+    """
+    A list of records standing in for the booking store.
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def log(self, directory, compact_every=1000):
+        return BookingLog(
+            str(directory),
+            reset=self.records.clear,
+            apply=self.records.append,
+            records=lambda: list(self.records),
+            compact_every=compact_every,
+        )
+
+
+def write(log, state, record):
+    with log.writing():
+        state.records.append(record)
+        log.append(record)
+
+
+def test_records_survive_a_restart(tmp_path):
+    state = State()
+    log = state.log(tmp_path)
+    log.open()
+    for n in range(5):
+        write(log, state, {"op": "add", "n": n})
+
+    restarted = State()
+    restarted.log(tmp_path).open()
+    assert restarted.records == [{"op": "add", "n": n} for n in range(5)]
+
+
+def test_compaction_starts_a_new_generation_from_a_snapshot(tmp_path):
+    state = State()
+    log = state.log(tmp_path, compact_every=3)
+    log.open()
+    for n in range(7):
+        write(log, state, {"n": n})
+    assert log.generation == 2
+    assert sorted(os.listdir(tmp_path)) == ["CURRENT", "bookings.lock", "snapshot-2.json", "wal-2.log"]
+    assert json.loads((tmp_path / "snapshot-2.json").read_text()) == [{"n": n} for n in range(6)]
+
+    restarted = State()
+    restarted.log(tmp_path).open()
+    assert restarted.records == [{"n": n} for n in range(7)]
+
+
+def test_a_torn_last_record_is_dropped_on_open(tmp_path):
+    state = State()
+    log = state.log(tmp_path)
+    log.open()
+    write(log, state, {"n": 0})
+    with open(tmp_path / "wal-0.log", "ab") as f:
+        f.write(b'{"n": 1')
+
+    restarted = State()
+    reopened = restarted.log(tmp_path)
+    reopened.open()
+    assert restarted.records == [{"n": 0}]
+    write(reopened, restarted, {"n": 2})
+
+    again = State()
+    again.log(tmp_path).open()
+    assert again.records == [{"n": 0}, {"n": 2}]
+
+
+def test_workers_sharing_a_directory_catch_up(tmp_path):
+    first, second = State(), State()
+    first_log, second_log = first.log(tmp_path, compact_every=4), second.log(tmp_path, compact_every=4)
+    first_log.open()
+    second_log.open()
+
+    write(first_log, first, {"n": 0})
+    second_log.catch_up()
+    assert second.records == [{"n": 0}]
+
+    # Writers catch up before applying their own change.
+    write(second_log, second, {"n": 1})
+    for n in range(2, 6):
+        write(first_log, first, {"n": n})
+    second_log.catch_up()
+    assert first.records == second.records == [{"n": n} for n in range(6)]
+
+
+def test_concurrent_syncs_share_an_fsync(tmp_path, monkeypatch):
+    state = State()
+    log = state.log(tmp_path)
+    log.open()
+    fsyncs = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(os, "fsync", lambda fd: (fsyncs.append(fd), real_fsync(fd)))
+
+    async def burst():
+        for n in range(10):
+            write(log, state, {"n": n})
+        await asyncio.gather(*(log.sync() for _ in range(10)))
+
+    asyncio.run(burst())
+    assert len(fsyncs) == 1
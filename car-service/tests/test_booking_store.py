@@ -0,0 +1,67 @@
+import datetime
+from types import SimpleNamespace
+
+from booking_store import BookingStore
+from car_availability import AvailabilityCalendar
+
+
+DAY = datetime.date(2030, 5, 17)
+
+
+def booking(booking_id, car_id="car-1", user_id="u1", start=0, end=2, status="confirmed"):
+    return SimpleNamespace(
+        booking_id=booking_id,
+        car_id=car_id,
+        user_id=user_id,
+        start_date=DAY + datetime.timedelta(days=start),
+        end_date=DAY + datetime.timedelta(days=end),
+        status=status,
+    )
+
+
+def test_overlapping_bookings_of_a_car_are_rejected():
+    store = BookingStore(AvailabilityCalendar())
+    assert store.add(booking("a"), car_row=1)
+    assert not store.add(booking("b", start=2, end=3), car_row=1)
+    assert store.get("b") is None
+    assert store.add(booking("c", car_id="car-2", start=2, end=3), car_row=2)
+    assert store.add(booking("d", start=3, end=4), car_row=1)
+    assert len(store) == 3
+
+
+def test_cancelled_bookings_hold_no_dates():
+    store = BookingStore(AvailabilityCalendar())
+    assert store.add(booking("a", status="cancelled"), car_row=1)
+    assert store.add(booking("b"), car_row=1)
+
+    cancelled = store.cancel("b", car_row=1)
+    assert cancelled.status == "cancelled"
+    assert store.calendar.is_free(1, DAY, DAY)
+    assert store.add(booking("c"), car_row=1)
+    assert store.cancel("missing") is None
+
+
+def test_listing_pages_through_a_users_bookings_in_order():
+    store = BookingStore(AvailabilityCalendar())
+    for n in range(25):
+        store.add(booking(str(n), car_id=f"car-{n}", user_id="u1" if n % 2 else "u2"))
+
+    page, cursor = store.list("u1", 0, 10)
+    assert [b.booking_id for b in page] == [str(n) for n in range(1, 20, 2)]
+    assert cursor == 10
+    page, cursor = store.list("u1", cursor, 10)
+    assert [b.booking_id for b in page] == [str(n) for n in range(21, 25, 2)]
+    assert cursor is None
+
+    assert [b.booking_id for b in store.list(None, 20, 10)[0]] == [str(n) for n in range(20, 25)]
+    assert store.list("nobody") == ([], None)
+    assert [b.booking_id for b in store.all()] == [str(n) for n in range(25)]
+
+
+def test_clear_drops_bookings_and_their_dates():
+    store = BookingStore(AvailabilityCalendar())
+    store.add(booking("a"), car_row=1)
+    store.clear()
+    assert len(store) == 0
+    assert store.get("a") is None
+    assert store.calendar.booked_cars() == []
@@ -0,0 +1,72 @@
+import datetime
+import random
+
+from car_availability import AvailabilityCalendar
+
+
+DAY = datetime.date(2030, 5, 17)
+
+
+def days(start, end):
+    return DAY + datetime.timedelta(days=start), DAY + datetime.timedelta(days=end)
+
+
+def test_dates_are_inclusive():
+    calendar = AvailabilityCalendar()
+    assert calendar.reserve(7, *days(0, 2), "a")
+    assert not calendar.is_free(7, *days(2, 4))
+    assert not calendar.reserve(7, *days(-3, 0), "b")
+    assert calendar.reserve(7, *days(3, 4), "c")
+    assert calendar.reserve(7, *days(-3, -1), "d")
+    assert calendar.is_free(8, *days(0, 2))
+    assert sorted(calendar.booked_cars()) == [7]
+
+
+def test_release_frees_the_dates():
+    calendar = AvailabilityCalendar()
+    calendar.reserve(7, *days(0, 2), "a")
+    calendar.reserve(7, *days(5, 6), "b")
+    assert calendar.release(7, "a")
+    assert not calendar.release(7, "a")
+    assert not calendar.release(8, "b")
+    assert calendar.is_free(7, *days(0, 4))
+    assert calendar.release(7, "b")
+    assert calendar.booked_cars() == []
+
+
+def test_booked_cars_are_kept_per_location():
+    calendar = AvailabilityCalendar(locations=[0, 1, 0, 2])
+    calendar.reserve(0, *days(0, 1), "a")
+    calendar.reserve(0, *days(3, 4), "b")
+    calendar.reserve(1, *days(0, 1), "c")
+    calendar.reserve(2, *days(0, 1), "d")
+    assert sorted(calendar.booked_cars(0)) == [0, 2]
+    assert calendar.booked_cars(1) == [1]
+    assert calendar.booked_cars(2) == []
+    calendar.release(0, "a")
+    assert sorted(calendar.booked_cars(0)) == [0, 2]
+    calendar.release(0, "b")
+    assert calendar.booked_cars(0) == [2]
+    assert sorted(calendar.booked_cars()) == [1, 2]
+
+
+def test_matches_brute_force_over_random_bookings():
+    rng = random.Random(43)
+    calendar = AvailabilityCalendar()
+    booked = {car: [] for car in range(5)}  # car -> [(start, end, id)]
+
+    for n in range(2000):
+        car = rng.randrange(5)
+        start = rng.randrange(0, 200)
+        end = start + rng.randrange(0, 10)
+        clash = any(s <= end and start <= e for s, e, _ in booked[car])
+        assert calendar.is_free(car, *days(start, end)) == (not clash)
+
+        action = rng.random()
+        if action < 0.6:
+            assert calendar.reserve(car, *days(start, end), str(n)) == (not clash)
+            if not clash:
+                booked[car].append((start, end, str(n)))
+        elif action < 0.8 and booked[car]:
+            _, _, booking_id = booked[car].pop(rng.randrange(len(booked[car])))
+            assert calendar.release(car, booking_id)
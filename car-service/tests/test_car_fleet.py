@@ -0,0 +1,106 @@
+import datetime
+import random
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from car_availability import AvailabilityCalendar
+from car_catalog import CarCatalog, fuel_types, locations, transmissions
+from car_fleet import CarFleet
+
+
+DAY = datetime.date(2030, 5, 17)
+TEMPLATES = {
+    'Sedan': [SimpleNamespace(make='Honda', model=['Civic', 'Accord']), SimpleNamespace(make='Toyota', model=['Camry'])],
+    'SUV': [SimpleNamespace(make='Tesla', model=['Model X']), SimpleNamespace(make='Toyota', model=['RAV4'])],
+    'Electric': [SimpleNamespace(make='Tesla', model=['Model 3']), SimpleNamespace(make='Nissan', model=['Leaf'])],
+    'Truck': [SimpleNamespace(make='Ford', model=['F-150'])],
+}
+
+
+@pytest.fixture(scope="module")
+def fleet():
+    return CarFleet(CarCatalog(TEMPLATES), size=500, seed=7)
+
+
+def test_fleet_is_stable_for_a_seed(fleet):
+    again = CarFleet(CarCatalog(TEMPLATES), size=500, seed=7)
+    assert again.cars.ids == fleet.cars.ids
+    assert all(fleet.find(car_id) == row for row, car_id in enumerate(fleet.cars.ids))
+    assert fleet.find("missing") is None
+
+
+def matches(fleet, row, filters, candidates):
+    cars, catalog = fleet.cars, fleet.catalog
+    if candidates is not None and not candidates[row]:
+        return False
+    checks = {
+        'car_type': lambda v: catalog.car_types[cars.type_code[row]] == v,
+        'location': lambda v: locations[cars.location[row]] == v,
+        'make': lambda v: catalog.makes[cars.make_code[row]].lower() == v.lower(),
+        'min_seats': lambda v: cars.seats[row] >= v,
+        'fuel_type': lambda v: fuel_types[cars.fuel_code[row]] == v,
+        'transmission': lambda v: transmissions[cars.transmission[row]] == v,
+        'min_price': lambda v: cars.price[row] >= v,
+        'max_price': lambda v: cars.price[row] <= v,
+        'min_rating': lambda v: cars.rating[row] >= v,
+    }
+    return all(checks[name](value) for name, value in filters.items())
+
+
+def test_search_matches_brute_force_filter(fleet):
+    rng = random.Random(44)
+    options = {
+        'car_type': list(TEMPLATES) + ['Van'],
+        'location': locations,
+        'make': ['tesla', 'Toyota', 'Ford', 'Fiat'],
+        'min_seats': [4, 5, 6, 8],
+        'fuel_type': fuel_types,
+        'transmission': transmissions,
+        'min_price': [40.0, 100.0],
+        'max_price': [80.0, 200.0],
+        'min_rating': [4.0, 4.5],
+    }
+    for _ in range(300):
+        filters = {name: rng.choice(values) for name, values in options.items() if rng.random() < 0.3}
+        sort_by = rng.choice(['price', 'rating'])
+        candidates = np.array([rng.random() < 0.7 for _ in range(len(fleet))]) if rng.random() < 0.3 else None
+        limit = rng.randint(1, 30)
+
+        if sort_by == 'price':
+            order = sorted(range(len(fleet)), key=lambda row: fleet.cars.price[row])
+        else:
+            order = sorted(range(len(fleet)), key=lambda row: -fleet.cars.rating[row])
+        expected = [row for row in order if matches(fleet, row, filters, candidates)]
+
+        found, cursor = [], 0
+        while cursor is not None:
+            rows, cursor = fleet.search(sort_by=sort_by, cursor=cursor, limit=limit, candidates=candidates, **filters)
+            assert len(rows) <= limit
+            found.extend(rows.tolist())
+        assert found == expected
+
+
+def test_free_cars_and_availability_follow_the_calendar(fleet):
+    calendar = AvailabilityCalendar()
+    calendar.reserve(3, DAY, DAY + datetime.timedelta(days=2), "a")
+    calendar.reserve(9, DAY + datetime.timedelta(days=5), DAY + datetime.timedelta(days=6), "b")
+
+    free = fleet.free_cars(calendar, DAY + datetime.timedelta(days=1), DAY + datetime.timedelta(days=5))
+    assert not free[3] and not free[9]
+    assert free.sum() == len(fleet) - 2
+
+    # With a location, only the cars there are checked.
+    calendar = AvailabilityCalendar(fleet.cars.location)
+    calendar.reserve(3, DAY, DAY + datetime.timedelta(days=2), "a")
+    calendar.reserve(9, DAY + datetime.timedelta(days=5), DAY + datetime.timedelta(days=6), "b")
+    location = locations[fleet.cars.location[3]]
+    free = fleet.free_cars(calendar, DAY + datetime.timedelta(days=1), DAY + datetime.timedelta(days=5), location.lower())
+    assert not free[3]
+    assert free[9] == (fleet.cars.location[9] != fleet.cars.location[3])
+    assert fleet.free_cars(calendar, DAY, DAY, "Nowhere").all()
+
+    fields = fleet.car_fields([3, 9, 10], calendar, DAY, DAY)
+    assert [car['available'] for car in fields] == [False, True, True]
+    assert fields[0]['_id'] == fleet.cars.ids[3]
@@ -11,9 +11,11 @@ from dotenv import load_dotenv
 from contextlib import contextmanager
 import json
 import sys
+import redis
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'shared'))
 
 from redis_rate_limit import rate_limit
+from seat_inventory import seat_inventory
 
 
 load_dotenv() #loading env variables
@@ -141,6 +143,7 @@ class StopDetail(BaseModel):
     arrivalTime: datetime.datetime = Field(default_factory=lambda: datetime.datetime(2025, 7, 15, 10, 30, 0), description="Arrival time at stop")
     departureTime: datetime.datetime = Field(default_factory=lambda: datetime.datetime(2025, 7, 15, 11, 30, 0), description="Departure time from stop")
     layoverDuration: str = Field(default="1h 0m", description="Layover duration")
+    layoverMinutes: int = Field(default=60, description="Layover duration in minutes")
 
 class Flight(BaseModel):
     """
@@ -153,6 +156,7 @@ class Flight(BaseModel):
     departureTime: datetime.datetime = Field(default_factory=lambda: datetime.datetime(2025, 7, 15, 8, 0, 0), description="Departure time")
     arrivalTime: datetime.datetime = Field(default_factory=lambda: datetime.datetime(2025, 7, 15, 14, 30, 0), description="Arrival time")
     duration: str = Field(default="6h 30m", description="Flight duration")
+    durationMinutes: int = Field(default=390, description="Flight duration in minutes")
     numberOfStops: int = Field(default=1, description="Number of stops")
     stops: List[StopDetail] = Field(default=[], description="List of stops")
     status: Literal['On Time', 'Delayed', 'Cancelled'] = Field(default='On Time', description="Flight status")
@@ -264,6 +268,7 @@ async def book_flight(
     request: Request,
     flight: Flight,
     trip_id: Optional[str] = None,
+    hold_id: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -273,6 +278,13 @@ async def book_flight(
     Headers:
         Authorization: Bearer <jwt_token>
     
+    Query parameters:
+        hold_id: Seat hold from flight-service POST /flights/holds to confirm,
+                 charged at the fare the hold was taken at. Without one, a
+                 single seat is taken directly from inventory at the fare
+                 flight-service last offered. Flights flight-service never
+                 returned are not on sale.
+    
     Returns booking confirmation with user and flight details.
     """
     await rate_limit(request, limit=5, window=60, service="flight-booking")
@@ -297,6 +309,49 @@ async def book_flight(
         flight_cursor = flight_conn.cursor()
         bookings_cursor = bookings_conn.cursor()
         
+        # Take the seats before saving so concurrent checkouts can't oversell,
+        # at the fare flight-service offered rather than the posted one
+        departure_date = flight.departureTime.date().isoformat()
+        number_of_seats = 1
+        seats_taken = False
+        try:
+            if hold_id:
+                hold = seat_inventory.get_hold(hold_id)
+                if (hold is None
+                        or hold['departureDate'] != departure_date
+                        or hold['flightNumber'] != flight.flightNumber
+                        or hold['seatClass'] != flight.choosenSeat):
+                    raise HTTPException(
+                        status_code=status.HTTP_409_CONFLICT,
+                        detail="Seat hold not found or does not match the flight"
+                    )
+                if seat_inventory.confirm(hold_id) is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_409_CONFLICT,
+                        detail="Seat hold has expired or was already used"
+                    )
+                number_of_seats = hold['quantity']
+                seat_price = hold['price']
+            else:
+                seat_price = seat_inventory.reserve(departure_date, flight.flightNumber, flight.choosenSeat)
+                if seat_price is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_409_CONFLICT,
+                        detail=f"No {flight.choosenSeat} seats left on flight {flight.flightNumber}"
+                    )
+            seats_taken = True
+        except KeyError:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Flight {flight.flightNumber} on {departure_date} is not on sale; fetch it from flight-service first"
+            )
+        except redis.RedisError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Seat inventory is unavailable"
+            )
+        flight.prices[flight.choosenSeat] = seat_price
+        
         # Save the booking to database using two-phase commit
         try:
             # Create a shorter booking reference using just first 8 chars of UUID
@@ -337,8 +392,8 @@ async def book_flight(
             """, (
                 current_user["user_id"],
                 "00000000-0000-0000-0000-000000000000",  # Placeholder inventory ID
-                1,  # Default 1 seat
-                flight.prices[flight.choosenSeat],  # Price for chosen seat class
+                number_of_seats,
+                seat_price,  # Price for chosen seat class
                 json.dumps(flight_data),  # Convert flight object to JSON with proper datetime handling
                 trip_id if trip_id else None  
             ))
@@ -367,7 +422,7 @@ async def book_flight(
                 "00000000-0000-0000-0000-000000000000",  # Placeholder for payment ID
                 current_user["user_id"],
                 "Flight",
-                flight.prices[flight.choosenSeat],
+                seat_price * number_of_seats,
                 trip_id if trip_id else None,
                 flight.airline,
                 flight.departureAirport
@@ -383,6 +438,12 @@ async def book_flight(
                 flight_conn.rollback()
             if bookings_conn:
                 bookings_conn.rollback()
+            # Put the seats back on sale since the booking wasn't saved
+            if seats_taken:
+                try:
+                    seat_inventory.give_back(departure_date, flight.flightNumber, flight.choosenSeat, number_of_seats)
+                except redis.RedisError as e:
+                    print(f"Could not give back {number_of_seats} seat(s) on {flight.flightNumber}: {e}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Database error: {str(db_error)}"
@@ -0,0 +1,68 @@
+"""
+Per-flight serialization cost of a search response, before and after the
+trusted construction path.
+
+validated:   Flight(**fields), then FastAPI's response_model handling (dump
+             to dicts, validate against List[Flight], serialize, json.dumps)
+constructed: Flight.model_construct + fast_json.dumps, for code that needs
+             Flight objects (round trips, itineraries)
+fields:      the generated fields encoded directly with fast_json.dumps, as
+             the search endpoints do
+
+Usage: python benchmark_serialization.py [flights] [repeats]
+"""
+import datetime
+import json
+import sys
+import time
+from typing import List
+
+from pydantic import TypeAdapter
+
+import main
+from fast_json import dumps, orjson
+from flight_schedule import generate_schedule, materialize_rows
+
+
+def validated(fields) -> bytes:
+    flights = [main.Flight(**kwargs) for kwargs in fields]
+    adapter = TypeAdapter(List[main.Flight])
+    content = adapter.validate_python([flight.model_dump(by_alias=True) for flight in flights])
+    return json.dumps(
+        adapter.dump_python(content, mode="json", by_alias=True),
+        ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def constructed(fields) -> bytes:
+    return dumps([main.construct_flight(kwargs) for kwargs in fields])
+
+
+def plain(fields) -> bytes:
+    return dumps(fields)
+
+
+def bench(label, func, fields, repeats) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(fields)
+        best = min(best, time.perf_counter() - start)
+    per_item = best / len(fields) * 1e6
+    print(f"{label:<12} {per_item:8.1f} us/flight")
+    return per_item
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    schedule = generate_schedule(datetime.date.today(), count, seed=1)
+    fields = materialize_rows(schedule, range(count))
+
+    expected = json.loads(validated(fields))
+    assert json.loads(constructed(fields)) == expected and json.loads(plain(fields)) == expected, "paths produce different JSON"
+    print(f"{count} flights, best of {repeats}, encoder: {'orjson' if orjson else 'json'}")
+    before = bench("validated", validated, fields, repeats)
+    for label, func in [("constructed", constructed), ("fields", plain)]:
+        after = bench(label, func, fields, repeats)
+        print(f"{'':<12} {before / after:8.1f}x faster")
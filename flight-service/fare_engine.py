@@ -0,0 +1,121 @@
+"""
+Yield-management repricing of the flight inventory.
+
+A scheduled batch job recomputes every fare in the repricing window from the
+generated base fare, how full the flight is, how soon it departs and how often
+its route has been searched since the last run. The result is published to
+the inventory as a new price table version in a single reference swap, so the
+search path never waits on repricing and never sees a half-updated table.
+Only the fares are recomputed and held per worker, a (flights, classes) array
+per day; the schedule rows stay the shared, memory-mapped snapshots.
+"""
+import datetime
+import math
+import os
+import threading
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from flight_inventory import DayInventory, FlightInventory
+from flight_schedule import airport_codes, flight_classes
+
+
+REPRICE_INTERVAL = int(os.getenv("REPRICE_INTERVAL", 300))  # seconds between runs
+REPRICE_DAYS = int(os.getenv("REPRICE_DAYS", 30))  # departure dates repriced, from today
+
+# Seats per class when a flight is empty; matches the generator's upper bounds
+SEAT_CAPACITY = np.array([100, 30, 10])
+
+
+class FareEngine:
+    """
+    Reprices the inventory in batch and publishes versioned price tables.
+    """
+
+    def __init__(self, inventory: FlightInventory, seat_inventory=None):
+        self.inventory = inventory
+        self.seat_inventory = seat_inventory
+        self.version = 0
+        self.last_run: Optional[datetime.datetime] = None
+        self._searches: Counter = Counter()
+        self._lock = threading.Lock()  # guards _searches; held only briefly
+        self._run_lock = threading.Lock()  # one run at a time
+
+    def record_search(self, departure_date: datetime.date, origin: int, destination: int):
+        """
+        Counts a route search as a demand signal for the next run.
+        """
+        with self._lock:
+            self._searches[(departure_date, origin, destination)] += 1
+
+    def _remaining_seats(self, day: DayInventory) -> np.ndarray:
+        """
+        Seats left per flight and class, using live counts where they exist,
+        read for the day's flight numbers in one round trip.
+        """
+        remaining = day.schedule.data['seats'].astype(np.float64)
+        if self.seat_inventory is None:
+            return remaining
+        flight_numbers = [day.schedule.flight_number(row) for row in range(len(remaining))]
+        live = self.seat_inventory.get_many(day.schedule.departure_date.isoformat(), flight_numbers)
+        for row, seats in enumerate(live):
+            if seats:
+                remaining[row] = [seats.get(c, remaining[row, i]) for i, c in enumerate(flight_classes)]
+        return remaining
+
+    def reprice_day(self, day: DayInventory, today: datetime.date, demand: Dict[Tuple[int, int], int]) -> DayInventory:
+        """
+        Returns ``day`` with every fare recomputed in one pass, sharing its rows.
+        """
+        data = day.schedule.data
+        base = day.schedule.prices
+
+        # Fuller flights get more expensive, steeply as the last seats go.
+        load_factor = np.clip(1.0 - self._remaining_seats(day) / SEAT_CAPACITY, 0.0, 1.0)
+        scarcity = 1.0 + 0.8 * load_factor ** 2
+
+        # Late bookings pay more; the premium fades over about a week.
+        days_out = max((day.schedule.departure_date - today).days, 0)
+        urgency = 1.0 + 0.5 * math.exp(-days_out / 7)
+
+        # Routes searched more than average get up to 30% dearer, less than
+        # average down to 10% cheaper.
+        n_airports = len(airport_codes)
+        route_searches = np.zeros(n_airports * n_airports)
+        for (origin, destination), count in demand.items():
+            route_searches[origin * n_airports + destination] = count
+        mean_searches = route_searches.mean()
+        if mean_searches > 0:
+            route_demand = np.clip(1.0 + 0.1 * np.log(np.maximum(route_searches, 1) / mean_searches), 0.9, 1.3)
+        else:
+            route_demand = np.ones_like(route_searches)
+        flight_demand = route_demand[data['origin'].astype(np.intp) * n_airports + data['destination']]
+
+        prices = base * scarcity * urgency * flight_demand[:, None]
+        return day.repriced(np.round(np.clip(prices, 0.5 * base, 3.0 * base), 2))
+
+    def reprice(self, today: Optional[datetime.date] = None) -> int:
+        """
+        Reprices the next REPRICE_DAYS departure dates and publishes them as a
+        new price table. Returns the new version.
+        """
+        today = today or datetime.date.today()
+        with self._run_lock:
+            with self._lock:
+                searches, self._searches = self._searches, Counter()
+            demand: Dict[datetime.date, Dict[Tuple[int, int], int]] = {}
+            for (departure_date, origin, destination), count in searches.items():
+                demand.setdefault(departure_date, {})[(origin, destination)] = count
+
+            days = {}
+            for offset in range(REPRICE_DAYS):
+                departure_date = today + datetime.timedelta(days=offset)
+                base_day = self.inventory.base_day(departure_date)
+                days[departure_date] = self.reprice_day(base_day, today, demand.get(departure_date, {}))
+
+            self.version += 1
+            self.inventory.publish_prices(self.version, days)
+            self.last_run = datetime.datetime.now()
+            return self.version
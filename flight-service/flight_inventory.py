@@ -0,0 +1,499 @@
+"""
+In-memory flight inventory with per-route sorted indexes.
+
+Each departure date gets one deterministic ``FlightSchedule`` plus, for every
+(origin, destination) pair, row orderings pre-sorted by each supported sort
+key. A route search is then a dictionary lookup, an optional vectorized
+filter over that route's rows and a slice.
+"""
+import calendar
+import datetime
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from flight_schedule import FlightSchedule, airline_prefixes, airport_codes, flight_classes, generate_schedule, statuses
+from flight_snapshot import SnapshotStore
+
+
+FLIGHTS_PER_DAY = int(os.getenv("FLIGHTS_PER_DAY", 2000))
+MAX_CACHED_DAYS = int(os.getenv("MAX_CACHED_DAYS", 60))
+MAX_CACHED_CALENDARS = int(os.getenv("MAX_CACHED_CALENDARS", 512))
+WARMUP_DAYS = int(os.getenv("WARMUP_DAYS", 14))  # upcoming dates kept in memory
+WARMUP_INTERVAL = int(os.getenv("WARMUP_INTERVAL", 60))  # seconds between warm-up passes
+# Upcoming dates written as snapshots; should cover WARMUP_DAYS and REPRICE_DAYS.
+# Dates further out are built in memory only, so odd requests cannot fill the disk.
+SNAPSHOT_DAYS = int(os.getenv("SNAPSHOT_DAYS", 30))
+
+SORT_KEYS = ['price', 'departure', 'duration', 'stops']
+
+# Live state of some of a day's flights: called with the departure date and
+# flight numbers, returns each flight's seats left per class and its status,
+# each None where the generated value still holds.
+LiveState = Callable[[datetime.date, List[str]], Tuple[List[Optional[Dict[str, int]]], List[Optional[str]]]]
+
+
+def overlay_live(seats: np.ndarray, cancelled: np.ndarray, live_seats: List[Optional[Dict[str, int]]], live_statuses: List[Optional[str]]):
+    """
+    Updates a (flights, classes) seat array and a cancelled flag array in
+    place with the live state of the same flights.
+    """
+    for i, counts in enumerate(live_seats):
+        if counts:
+            seats[i] = [counts.get(c, seats[i, k]) for k, c in enumerate(flight_classes)]
+    for i, status in enumerate(live_statuses):
+        if status is not None:
+            cancelled[i] = status == 'Cancelled'
+
+
+def _sort_metrics(schedule: FlightSchedule, fares_only: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Returns the column each index is sorted by, keyed by index name; with
+    ``fares_only`` just the fare indexes.
+    """
+    data = schedule.data
+    metrics = {} if fares_only else {
+        'departure': data['departure_minute'],
+        'duration': data['duration_minutes'],
+        'stops': data['number_of_stops'],
+    }
+    for i, seat_class in enumerate(flight_classes):
+        metrics[f'price:{seat_class}'] = schedule.prices[:, i]
+    return metrics
+
+
+class DayInventory:
+    """
+    A day's schedule with route-keyed sorted indexes over its rows.
+    """
+
+    def __init__(self, schedule: FlightSchedule, base: Optional["DayInventory"] = None):
+        self.schedule = schedule
+        data = schedule.data
+        n_airports = len(airport_codes)
+        route_keys = data['origin'].astype(np.int32) * n_airports + data['destination']
+
+        if base is None:
+            # (airline, flight number) -> row; flight numbers are unique per day
+            self.flight_rows: Dict[int, int] = dict(zip(
+                self._flight_key(data['airline'].astype(np.int64), data['flight_number']).tolist(),
+                range(len(data))
+            ))
+            # index name -> rows of the whole day in sorted order
+            self.day_orders: Dict[str, np.ndarray] = {}
+            # (origin, destination) -> index name -> rows of that route in sorted order
+            self.routes: Dict[Tuple[int, int], Dict[str, np.ndarray]] = {}
+        else:
+            # Same rows at other fares: only the fare indexes need rebuilding.
+            self.flight_rows = base.flight_rows
+            self.day_orders = dict(base.day_orders)
+            self.routes = {route: dict(orders) for route, orders in base.routes.items()}
+
+        for name, metric in _sort_metrics(schedule, fares_only=base is not None).items():
+            tiebreak = data['departure_minute']
+            self.day_orders[name] = np.lexsort((tiebreak, metric))
+
+            # Sorting by (route, metric) lays every route out as a contiguous,
+            # already sorted block; each block is stored as a view.
+            order = np.lexsort((tiebreak, metric, route_keys))
+            sorted_keys = route_keys[order]
+            boundaries = np.flatnonzero(np.diff(sorted_keys)) + 1
+            starts = np.concatenate(([0], boundaries))
+            ends = np.concatenate((boundaries, [len(order)]))
+            for start, end in zip(starts, ends):
+                if start == end:
+                    continue
+                origin, destination = divmod(int(sorted_keys[start]), n_airports)
+                self.routes.setdefault((origin, destination), {})[name] = order[start:end]
+
+    def repriced(self, prices: np.ndarray) -> "DayInventory":
+        """
+        Returns this day sold at ``prices``. The schedule rows (and with them
+        the snapshot mapping) and the indexes that don't depend on fares are
+        shared, not copied.
+        """
+        return DayInventory(self.schedule.repriced(prices), base=self)
+
+    @staticmethod
+    def _flight_key(airline, number):
+        return airline * 10_000_000 + number
+
+    def find_flight(self, flight_number: str) -> Optional[int]:
+        """
+        Returns the schedule row of a flight number, or None.
+        """
+        prefix, number = flight_number[:2].upper(), flight_number[2:]
+        if prefix not in airline_prefixes or not number.isdigit():
+            return None
+        return self.flight_rows.get(self._flight_key(airline_prefixes.index(prefix), int(number)))
+
+    def availability(self, rows: np.ndarray, live: Optional[LiveState] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the seats left per class and whether each flight is cancelled
+        for the given rows, with their ``live`` state laid over the generated
+        values.
+        """
+        data = self.schedule.data
+        seats = data['seats'][rows]
+        cancelled = data['status'][rows] == statuses.index('Cancelled')
+        if live is not None and len(rows):
+            flight_numbers = [self.schedule.flight_number(row) for row in rows.tolist()]
+            overlay_live(seats, cancelled, *live(self.schedule.departure_date, flight_numbers))
+        return seats, cancelled
+
+    def candidates(
+        self,
+        origin: Optional[int] = None,
+        destination: Optional[int] = None,
+        sort_by: str = 'departure',
+        seat_class: str = 'Economy',
+    ) -> Tuple[np.ndarray, bool]:
+        """
+        Returns the rows a search starts from, in sort order: a route's index
+        when both airports are given, else the whole day's. The flag says
+        whether they are already restricted to the route.
+        """
+        index_name = f'price:{seat_class}' if sort_by == 'price' else sort_by
+        if origin is not None and destination is not None:
+            route = self.routes.get((origin, destination))
+            if route is None:
+                return np.empty(0, dtype=np.intp), True
+            return route[index_name], True
+        return self.day_orders[index_name], False
+
+    def search(
+        self,
+        origin: Optional[int] = None,
+        destination: Optional[int] = None,
+        sort_by: str = 'departure',
+        seat_class: str = 'Economy',
+        limit: Optional[int] = 20,
+        live: Optional[LiveState] = None,
+        **filters,
+    ) -> np.ndarray:
+        """
+        Returns up to ``limit`` schedule rows matching the filters, in sort
+        order. ``filters`` are the keyword arguments of ``match_filters``;
+        with ``available_only`` flights are judged by their ``live`` state
+        when given.
+        """
+        rows, route_filtered = self.candidates(origin, destination, sort_by, seat_class)
+        data = self.schedule.data
+        mask = match_filters(
+            column=lambda name: data[name][rows],
+            fares=lambda: self.schedule.prices[rows, flight_classes.index(seat_class)],
+            availability=lambda: self.availability(rows, live),
+            origin=None if route_filtered else origin,
+            destination=None if route_filtered else destination,
+            seat_class=seat_class,
+            **filters,
+        )
+        if mask is not None:
+            rows = rows[mask]
+        return rows[:limit]
+
+
+def match_filters(
+    column: Callable[[str], np.ndarray],
+    fares: Callable[[], np.ndarray],
+    availability: Callable[[], Tuple[np.ndarray, np.ndarray]],
+    origin: Optional[int] = None,
+    destination: Optional[int] = None,
+    seat_class: str = 'Economy',
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    max_stops: Optional[int] = None,
+    departure_after: Optional[int] = None,
+    departure_before: Optional[int] = None,
+    max_duration: Optional[int] = None,
+    available_only: bool = False,
+) -> Optional[np.ndarray]:
+    """
+    Returns a mask of the candidate flights that pass every filter, or None
+    when there is nothing to filter. The candidates' values are fetched on
+    demand through ``column`` (a schedule column by name), ``fares`` (their
+    fares in ``seat_class``) and ``availability`` (seats left per class and
+    cancelled flags), so only the filtered columns are ever gathered. With
+    ``available_only`` cancelled and sold-out (in ``seat_class``) flights
+    are skipped.
+    """
+    mask = None
+
+    def narrow(condition):
+        nonlocal mask
+        mask = condition if mask is None else mask & condition
+
+    if origin is not None:
+        narrow(column('origin') == origin)
+    if destination is not None:
+        narrow(column('destination') == destination)
+    if min_price is not None or max_price is not None:
+        prices = fares()
+        if min_price is not None:
+            narrow(prices >= min_price)
+        if max_price is not None:
+            narrow(prices <= max_price)
+    if max_stops is not None:
+        narrow(column('number_of_stops') <= max_stops)
+    if departure_after is not None:
+        narrow(column('departure_minute') >= departure_after)
+    if departure_before is not None:
+        narrow(column('departure_minute') <= departure_before)
+    if max_duration is not None:
+        narrow(column('duration_minutes') <= max_duration)
+    if available_only:
+        seats, cancelled = availability()
+        narrow(~cancelled)
+        narrow(seats[:, flight_classes.index(seat_class)] > 0)
+    return mask
+
+
+class FlightInventory:
+    """
+    LRU cache of ``DayInventory`` objects keyed by departure date.
+
+    Schedules are seeded from the date itself, so a day that is evicted and
+    rebuilt comes back with exactly the same flights. Generated schedules are
+    written to ``snapshots`` and mapped back read-only, so workers share one
+    copy of each day and later starts skip generation; only the next
+    ``snapshot_days`` dates are written, so the directory stays bounded. Fares published by the
+    fare engine are a per-day price table laid over those mapped rows, so
+    repricing never copies a schedule into a worker's private memory.
+    """
+
+    def __init__(
+        self,
+        flights_per_day: int = FLIGHTS_PER_DAY,
+        max_days: int = MAX_CACHED_DAYS,
+        snapshots: Optional[SnapshotStore] = None,
+        snapshot_days: int = SNAPSHOT_DAYS,
+    ):
+        self.flights_per_day = flights_per_day
+        self.max_days = max_days
+        self.snapshots = snapshots or SnapshotStore(None)
+        self.snapshot_days = snapshot_days
+        self._days: "OrderedDict[datetime.date, DayInventory]" = OrderedDict()
+        self._calendars: "OrderedDict[Tuple[int, int, int, int, int], Tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # (version, date -> DayInventory of the mapped rows at repriced fares),
+        # replaced as a whole so that readers never need a lock
+        self._published: Tuple[int, Dict[datetime.date, DayInventory]] = (0, {})
+
+    def _snapshot_until(self, today: datetime.date) -> datetime.date:
+        """
+        Returns the first departure date past the snapshot window.
+        """
+        return today + datetime.timedelta(days=self.snapshot_days)
+
+    def _build(self, departure_date: datetime.date) -> DayInventory:
+        today = datetime.date.today()
+        if not today <= departure_date < self._snapshot_until(today):
+            return DayInventory(generate_schedule(departure_date, self.flights_per_day, seed=departure_date.toordinal()))
+        data = self.snapshots.load(departure_date, self.flights_per_day)
+        if data is None:
+            schedule = generate_schedule(departure_date, self.flights_per_day, seed=departure_date.toordinal())
+            try:
+                self.snapshots.save(departure_date, schedule.data)
+                data = self.snapshots.load(departure_date, self.flights_per_day)
+            except OSError as e:
+                print(f"Could not write flight snapshot for {departure_date}: {e}")
+            if data is None:
+                return DayInventory(schedule)
+        return DayInventory(FlightSchedule(departure_date, data))
+
+    @property
+    def price_version(self) -> int:
+        return self._published[0]
+
+    def publish_prices(self, version: int, days: Dict[datetime.date, DayInventory]):
+        """
+        Atomically swaps in a new set of repriced days, each made with
+        ``DayInventory.repriced`` from its base day.
+        """
+        self._published = (version, days)
+
+    def day(self, departure_date: datetime.date) -> DayInventory:
+        """
+        Returns the day's inventory with the latest published fares.
+        """
+        repriced = self._published[1].get(departure_date)
+        if repriced is not None:
+            return repriced
+        return self.base_day(departure_date)
+
+    def base_day(self, departure_date: datetime.date) -> DayInventory:
+        """
+        Returns the day's inventory with its generated base fares.
+        """
+        with self._lock:
+            inventory = self._days.get(departure_date)
+            if inventory is not None:
+                self._days.move_to_end(departure_date)
+                return inventory
+
+        inventory = self._build(departure_date)
+        with self._lock:
+            # Another thread may have built the same day meanwhile; keep the first.
+            inventory = self._days.setdefault(departure_date, inventory)
+            self._days.move_to_end(departure_date)
+            while len(self._days) > self.max_days:
+                self._days.popitem(last=False)
+        return inventory
+
+    def search_window(
+        self,
+        dates: List[datetime.date],
+        origin: Optional[int] = None,
+        destination: Optional[int] = None,
+        sort_by: str = 'departure',
+        seat_class: str = 'Economy',
+        limit: Optional[int] = 20,
+        live: Optional[LiveState] = None,
+        **filters,
+    ) -> List[Tuple[DayInventory, np.ndarray]]:
+        """
+        Runs one search over several departure dates: every date's candidate
+        rows are gathered and filtered together in a single vectorized pass,
+        then split back per date. Returns each date's inventory with up to
+        ``limit`` matching rows, in the order of ``dates``.
+        """
+        if not dates:
+            return []
+        days = [self.day(departure_date) for departure_date in dates]
+        candidates = [day.candidates(origin, destination, sort_by, seat_class) for day in days]
+        route_filtered = all(flag for _, flag in candidates)
+        class_index = flight_classes.index(seat_class)
+
+        def gather(values) -> np.ndarray:
+            return np.concatenate([values(day, rows) for day, (rows, _) in zip(days, candidates)])
+
+        def availability() -> Tuple[np.ndarray, np.ndarray]:
+            parts = [day.availability(rows, live) for day, (rows, _) in zip(days, candidates)]
+            return np.concatenate([seats for seats, _ in parts]), np.concatenate([cancelled for _, cancelled in parts])
+
+        mask = match_filters(
+            column=lambda name: gather(lambda day, rows: day.schedule.data[name][rows]),
+            fares=lambda: gather(lambda day, rows: day.schedule.prices[rows, class_index]),
+            availability=availability,
+            origin=None if route_filtered else origin,
+            destination=None if route_filtered else destination,
+            seat_class=seat_class,
+            **filters,
+        )
+
+        results = []
+        start = 0
+        for day, (rows, _) in zip(days, candidates):
+            end = start + len(rows)
+            if mask is not None:
+                rows = rows[mask[start:end]]
+            start = end
+            results.append((day, rows[:limit]))
+        return results
+
+    def warm(self, today: Optional[datetime.date] = None, days: int = WARMUP_DAYS) -> List[datetime.date]:
+        """
+        Makes sure the next ``days`` departure dates are in memory and drops
+        dates that have passed, and their snapshots along with any outside the
+        snapshot window. Only dates not already cached are generated,
+        so after the first pass each run builds at most the day that just
+        entered the window. Returns the dates that had to be built.
+        """
+        today = today or datetime.date.today()
+        with self._lock:
+            for departure_date in [d for d in self._days if d < today]:
+                del self._days[departure_date]
+            cached = set(self._days)
+        self.snapshots.prune(before=today, until=self._snapshot_until(today))
+
+        built = []
+        for offset in range(days):
+            departure_date = today + datetime.timedelta(days=offset)
+            if departure_date not in cached:
+                self.base_day(departure_date)
+                built.append(departure_date)
+        return built
+
+    def _calendar_rows(self, origin: int, destination: int, year: int, month: int, today: datetime.date) -> Tuple:
+        """
+        Gathers the route's flights on every day of the month from ``today``
+        on into flat arrays, cached per route and month, day and price table
+        version. Days already past are left empty without being built.
+        Returns (day offsets, prices, seats, cancelled, flight numbers per day).
+        """
+        key = (origin, destination, year, month, today, self.price_version)
+        with self._lock:
+            cached = self._calendars.get(key)
+            if cached is not None:
+                self._calendars.move_to_end(key)
+                return cached
+
+        n_days = calendar.monthrange(year, month)[1]
+        # Start each column empty, so a month with no days left still concatenates.
+        prices = [np.empty((0, len(flight_classes)))]
+        seats = [np.empty((0, len(flight_classes)), dtype=np.int16)]
+        cancelled = [np.empty(0, dtype=bool)]
+        flight_numbers = []
+        day_offsets = np.zeros(n_days, dtype=np.intp)
+        total = 0
+        for d in range(n_days):
+            departure_date = datetime.date(year, month, d + 1)
+            day_offsets[d] = total
+            if departure_date < today:
+                flight_numbers.append([])
+                continue
+            day = self.day(departure_date)
+            rows = day.routes.get((origin, destination), {}).get('departure', np.empty(0, dtype=np.intp))
+            data = day.schedule.data[rows]
+            total += len(rows)
+            prices.append(day.schedule.prices[rows])
+            seats.append(data['seats'])
+            cancelled.append(data['status'] == statuses.index('Cancelled'))
+            flight_numbers.append([day.schedule.flight_number(row) for row in rows.tolist()])
+
+        gathered = (day_offsets, np.concatenate(prices), np.concatenate(seats), np.concatenate(cancelled), flight_numbers)
+        with self._lock:
+            self._calendars[key] = gathered
+            while len(self._calendars) > MAX_CACHED_CALENDARS:
+                self._calendars.popitem(last=False)
+        return gathered
+
+    def fare_calendar(
+        self,
+        origin: int,
+        destination: int,
+        year: int,
+        month: int,
+        live: Optional[LiveState] = None,
+        today: Optional[datetime.date] = None,
+    ) -> np.ndarray:
+        """
+        Returns the cheapest bookable fare per day of the month on a route as
+        a (days, classes) array, with NaN where a class has no bookable flight
+        and on every day before ``today``.
+
+        The route's rows for every day are gathered once per price table
+        version; each call lays their ``live`` seat counts and statuses over
+        them and reduces them per day in a single vectorized pass.
+        """
+        today = today or datetime.date.today()
+        day_offsets, prices, seats, cancelled, flight_numbers = self._calendar_rows(origin, destination, year, month, today)
+        if live is not None:
+            seats, cancelled = seats.copy(), cancelled.copy()
+            for d, numbers in enumerate(flight_numbers):
+                if numbers:
+                    day_rows = slice(day_offsets[d], day_offsets[d] + len(numbers))
+                    overlay_live(seats[day_rows], cancelled[day_rows], *live(datetime.date(year, month, d + 1), numbers))
+        bookable = (seats > 0) & ~cancelled[:, None]
+        fares = np.where(bookable, prices, np.inf)
+
+        result = np.full((len(day_offsets), len(flight_classes)), np.nan)
+        if len(fares):
+            # reduceat needs in-bounds offsets, so only reduce over days with flights.
+            has_flights = np.diff(np.append(day_offsets, len(fares))) > 0
+            result[has_flights] = np.minimum.reduceat(fares, day_offsets[has_flights], axis=0)
+        result[np.isinf(result)] = np.nan
+        return result
@@ -0,0 +1,198 @@
+"""
+Vectorized flight schedule generation.
+
+A schedule holds one row per flight in a NumPy structured array, using small
+integer codes into the lookup tables below, so that whole days of flights
+(100k+ rows) can be generated, sorted and filtered without building a Python
+object per flight. Rows are only turned into ``Flight`` keyword arguments when
+they are actually returned to a client.
+"""
+import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+airlines = ['Delta', 'United', 'American Airlines', 'Southwest', 'JetBlue', 'Alaska Airlines', 'Spirit']
+airport_codes = ['LAX', 'JFK', 'ORD', 'ATL', 'DFW', 'DEN', 'SFO', 'SEA', 'MIA', 'BOS']
+aircraft_types = ['Boeing 737', 'Airbus A320', 'Boeing 777', 'Airbus A350', 'Embraer E190', 'Boeing 787']
+statuses = ['On Time', 'Delayed', 'Cancelled']
+terminals = ['A', 'B', 'C', 'D', 'E']
+gate_letters = 'ABCDEF'
+flight_classes = ['Economy', 'Business', 'First']
+
+# "Delta" -> "DE", "American Airlines" -> "AM", ...
+airline_prefixes = [airline.replace(' ', '')[:2].upper() for airline in airlines]
+
+MAX_STOPS = 2
+
+SCHEDULE_DTYPE = np.dtype([
+    ('airline', 'i1'),
+    ('flight_number', 'i4'),
+    ('origin', 'i1'),
+    ('destination', 'i1'),
+    ('departure_minute', 'i2'),  # minutes after midnight of the departure date
+    ('duration_minutes', 'i2'),
+    ('number_of_stops', 'i1'),
+    ('stop_airports', 'i1', (MAX_STOPS,)),  # -1 for unused stops
+    ('leg_minutes', 'i2', (MAX_STOPS + 1,)),  # legs to each stop, last column is the final leg
+    ('layover_minutes', 'i2', (MAX_STOPS,)),
+    ('status', 'i1'),
+    ('aircraft', 'i1'),
+    ('gate_letter', 'i1'),
+    ('gate_number', 'i1'),
+    ('terminal', 'i1'),
+    ('meal', '?'),
+    ('seats', 'i2', (len(flight_classes),)),
+    ('prices', 'f8', (len(flight_classes),)),
+])
+
+
+def format_minutes(minutes: int) -> str:
+    """
+    Formats a number of minutes like "5h 45m".
+    """
+    return f"{minutes // 60}h {minutes % 60}m"
+
+
+class FlightSchedule:
+    """
+    All flights departing on a single date, stored column-wise.
+
+    ``prices`` is the (flights, classes) fare table the schedule is sold at.
+    It defaults to the generated fares in ``data`` and can be swapped for a
+    repriced table with ``repriced`` without copying the rows themselves.
+    """
+
+    def __init__(self, departure_date: datetime.date, data: np.ndarray, prices: Optional[np.ndarray] = None):
+        self.departure_date = departure_date
+        self.data = data
+        self.prices = data['prices'] if prices is None else prices
+        self._midnight = datetime.datetime(departure_date.year, departure_date.month, departure_date.day)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def repriced(self, prices: np.ndarray) -> "FlightSchedule":
+        """
+        Returns the same flights sold at ``prices``, sharing this schedule's rows.
+        """
+        return FlightSchedule(self.departure_date, self.data, prices)
+
+    def flight_number(self, row: int) -> str:
+        record = self.data[row]
+        return f"{airline_prefixes[record['airline']]}{record['flight_number']}"
+
+    def flight_kwargs(self, row: int) -> Dict:
+        """
+        Builds the keyword arguments for a ``Flight`` from a single row.
+        """
+        record = self.data[row]
+        number_of_stops = int(record['number_of_stops'])
+        legs = record['leg_minutes']
+        layovers = record['layover_minutes']
+
+        departure_time = self._midnight + datetime.timedelta(minutes=int(record['departure_minute']))
+        current_time = departure_time
+        stops = []
+        for s in range(number_of_stops):
+            current_time += datetime.timedelta(minutes=int(legs[s]))
+            arrival_time_at_stop = current_time
+            current_time += datetime.timedelta(minutes=int(layovers[s]))
+            stops.append({
+                'airport': airport_codes[record['stop_airports'][s]],
+                'arrivalTime': arrival_time_at_stop,
+                'departureTime': current_time,
+                'layoverDuration': format_minutes(int(layovers[s])),
+                'layoverMinutes': int(layovers[s]),
+            })
+        arrival_time = current_time + datetime.timedelta(minutes=int(legs[MAX_STOPS]))
+
+        return {
+            'airline': airlines[record['airline']],
+            'flightNumber': self.flight_number(row),
+            'departureAirport': airport_codes[record['origin']],
+            'destinationAirport': airport_codes[record['destination']],
+            'departureTime': departure_time,
+            'arrivalTime': arrival_time,
+            'duration': format_minutes(int(record['duration_minutes'])),
+            'durationMinutes': int(record['duration_minutes']),
+            'numberOfStops': number_of_stops,
+            'stops': stops,
+            'status': statuses[record['status']],
+            'aircraft': aircraft_types[record['aircraft']],
+            'gate': f"{gate_letters[record['gate_letter']]}{record['gate_number']}",
+            'terminal': terminals[record['terminal']],
+            'meal': bool(record['meal']),
+            'availableSeats': {c: int(v) for c, v in zip(flight_classes, record['seats'])},
+            'prices': {c: round(float(v), 2) for c, v in zip(flight_classes, self.prices[row])},
+            'bookingUrl': "#",
+        }
+
+
+def generate_schedule(departure_date: datetime.date, count: int, seed: Optional[int] = None) -> FlightSchedule:
+    """
+    Generates ``count`` flights for ``departure_date`` in one vectorized pass.
+
+    Uses the same distributions as the original per-flight generator: 0-2
+    distinct stops, 1-3h legs to each stop, 30-150 min layovers, a 1-4h final
+    leg and uniformly random prices and seat counts per class.
+    """
+    rng = np.random.default_rng(seed)
+    n_airports = len(airport_codes)
+    data = np.zeros(count, dtype=SCHEDULE_DTYPE)
+
+    airline = rng.integers(0, len(airlines), count)
+    data['airline'] = airline
+    # Flight numbers are unique per airline within the day: each airline deals
+    # its flights numbers from a shuffled range (100-9999, or wider when an
+    # airline has more flights than that).
+    for a in range(len(airlines)):
+        flights = np.flatnonzero(airline == a)
+        capacity = max(9900, len(flights))
+        data['flight_number'][flights] = 100 + rng.permutation(capacity)[:len(flights)]
+
+    origin = rng.integers(0, n_airports, count)
+    destination = (origin + rng.integers(1, n_airports, count)) % n_airports
+    data['origin'] = origin
+    data['destination'] = destination
+
+    # Distinct stop airports: shuffle every airport per row with random sort
+    # keys, pushing the origin and destination to the end.
+    number_of_stops = rng.integers(0, MAX_STOPS + 1, count)
+    rows = np.arange(count)
+    keys = rng.random((count, n_airports))
+    keys[rows, origin] = np.inf
+    keys[rows, destination] = np.inf
+    stop_airports = np.argsort(keys, axis=1)[:, :MAX_STOPS]
+    used_stops = np.arange(MAX_STOPS) < number_of_stops[:, None]
+    data['number_of_stops'] = number_of_stops
+    data['stop_airports'] = np.where(used_stops, stop_airports, -1)
+
+    legs = np.zeros((count, MAX_STOPS + 1), dtype=np.int16)
+    legs[:, :MAX_STOPS] = np.where(used_stops, rng.integers(60, 181, (count, MAX_STOPS)), 0)
+    legs[:, MAX_STOPS] = rng.integers(60, 241, count)
+    layovers = np.where(used_stops, rng.integers(30, 151, (count, MAX_STOPS)), 0)
+    data['leg_minutes'] = legs
+    data['layover_minutes'] = layovers
+    data['departure_minute'] = rng.integers(0, 24 * 60, count)
+    data['duration_minutes'] = legs.sum(axis=1) + layovers.sum(axis=1)
+
+    data['status'] = rng.integers(0, len(statuses), count)
+    data['aircraft'] = rng.integers(0, len(aircraft_types), count)
+    data['gate_letter'] = rng.integers(0, len(gate_letters), count)
+    data['gate_number'] = rng.integers(1, 31, count)
+    data['terminal'] = rng.integers(0, len(terminals), count)
+    data['meal'] = rng.random(count) > 0.3  # 70% chance of meal
+
+    data['seats'] = rng.integers(0, [101, 31, 11], (count, len(flight_classes)))
+    data['prices'] = np.round(rng.uniform([50.0, 400.0, 1000.0], [450.0, 1000.0, 2500.0], (count, len(flight_classes))), 2)
+
+    return FlightSchedule(departure_date, data)
+
+
+def materialize_rows(schedule: FlightSchedule, rows) -> List[Dict]:
+    """
+    Returns ``Flight`` keyword arguments for the given schedule rows.
+    """
+    return [schedule.flight_kwargs(int(row)) for row in rows]
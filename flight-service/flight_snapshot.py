@@ -0,0 +1,125 @@
+"""
+On-disk columnar snapshots of daily flight schedules.
+
+Each day is saved once as a ``.npy`` file holding the schedule's structured
+array; the lookup tables its integer codes point into are saved next to them
+as a JSON string table. Workers open snapshots with ``mmap_mode='r'``, so
+every process maps the same read-only pages from the OS page cache instead of
+generating and holding its own copy, and a restarted worker only has to map
+files rather than rebuild them.
+"""
+import datetime
+import glob
+import json
+import os
+import tempfile
+from typing import Optional
+
+import numpy as np
+
+import flight_schedule
+
+
+SNAPSHOT_DIR = os.getenv("FLIGHT_SNAPSHOT_DIR", os.path.join(os.path.dirname(__file__), "snapshots"))
+
+
+def string_table() -> dict:
+    """
+    Everything a snapshot's integer codes and layout depend on.
+    """
+    return {
+        "airlines": flight_schedule.airlines,
+        "airport_codes": flight_schedule.airport_codes,
+        "aircraft_types": flight_schedule.aircraft_types,
+        "statuses": flight_schedule.statuses,
+        "terminals": flight_schedule.terminals,
+        "gate_letters": flight_schedule.gate_letters,
+        "flight_classes": flight_schedule.flight_classes,
+        "dtype": str(flight_schedule.SCHEDULE_DTYPE.descr),
+    }
+
+
+class SnapshotStore:
+    """
+    Reads and writes per-day schedule snapshots in a directory.
+    """
+
+    def __init__(self, directory: Optional[str] = SNAPSHOT_DIR):
+        self.directory = directory
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._check_string_table()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def _write_atomically(self, path: str, write):
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def _check_string_table(self):
+        """
+        Drops every snapshot if the lookup tables or row layout have changed
+        since they were written, since their codes would no longer match.
+        """
+        table_path = os.path.join(self.directory, "strings.json")
+        table = string_table()
+        try:
+            with open(table_path) as f:
+                if json.load(f) == table:
+                    return
+        except (OSError, ValueError):
+            pass
+        for path in glob.glob(os.path.join(self.directory, "flights-*.npy")):
+            os.remove(path)
+        self._write_atomically(table_path, lambda f: f.write(json.dumps(table, indent=2).encode()))
+
+    def _path(self, departure_date: datetime.date, count: int) -> str:
+        return os.path.join(self.directory, f"flights-{departure_date.isoformat()}-{count}.npy")
+
+    def load(self, departure_date: datetime.date, count: int) -> Optional[np.ndarray]:
+        """
+        Maps a day's snapshot read-only, or returns None if there is none.
+        """
+        if not self.enabled:
+            return None
+        try:
+            data = np.load(self._path(departure_date, count), mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        if data.dtype != flight_schedule.SCHEDULE_DTYPE or len(data) != count:
+            return None
+        return data
+
+    def save(self, departure_date: datetime.date, data: np.ndarray):
+        if self.enabled:
+            self._write_atomically(self._path(departure_date, len(data)), lambda f: np.save(f, data))
+
+    def prune(self, before: datetime.date, until: Optional[datetime.date] = None) -> int:
+        """
+        Deletes snapshots of dates before ``before`` and, if given, from
+        ``until`` on. Returns how many.
+        """
+        if not self.enabled:
+            return 0
+        removed = 0
+        for path in glob.glob(os.path.join(self.directory, "flights-*.npy")):
+            date_part = os.path.basename(path)[len("flights-"):len("flights-") + 10]
+            try:
+                snapshot_date = datetime.date.fromisoformat(date_part)
+            except ValueError:
+                continue
+            if snapshot_date < before or (until is not None and snapshot_date >= until):
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
@@ -1,27 +1,122 @@
 # main.py
-from fastapi import FastAPI, HTTPException, Query, Request, Depends
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
 from pydantic import BaseModel, Field
-from typing import List, Literal, Dict, Optional
-import uuid
+from typing import List, Literal, Dict, Optional, Tuple, Union
+import asyncio
 import datetime
 import random
 import json
+import math
 import sys
 import os
 
+import jwt
+import redis
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 
 # Add shared module to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'shared'))
 from redis_rate_limit import rate_limit
+from fast_json import FastJSONResponse
+from http_cache import conditional_json_response
+from seat_inventory import seat_inventory
+from flight_schedule import airport_codes, flight_classes, format_minutes, gate_letters, generate_schedule, materialize_rows
+from flight_schedule import statuses as flight_statuses
+from flight_inventory import FlightInventory, WARMUP_DAYS, WARMUP_INTERVAL
+from flight_snapshot import SnapshotStore
+from route_planner import RoutePlanner, k_best_pairs
+from fare_engine import FareEngine, REPRICE_INTERVAL
+from status_feed import StatusFeed, STATUS_KEEPALIVE, STATUS_SIMULATION_INTERVAL
 
+SECRET_KEY = os.getenv("JWT_SECRET") or "super-secret"
+ALGORITHM = os.getenv("JWT_ALGORITHM") or "HS256"
+# User ids or emails allowed to change flight statuses, comma-separated. Empty
+# by default, which leaves status changes to the built-in simulator.
+FLIGHT_STATUS_ADMINS = {user.strip() for user in os.getenv("FLIGHT_STATUS_ADMINS", "").split(",") if user.strip()}
+
+
+async def reprice_periodically():
+    """
+    Reprices the inventory every REPRICE_INTERVAL seconds, off the event loop,
+    and sweeps expired seat holds back into inventory.
+    """
+    while True:
+        try:
+            version = await asyncio.to_thread(fare_engine.reprice)
+            print(f"Published flight price table v{version}")
+            # Route graphs are per price version; rebuild them off the request path.
+            await asyncio.to_thread(warm_up)
+            await asyncio.to_thread(seat_inventory.release_expired)
+        except Exception as e:
+            print(f"Repricing failed: {e}")
+        await asyncio.sleep(REPRICE_INTERVAL)
+
+def warm_up():
+    """
+    Precomputes inventory and route graphs for the next WARMUP_DAYS dates.
+    """
+    today = datetime.date.today()
+    built = flight_inventory.warm(today, WARMUP_DAYS)
+    route_planner.warm([today + datetime.timedelta(days=offset) for offset in range(WARMUP_DAYS)])
+    return built
+
+async def warm_up_periodically():
+    """
+    Keeps the rolling window of upcoming dates in memory, so near-term
+    searches never generate flights on the request path.
+    """
+    while True:
+        try:
+            built = await asyncio.to_thread(warm_up)
+            if built:
+                print(f"Warmed up flight inventory for {len(built)} day(s) from {built[0]}")
+            status_feed.prune(datetime.date.today())
+        except Exception as e:
+            print(f"Inventory warm-up failed: {e}")
+        await asyncio.sleep(WARMUP_INTERVAL)
+
+async def simulate_status_changes():
+    """
+    Every STATUS_SIMULATION_INTERVAL seconds, changes the status or gate of a
+    random flight that someone is watching on the status feed.
+    """
+    while True:
+        await asyncio.sleep(STATUS_SIMULATION_INTERVAL)
+        watched = status_feed.watched()
+        if not watched:
+            continue
+        departure_date, flight_number = random.choice(watched)
+        try:
+            flight = await asyncio.to_thread(find_flight_or_404, departure_date, flight_number)
+            if random.random() < 0.5:
+                status_feed.publish(departure_date, flight_number, current_status(flight), status=random.choice(flight_statuses))
+            else:
+                gate = f"{random.choice(gate_letters)}{random.randint(1, 30)}"
+                status_feed.publish(departure_date, flight_number, current_status(flight), gate=gate)
+        except Exception as e:
+            print(f"Status simulation failed: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    tasks = [
+        asyncio.create_task(warm_up_periodically()),
+        asyncio.create_task(reprice_periodically()),
+    ]
+    if STATUS_SIMULATION_INTERVAL > 0:
+        tasks.append(asyncio.create_task(simulate_status_changes()))
+    yield
+    for task in tasks:
+        task.cancel()
 
 # Initialize FastAPI application
 app = FastAPI(
     title="Fake Flight Generator Microservice",
     description="A microservice to obtain  flight data based on provided JavaScript logic.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 app.add_middleware(
     CORSMiddleware,
@@ -45,6 +140,7 @@ class StopDetail(BaseModel):
     arrivalTime: datetime.datetime # Use datetime for internal handling
     departureTime: datetime.datetime # Use datetime for internal handling
     layoverDuration: str # String format like "1h 30m"
+    layoverMinutes: int # Same layover in minutes, for sorting and filtering
 
 class Flight(BaseModel):
     """
@@ -57,6 +153,7 @@ class Flight(BaseModel):
     departureTime: datetime.datetime # Use datetime for internal handling
     arrivalTime: datetime.datetime # Use datetime for internal handling
     duration: str # String format like "5h 45m"
+    durationMinutes: int # Same duration in minutes, for sorting and filtering
     numberOfStops: int
     stops: List[StopDetail]
     status: Literal['On Time', 'Delayed', 'Cancelled']
@@ -68,135 +165,646 @@ class Flight(BaseModel):
     prices: Dict[FlightClass, float] # Use Dict with FlightClass Literal
     bookingUrl: str
 
-# --- Flight Data Generation Logic (Ported from JavaScript) ---
+class FlightPage(BaseModel):
+    """
+    A single page of a bulk-generated flight schedule.
+    """
+    total: int
+    page: int
+    pageSize: int
+    flights: List[Flight]
 
-def generate_fake_flights(departure_date_str: str, count: int = 5) -> List[Flight]:
+class Itinerary(BaseModel):
     """
-    Generates mock flight data based on the provided departure date,
-    porting the logic from the JavaScript function.
+    A sequence of connecting flights from an origin to a destination.
     """
-    airlines = ['Delta', 'United', 'American Airlines', 'Southwest', 'JetBlue', 'Alaska Airlines', 'Spirit']
-    airport_codes = ['LAX', 'JFK', 'ORD', 'ATL', 'DFW', 'DEN', 'SFO', 'SEA', 'MIA', 'BOS']
-    aircraft_types = ['Boeing 737', 'Airbus A320', 'Boeing 777', 'Airbus A350', 'Embraer E190', 'Boeing 787']
-    statuses = ['On Time', 'Delayed', 'Cancelled']
-    terminals = ['A', 'B', 'C', 'D', 'E']
+    legs: List[Flight]
+    connections: int
+    departureTime: datetime.datetime
+    arrivalTime: datetime.datetime
+    duration: str # String format like "5h 45m"
+    durationMinutes: int
+    totalPrice: float
+    seatClass: FlightClass
 
-    flights: List[Flight] = []
+class FareCalendarDay(BaseModel):
+    """
+    Cheapest available fare per class on a single day.
+    """
+    date: datetime.date
+    prices: Dict[FlightClass, Optional[float]] # None when no seats are available in that class
+
+class FareCalendar(BaseModel):
+    """
+    Cheapest fares for a route on every day of a month.
+    """
+    origin: str
+    destination: str
+    month: str
+    days: List[FareCalendarDay]
+
+class RoundTrip(BaseModel):
+    """
+    An outbound flight paired with a return flight.
+    """
+    outbound: Flight
+    returnFlight: Flight
+    totalPrice: float
+    totalDuration: str # String format like "5h 45m", time spent in the air and at stops
+    totalDurationMinutes: int
+    seatClass: FlightClass
+
+class SeatHoldRequest(BaseModel):
+    """
+    Request to hold seats on a flight during checkout.
+    """
+    departureDate: datetime.date
+    flightNumber: str
+    seatClass: FlightClass = 'Economy'
+    quantity: int = Field(1, ge=1, le=9)
+
+class SeatHold(BaseModel):
+    """
+    Seats held for a checkout until ``expiresAt``.
+    """
+    holdId: str
+    departureDate: datetime.date
+    flightNumber: str
+    seatClass: FlightClass
+    quantity: int
+    price: float # Fare per seat, kept until the hold is confirmed
+    expiresAt: datetime.datetime
+
+class FlightStatusUpdate(BaseModel):
+    """
+    A change to a flight's status and/or gate; omitted fields are unchanged.
+    """
+    status: Optional[Literal['On Time', 'Delayed', 'Cancelled']] = None
+    gate: Optional[str] = Field(None, min_length=1, max_length=8)
+
+class FlightStatus(BaseModel):
+    """
+    The current status and gate of a flight, as sent on the status feed.
+    """
+    departureDate: datetime.date
+    flightNumber: str
+    status: Literal['On Time', 'Delayed', 'Cancelled']
+    gate: str
 
+# --- Flight Data Generation Logic (Ported from JavaScript) ---
+
+def parse_departure_date(departure_date_str: str) -> datetime.date:
+    """
+    Parses a YYYY-MM-DD departure date, raising a 400 on bad input.
+    """
     try:
-        # Parse the departure_date_str into a date object
-        departure_date_obj = datetime.datetime.strptime(departure_date_str, "%Y-%m-%d").date()
+        return datetime.datetime.strptime(departure_date_str, "%Y-%m-%d").date()
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Please use YYYY-MM-DD.")
 
-    for _ in range(count):
-        airline = random.choice(airlines)
-        # Ensure flight number is unique enough for mock data
-        flight_number = f"{airline.replace(' ', '')[:2].upper()}{random.randint(100, 9999)}"
-
-        departure_airport = random.choice(airport_codes)
-        destination_airport: str
-        while True:
-            destination_airport = random.choice(airport_codes)
-            if destination_airport != departure_airport:
-                break
-
-        number_of_stops = random.randint(0, 2) # 0 to 2 stops
-        stop_airports = set()
-        stops: List[StopDetail] = []
-
-        # Generate initial departure time for the main flight
-        dep_hour = random.randint(0, 23)
-        dep_minute = random.randint(0, 59)
-        departure_time = datetime.datetime(
-            departure_date_obj.year, departure_date_obj.month, departure_date_obj.day,
-            dep_hour, dep_minute, 0
-        )
-        current_time = departure_time
+def parse_airport_code(code: Optional[str]) -> Optional[int]:
+    """
+    Returns the index of an airport code, raising a 400 for unknown airports.
+    """
+    if code is None:
+        return None
+    try:
+        return airport_codes.index(code.upper())
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Unknown airport code '{code}'. Valid codes: {', '.join(airport_codes)}.")
 
-        # Create stops if needed
-        for s in range(number_of_stops):
-            stop_airport: str
-            while True:
-                stop_airport = random.choice(airport_codes)
-                if (stop_airport != departure_airport and
-                    stop_airport != destination_airport and
-                    stop_airport not in stop_airports):
-                    break
-            stop_airports.add(stop_airport)
-
-            flight_duration_to_stop_minutes = random.randint(60, 180) # 1-3h to stop
-            current_time += datetime.timedelta(minutes=flight_duration_to_stop_minutes)
-            arrival_time_at_stop = current_time
-
-            layover_minutes = random.randint(30, 150) # 30-150 mins layover
-            current_time += datetime.timedelta(minutes=layover_minutes)
-            departure_time_from_stop = current_time
-
-            layover_duration_str = f"{layover_minutes // 60}h {layover_minutes % 60}m"
-
-            stops.append(StopDetail(
-                airport=stop_airport,
-                arrivalTime=arrival_time_at_stop,
-                departureTime=departure_time_from_stop,
-                layoverDuration=layover_duration_str
-            ))
+def parse_time_of_day(value: Optional[str]) -> Optional[int]:
+    """
+    Parses an HH:MM time of day into minutes after midnight.
+    """
+    if value is None:
+        return None
+    try:
+        parsed = datetime.datetime.strptime(value, "%H:%M")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid time format. Please use HH:MM.")
+    return parsed.hour * 60 + parsed.minute
 
-        flight_duration_to_dest_minutes = random.randint(60, 240) # 1-4h final leg
-        current_time += datetime.timedelta(minutes=flight_duration_to_dest_minutes)
-        arrival_time = current_time
-
-        total_duration_minutes = (arrival_time - departure_time).total_seconds() / 60
-        duration_str = f"{int(total_duration_minutes // 60)}h {int(total_duration_minutes % 60)}m"
-
-        # Ensure prices are floats as per Pydantic model
-        prices: Dict[FlightClass, float] = {
-            'Economy': round(random.uniform(50.0, 450.0), 2),
-            'Business': round(random.uniform(400.0, 1000.0), 2),
-            'First': round(random.uniform(1000.0, 2500.0), 2)
-        }
-
-        available_seats: Dict[FlightClass, int] = {
-            'Economy': random.randint(0, 100),
-            'Business': random.randint(0, 30),
-            'First': random.randint(0, 10)
-        }
-
-        flights.append(Flight(
-            airline=airline,
-            flightNumber=flight_number,
-            departureAirport=departure_airport,
-            destinationAirport=destination_airport,
-            departureTime=departure_time,
-            arrivalTime=arrival_time,
-            duration=duration_str,
-            numberOfStops=number_of_stops,
-            stops=stops,
-            status=random.choice(statuses), # type: ignore - Literal type check
-            aircraft=random.choice(aircraft_types),
-            gate=f"{random.choice('ABCDEF')}{random.randint(1, 30)}",
-            terminal=random.choice(terminals),
-            meal=random.random() > 0.3, # 70% chance of meal
-            availableSeats=available_seats,
-            prices=prices,
-            bookingUrl="#"
-        ))
+def construct_flight(kwargs: Dict) -> Flight:
+    """
+    Creates a Flight from generated schedule fields without validating them.
+    """
+    stops = [StopDetail.model_construct(**stop) for stop in kwargs['stops']]
+    return Flight.model_construct(**{**kwargs, 'stops': stops})
+
+def build_days_flight_fields(days) -> List[List[Dict]]:
+    """
+    Builds Flight fields for (schedule, rows) pairs of one or more days, with
+    availableSeats taken from the live seat inventory (seeding it for flights
+    seen for the first time, and recording the fares they are offered at for
+    flight-booking to charge) in one round trip, and status/gate changes from
+    the status feed. The fields are generated here, so they can be encoded as
+    they are with FastJSONResponse.
+    """
+    flights = [
+        (schedule.departure_date.isoformat(), materialize_rows(schedule, rows))
+        for schedule, rows in days
+    ]
+    live_seats = iter(seat_inventory.seed_and_get(
+        (departure_date, kwargs['flightNumber'], kwargs['availableSeats'], kwargs['prices'])
+        for departure_date, day_flights in flights
+        for kwargs in day_flights
+    ))
+    for departure_date, day_flights in flights:
+        for kwargs in day_flights:
+            seats = next(live_seats)
+            if seats:
+                kwargs['availableSeats'] = seats
+            override = status_feed.current(departure_date, kwargs['flightNumber'])
+            if override:
+                kwargs.update(override)
+    return [day_flights for _, day_flights in flights]
 
-    return flights
+def build_flight_fields(schedule, rows) -> List[Dict]:
+    """
+    Builds Flight fields for one day's schedule rows, see build_days_flight_fields.
+    """
+    return build_days_flight_fields([(schedule, rows)])[0]
+
+def live_state(departure_date: datetime.date, flight_numbers: List[str]) -> Tuple[List[Optional[Dict[str, int]]], List[Optional[str]]]:
+    """
+    Live seat counts and status overrides of a day's flights, for the
+    searches that skip unbookable flights.
+    """
+    departure_date = departure_date.isoformat()
+    overrides = [status_feed.current(departure_date, flight_number) for flight_number in flight_numbers]
+    return (
+        seat_inventory.get_many(departure_date, flight_numbers),
+        [override['status'] if override else None for override in overrides],
+    )
+
+def build_flights(schedule, rows) -> List[Flight]:
+    """
+    Builds Flight objects for schedule rows, see build_flight_fields.
+    """
+    return [construct_flight(kwargs) for kwargs in build_flight_fields(schedule, rows)]
+
+def current_status(flight: Flight) -> Dict[str, str]:
+    return {'status': flight.status, 'gate': flight.gate}
+
+def find_flight_or_404(departure_date: str, flight_number: str) -> Flight:
+    """
+    Builds a single flight by date and flight number, raising a 404 if the
+    day has no such flight.
+    """
+    day = flight_inventory.day(parse_departure_date(departure_date))
+    row = day.find_flight(flight_number)
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Flight {flight_number} not found on {departure_date}")
+    flight, = build_flights(day.schedule, [row])
+    return flight
+
+def status_event(status: Dict, event_id: Optional[int] = None) -> str:
+    """
+    Formats a status update as a Server-Sent Events message.
+    """
+    message = f"event: status\ndata: {json.dumps(status)}\n\n"
+    return message if event_id is None else f"id: {event_id}\n{message}"
+
+def seat_hold_response(hold: Dict) -> SeatHold:
+    return SeatHold(
+        holdId=hold['holdId'],
+        departureDate=hold['departureDate'],
+        flightNumber=hold['flightNumber'],
+        seatClass=hold['seatClass'],
+        quantity=hold['quantity'],
+        price=hold['price'],
+        expiresAt=datetime.datetime.fromtimestamp(hold['expiresAt'], tz=datetime.timezone.utc)
+    )
+
+# Largest schedule GET /flights/bulk generates per request
+BULK_MAX_FLIGHTS = int(os.getenv("BULK_MAX_FLIGHTS", 200_000))
+
+# Route-indexed inventory that backs GET /flights
+flight_inventory = FlightInventory(snapshots=SnapshotStore())
+# Connecting-itinerary search over the same inventory
+route_planner = RoutePlanner(flight_inventory)
+# Batch repricing that publishes fares the inventory serves
+fare_engine = FareEngine(flight_inventory, seat_inventory)
+# Status/gate changes pushed to GET /flights/status subscribers
+status_feed = StatusFeed()
 
 # --- API Endpoints ---
 
-@app.get("/flights", response_model=List[Flight])
+@app.get("/flights", response_model=Union[List[Flight], Dict[str, List[Flight]]])
 async def generate_flights_endpoint(
     request: Request,
     departure_date: str = Query(default=datetime.date.today().strftime("%Y-%m-%d"), description="The desired departure date in YYYY-MM-DD format."),
-    count: int = Query(5, ge=1, le=20, description="The number of fake flights to generate (1-20)."),
+    count: int = Query(5, ge=1, le=20, description="The number of flights to return (1-20)."),
+    origin: Optional[str] = Query(None, description="Departure airport code, e.g. LAX."),
+    destination: Optional[str] = Query(None, description="Destination airport code, e.g. JFK."),
+    sort_by: Literal['price', 'departure', 'duration', 'stops'] = Query('departure', description="Sort order of the results."),
+    seat_class: FlightClass = Query('Economy', description="Class used for price sorting and filtering."),
+    min_price: Optional[float] = Query(None, ge=0, description="Minimum price in the chosen seat class."),
+    max_price: Optional[float] = Query(None, ge=0, description="Maximum price in the chosen seat class."),
+    max_stops: Optional[int] = Query(None, ge=0, le=2, description="Maximum number of stops."),
+    departure_after: Optional[str] = Query(None, description="Earliest departure time of day in HH:MM format."),
+    departure_before: Optional[str] = Query(None, description="Latest departure time of day in HH:MM format."),
+    max_duration: Optional[int] = Query(None, ge=0, description="Maximum total duration in minutes, including layovers."),
+    flex_days: int = Query(0, ge=0, le=3, description="Also search this many days either side of the departure date."),
     ):
+    """
+    Endpoint for the list of flights for a given departure date,
+    optionally restricted to a route and filtered/sorted server-side.
+
+    Responses carry an ETag and Cache-Control, and a matching If-None-Match
+    gets a 304. With ``flex_days`` the same search runs over every date in the
+    window (past dates excluded) in one pass, and the response is a JSON
+    object mapping each date to its flights.
+    """
     await rate_limit(request, limit=5, window=60, service="flight-service")
+    origin_code = parse_airport_code(origin)
+    destination_code = parse_airport_code(destination)
+    if origin_code is not None and origin_code == destination_code:
+        raise HTTPException(status_code=400, detail="Origin and destination must be different airports.")
+
+    departure_date_obj = parse_departure_date(departure_date)
+    search = dict(
+        origin=origin_code,
+        destination=destination_code,
+        sort_by=sort_by,
+        seat_class=seat_class,
+        min_price=min_price,
+        max_price=max_price,
+        max_stops=max_stops,
+        departure_after=parse_time_of_day(departure_after),
+        departure_before=parse_time_of_day(departure_before),
+        max_duration=max_duration,
+        limit=count,
+    )
+
+    # The window skips past dates and is clamped to the last representable one.
+    first_day = max(departure_date_obj.toordinal() - flex_days, datetime.date.today().toordinal())
+    last_day = min(departure_date_obj.toordinal() + flex_days, datetime.date.max.toordinal())
+    dates = [
+        datetime.date.fromordinal(day) for day in range(first_day, last_day + 1)
+    ] if flex_days else [departure_date_obj]
+    if origin_code is not None and destination_code is not None:
+        for search_date in dates:
+            fare_engine.record_search(search_date, origin_code, destination_code)
+
+    def search_dates() -> List[List[Dict]]:
+        found = flight_inventory.search_window(dates, **search)
+        return build_days_flight_fields([(day.schedule, rows) for day, rows in found])
+
+    # Building a day and reading its live seats can block, so search in a
+    # worker thread.
+    flights = await asyncio.to_thread(search_dates)
+    if flex_days == 0:
+        return conditional_json_response(request, flights[0])
+    return conditional_json_response(request, {
+        search_date.isoformat(): day_flights for search_date, day_flights in zip(dates, flights)
+    })
+
+@app.get("/flights/bulk", response_model=FlightPage)
+async def bulk_flights_endpoint(
+    request: Request,
+    departure_date: str = Query(default=datetime.date.today().strftime("%Y-%m-%d"), description="The desired departure date in YYYY-MM-DD format."),
+    count: int = Query(100_000, ge=1, le=BULK_MAX_FLIGHTS, description=f"The number of flights in the generated schedule (1-{BULK_MAX_FLIGHTS})."),
+    page: int = Query(0, ge=0, description="Zero-based page of the schedule to return."),
+    page_size: int = Query(20, ge=1, le=200, description="Number of flights per page (1-200)."),
+    seed: Optional[int] = Query(None, description="Random seed for a reproducible schedule."),
+    ):
+    """
+    Generates a whole schedule as column arrays and returns one page of it.
+    Only the flights on the requested page are built as Flight objects, and
+    the schedule is generated in a worker thread so the event loop keeps
+    serving other requests meanwhile.
+    """
+    await rate_limit(request, limit=5, window=60, service="flight-service")
+    schedule = await asyncio.to_thread(generate_schedule, parse_departure_date(departure_date), count, seed)
+    rows = range(page * page_size, min((page + 1) * page_size, len(schedule)))
+    return FastJSONResponse(FlightPage.model_construct(
+        total=len(schedule),
+        page=page,
+        pageSize=page_size,
+        flights=materialize_rows(schedule, rows)
+    ))
+
+@app.get("/flights/calendar", response_model=FareCalendar)
+async def fare_calendar_endpoint(
+    request: Request,
+    origin: str = Query(..., description="Departure airport code, e.g. LAX."),
+    destination: str = Query(..., description="Destination airport code, e.g. JFK."),
+    month: str = Query(default=datetime.date.today().strftime("%Y-%m"), description="The month to price in YYYY-MM format."),
+    ):
+    """
+    Returns the cheapest Economy/Business/First fare per day for a route
+    across a month, replacing one /flights request per day. Classes sold out
+    or cancelled since the schedule was generated don't count as available.
+    """
+    await rate_limit(request, limit=5, window=60, service="flight-service")
+    origin_code = parse_airport_code(origin)
+    destination_code = parse_airport_code(destination)
+    if origin_code == destination_code:
+        raise HTTPException(status_code=400, detail="Origin and destination must be different airports.")
+    try:
+        first_day = datetime.datetime.strptime(month, "%Y-%m").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid month format. Please use YYYY-MM.")
+
+    # A cold month builds up to 31 days of inventory, so keep it off the event loop.
+    fares = await asyncio.to_thread(
+        flight_inventory.fare_calendar, origin_code, destination_code, first_day.year, first_day.month, live_state
+    )
+    days = []
+    for offset, day_fares in enumerate(fares.tolist()):
+        days.append(FareCalendarDay(
+            date=first_day + datetime.timedelta(days=offset),
+            prices={c: (None if math.isnan(p) else round(p, 2)) for c, p in zip(flight_classes, day_fares)}
+        ))
+    return FareCalendar(
+        origin=airport_codes[origin_code],
+        destination=airport_codes[destination_code],
+        month=first_day.strftime("%Y-%m"),
+        days=days
+    )
+
+@app.get("/flights/roundtrip", response_model=List[RoundTrip])
+async def roundtrip_endpoint(
+    request: Request,
+    origin: str = Query(..., description="Departure airport code, e.g. LAX."),
+    destination: str = Query(..., description="Destination airport code, e.g. JFK."),
+    departure_date: str = Query(..., description="Outbound departure date in YYYY-MM-DD format."),
+    return_date: str = Query(..., description="Return departure date in YYYY-MM-DD format."),
+    sort_by: Literal['price', 'duration'] = Query('price', description="Rank combinations by total price or total duration."),
+    seat_class: FlightClass = Query('Economy', description="Class to price and check seats in."),
+    min_turnaround: int = Query(60, ge=0, description="Minimum minutes between landing and the return departure."),
+    count: int = Query(5, ge=1, le=20, description="The number of combinations to return (1-20)."),
+    ):
+    """
+    Returns the best outbound/return combinations for a round trip.
+    """
+    await rate_limit(request, limit=5, window=60, service="flight-service")
+    origin_code = parse_airport_code(origin)
+    destination_code = parse_airport_code(destination)
+    if origin_code == destination_code:
+        raise HTTPException(status_code=400, detail="Origin and destination must be different airports.")
+    outbound_date = parse_departure_date(departure_date)
+    inbound_date = parse_departure_date(return_date)
+    if inbound_date < outbound_date:
+        raise HTTPException(status_code=400, detail="Return date must not be before the departure date.")
+
+    def search_pairs() -> List[RoundTrip]:
+        outbound_day = flight_inventory.day(outbound_date)
+        inbound_day = flight_inventory.day(inbound_date)
+        outbound_rows = outbound_day.search(origin_code, destination_code, sort_by=sort_by, seat_class=seat_class, available_only=True, live=live_state, limit=None)
+        inbound_rows = inbound_day.search(destination_code, origin_code, sort_by=sort_by, seat_class=seat_class, available_only=True, live=live_state, limit=None)
+
+        if sort_by == 'price':
+            class_index = flight_classes.index(seat_class)
+            outbound_keys = outbound_day.schedule.prices[outbound_rows, class_index].tolist()
+            inbound_keys = inbound_day.schedule.prices[inbound_rows, class_index].tolist()
+        else:
+            outbound_keys = outbound_day.schedule.data['duration_minutes'][outbound_rows].tolist()
+            inbound_keys = inbound_day.schedule.data['duration_minutes'][inbound_rows].tolist()
+
+        # Times in minutes after midnight of the outbound date, to check that the
+        # return flight leaves after the outbound one has landed.
+        day_gap = (inbound_date - outbound_date).days * 24 * 60
+        outbound_arrivals = (outbound_day.schedule.data['departure_minute'][outbound_rows].astype(int)
+                             + outbound_day.schedule.data['duration_minutes'][outbound_rows]).tolist()
+        inbound_departures = (inbound_day.schedule.data['departure_minute'][inbound_rows].astype(int) + day_gap).tolist()
+
+        pairs = k_best_pairs(
+            outbound_keys,
+            inbound_keys,
+            count,
+            compatible=lambda i, j: inbound_departures[j] >= outbound_arrivals[i] + min_turnaround
+        )
+
+        results = []
+        for i, j in pairs:
+            outbound, = build_flights(outbound_day.schedule, [outbound_rows[i]])
+            inbound, = build_flights(inbound_day.schedule, [inbound_rows[j]])
+            duration_minutes = int(outbound_day.schedule.data['duration_minutes'][outbound_rows[i]]
+                                   + inbound_day.schedule.data['duration_minutes'][inbound_rows[j]])
+            results.append(RoundTrip(
+                outbound=outbound,
+                returnFlight=inbound,
+                totalPrice=round(outbound.prices[seat_class] + inbound.prices[seat_class], 2),
+                totalDuration=format_minutes(duration_minutes),
+                totalDurationMinutes=duration_minutes,
+                seatClass=seat_class
+            ))
+        return results
+
+    return await asyncio.to_thread(search_pairs)
+
+@app.get("/flights/itineraries", response_model=List[Itinerary])
+async def itineraries_endpoint(
+    request: Request,
+    origin: str = Query(..., description="Departure airport code, e.g. LAX."),
+    destination: str = Query(..., description="Destination airport code, e.g. JFK."),
+    departure_date: str = Query(default=datetime.date.today().strftime("%Y-%m-%d"), description="The desired departure date in YYYY-MM-DD format."),
+    optimize: Literal['price', 'duration'] = Query('price', description="Return the cheapest or the fastest itineraries first."),
+    seat_class: FlightClass = Query('Economy', description="Class to price and check seats in."),
+    max_connections: int = Query(1, ge=0, le=3, description="Maximum number of connections (0-3)."),
+    min_layover: int = Query(45, ge=0, le=24 * 60, description="Minimum connection time in minutes."),
+    count: int = Query(5, ge=1, le=20, description="The number of itineraries to return (1-20)."),
+    ):
+    """
+    Finds the best itineraries between two airports on a date, connecting
+    scheduled flights with at least the minimum layover between legs.
+    """
+    await rate_limit(request, limit=5, window=60, service="flight-service")
+    origin_code = parse_airport_code(origin)
+    destination_code = parse_airport_code(destination)
+    if origin_code == destination_code:
+        raise HTTPException(status_code=400, detail="Origin and destination must be different airports.")
+
+    departure_date_obj = parse_departure_date(departure_date)
+    # Checking every leg's live state is a round trip to the seat inventory,
+    # so search in a worker thread.
+    itineraries = await asyncio.to_thread(
+        route_planner.search,
+        departure_date_obj,
+        origin_code,
+        destination_code,
+        optimize=optimize,
+        seat_class=seat_class,
+        max_connections=max_connections,
+        min_layover=min_layover,
+        limit=count,
+        live=live_state,
+    )
+
+    def build_legs() -> List[List[Flight]]:
+        schedule = flight_inventory.day(departure_date_obj).schedule
+        return [build_flights(schedule, itinerary.rows) for itinerary in itineraries]
+
+    results = []
+    for itinerary, legs in zip(itineraries, await asyncio.to_thread(build_legs)):
+        results.append(Itinerary(
+            legs=legs,
+            connections=len(legs) - 1,
+            departureTime=legs[0].departureTime,
+            arrivalTime=legs[-1].arrivalTime,
+            duration=format_minutes(itinerary.arrival_minute - itinerary.departure_minute),
+            durationMinutes=itinerary.arrival_minute - itinerary.departure_minute,
+            totalPrice=itinerary.price,
+            seatClass=seat_class
+        ))
+    return results
+
+@app.get("/flights/status")
+async def flight_status_feed_endpoint(
+    request: Request,
+    flights: str = Query(..., description="Comma-separated DATE:FLIGHTNUMBER pairs to watch, e.g. 2025-09-01:DE1234,2025-09-01:UN567"),
+    ):
+    """
+    Streams status and gate changes of the given flights as Server-Sent
+    Events. Each flight's current status is sent first, then every change as
+    it happens; idle streams get a keepalive comment every STATUS_KEEPALIVE
+    seconds.
+    """
+    await rate_limit(request, limit=5, window=60, service="flight-service")
+    pairs = [pair.strip() for pair in flights.split(',') if pair.strip()]
+    if not pairs or len(pairs) > 50:
+        raise HTTPException(status_code=400, detail="Watch between 1 and 50 flights.")
+
+    initial = []
+    for pair in pairs:
+        departure_date, _, flight_number = pair.partition(':')
+        flight = find_flight_or_404(departure_date, flight_number)
+        initial.append(FlightStatus(
+            departureDate=flight.departureTime.date(),
+            flightNumber=flight.flightNumber,
+            **current_status(flight)
+        ))
+    keys = list(dict.fromkeys((s.departureDate.isoformat(), s.flightNumber) for s in initial))
+
+    async def events():
+        queue = status_feed.subscribe(keys)
+        try:
+            for status in initial:
+                yield status_event(status.model_dump(mode='json'))
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=STATUS_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield status_event(event, event['id'])
+        finally:
+            status_feed.unsubscribe(queue, keys)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/flights/{departure_date}/{flight_number}", response_model=Flight)
+async def get_flight_endpoint(departure_date: str, flight_number: str, request: Request):
+    """
+    Returns a single flight by departure date and flight number, e.g.
+    /flights/2025-09-01/DE1234, for booking and flight status pages.
+    """
+    await rate_limit(request, limit=5, window=60, service="flight-service")
+    return FastJSONResponse(await asyncio.to_thread(find_flight_or_404, departure_date, flight_number))
+
+def get_status_admin(authorization: str = Header(None)) -> dict:
+    """
+    Returns the payload of the bearer token in the Authorization header.
+    Raises a 401 without a valid token and a 403 unless its user is one of
+    FLIGHT_STATUS_ADMINS.
     """
-    Endpoint for the list of flights for a given departure date.
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        raise HTTPException(status_code=401, detail="Authorization header missing or invalid")
+    try:
+        payload = jwt.decode(token.strip(), SECRET_KEY, algorithms=[ALGORITHM])
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token has expired")
+    except jwt.PyJWTError as e:
+        raise HTTPException(status_code=401, detail=f"Invalid token: {e}")
+    user_id = payload.get('user_id', payload.get('userid'))
+    if not {str(user_id), payload.get('email')} & FLIGHT_STATUS_ADMINS:
+        raise HTTPException(status_code=403, detail="Not allowed to change flight statuses")
+    return payload
+
+@app.put("/flights/{departure_date}/{flight_number}/status", response_model=FlightStatus)
+async def update_flight_status_endpoint(
+    departure_date: str,
+    flight_number: str,
+    update: FlightStatusUpdate,
+    request: Request,
+    admin: dict = Depends(get_status_admin),
+):
     """
-    return generate_fake_flights(departure_date, count)
+    Changes a flight's status and/or gate and notifies everyone watching it
+    on the status feed. Requires the JWT of a user in FLIGHT_STATUS_ADMINS.
+    """
+    await rate_limit(request, limit=5, window=60, service="flight-service")
+    flight = await asyncio.to_thread(find_flight_or_404, departure_date, flight_number)
+    departure_date = flight.departureTime.date().isoformat()
+    event = status_feed.publish(departure_date, flight.flightNumber, current_status(flight), update.status, update.gate)
+    current = event or current_status(flight)
+    return FlightStatus(
+        departureDate=departure_date,
+        flightNumber=flight.flightNumber,
+        status=current['status'],
+        gate=current['gate']
+    )
+
+@app.post("/flights/holds", response_model=SeatHold, status_code=201)
+async def hold_seats_endpoint(hold_request: SeatHoldRequest, request: Request):
+    """
+    Holds seats on a flight while the client checks out. Held seats are taken
+    off sale at the current fare until the hold is confirmed, released or
+    expires.
+    """
+    await rate_limit(request, limit=5, window=60, service="flight-service")
+    # Make sure the flight's counters exist before taking seats from them.
+    flight = await asyncio.to_thread(find_flight_or_404, hold_request.departureDate.isoformat(), hold_request.flightNumber)
+    try:
+        hold = await asyncio.to_thread(
+            seat_inventory.hold,
+            hold_request.departureDate.isoformat(),
+            flight.flightNumber,
+            hold_request.seatClass,
+            hold_request.quantity
+        )
+    except (KeyError, redis.RedisError):
+        # KeyError: seeding the flight's counters failed, so no seats are known.
+        raise HTTPException(status_code=503, detail="Seat inventory is unavailable")
+    if hold is None:
+        raise HTTPException(status_code=409, detail=f"Not enough {hold_request.seatClass} seats left on {flight.flightNumber}")
+    return seat_hold_response(hold)
+
+@app.post("/flights/holds/{hold_id}/confirm", response_model=SeatHold)
+async def confirm_hold_endpoint(hold_id: str, request: Request):
+    """
+    Confirms a hold, turning the held seats into a sale.
+    """
+    await rate_limit(request, limit=5, window=60, service="flight-service")
+    try:
+        hold = await asyncio.to_thread(seat_inventory.confirm, hold_id)
+    except redis.RedisError:
+        raise HTTPException(status_code=503, detail="Seat inventory is unavailable")
+    if hold is None:
+        raise HTTPException(status_code=409, detail="Hold not found, expired or already used")
+    return seat_hold_response(hold)
+
+@app.delete("/flights/holds/{hold_id}")
+async def release_hold_endpoint(hold_id: str, request: Request):
+    """
+    Releases a hold and puts its seats back on sale.
+    """
+    await rate_limit(request, limit=5, window=60, service="flight-service")
+    try:
+        released = await asyncio.to_thread(seat_inventory.release, hold_id)
+    except redis.RedisError:
+        raise HTTPException(status_code=503, detail="Seat inventory is unavailable")
+    if not released:
+        raise HTTPException(status_code=404, detail="Hold not found, expired or already used")
+    return {"message": "Hold released", "holdId": hold_id}
 
 @app.get("/")
 async def root(request: Request):
@@ -208,7 +816,9 @@ async def root(request: Request):
     return {
         "message": "Welcome to the Fake Flight Generator Microservice!",
         "documentation_url": "/docs",
-        "generate_flights_example": "/flights/generate?departure_date=2025-09-01&count=5"
+        "generate_flights_example": "/flights/generate?departure_date=2025-09-01&count=5",
+        "route_search_example": "/flights?departure_date=2025-09-01&origin=LAX&destination=JFK&sort_by=price",
+        "status_feed_example": "/flights/status?flights=2025-09-01:DE1234"
     }
 
 if __name__ == "__main__":
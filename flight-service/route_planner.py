@@ -0,0 +1,262 @@
+"""
+Connecting-itinerary search over a day's flight schedule.
+
+Every scheduled flight is a leg in a time-dependent graph between airports.
+Itineraries are found with a best-first (Dijkstra) search over partial
+itineraries, which yields them in increasing cost order, so the first ``k``
+complete ones are the k best. Instead of pushing every possible next leg when
+a partial itinerary is expanded, candidate legs are kept in per-airport lists
+pre-sorted by the cost they add; only the cheapest valid candidate is pushed
+and each popped candidate pushes its next sibling. That keeps the heap
+proportional to the work actually done rather than to the fan-out.
+"""
+import datetime
+import heapq
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from flight_inventory import DayInventory, FlightInventory, LiveState
+from flight_schedule import airport_codes, flight_classes, statuses
+
+
+MAX_CACHED_GRAPHS = 14
+
+
+class Itinerary(NamedTuple):
+    rows: Tuple[int, ...]  # schedule rows of each leg, in travel order
+    price: float
+    departure_minute: int
+    arrival_minute: int
+
+
+class DayGraph:
+    """
+    Per-day adjacency lists of bookable legs, sorted for each objective.
+    """
+
+    def __init__(self, day: DayInventory):
+        data = day.schedule.data
+        origin = data['origin'].astype(np.int64)
+        destination = data['destination'].astype(np.int64)
+        departure = data['departure_minute'].astype(np.int64)
+        arrival = departure + data['duration_minutes']
+
+        # The search walks legs one at a time, where plain lists beat NumPy
+        # scalar indexing, so per-leg attributes are kept as lists.
+        self.destination: List[int] = destination.tolist()
+        self.departure: List[int] = departure.tolist()
+        self.arrival: List[int] = arrival.tolist()
+        self.bookable: List[bool] = (data['status'] != statuses.index('Cancelled')).tolist()
+        fares = day.schedule.prices
+        self.prices: Dict[str, List[float]] = {c: fares[:, i].tolist() for i, c in enumerate(flight_classes)}
+        self.seats: Dict[str, List[int]] = {c: data['seats'][:, i].tolist() for i, c in enumerate(flight_classes)}
+        self.flight_numbers: List[str] = [day.schedule.flight_number(row) for row in range(len(data))]
+
+        n_airports = len(airport_codes)
+        objectives = {'arrival': arrival, 'duration': data['duration_minutes']}
+        for i, seat_class in enumerate(flight_classes):
+            objectives[seat_class] = fares[:, i]
+
+        # objective -> airport -> rows departing that airport, cheapest first
+        self.by_airport: Dict[str, List[List[int]]] = {}
+        # objective -> (airport, destination) -> rows on that route, cheapest first
+        self.by_route: Dict[str, Dict[Tuple[int, int], List[int]]] = {}
+        for name, metric in objectives.items():
+            order = np.lexsort((departure, metric, origin))
+            bounds = np.searchsorted(origin[order], np.arange(n_airports + 1))
+            airports = [order[bounds[a]:bounds[a + 1]] for a in range(n_airports)]
+            self.by_airport[name] = [rows.tolist() for rows in airports]
+            self.by_route[name] = {
+                (a, b): rows[destination[rows] == b].tolist()
+                for a, rows in enumerate(airports)
+                for b in range(n_airports)
+            }
+
+
+class RoutePlanner:
+    """
+    Answers k-best connecting itinerary queries with memoized per-day graphs.
+    """
+
+    def __init__(self, inventory: FlightInventory, max_graphs: int = MAX_CACHED_GRAPHS):
+        self.inventory = inventory
+        self.max_graphs = max_graphs
+        self._graphs: "OrderedDict[Tuple[datetime.date, int], DayGraph]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def graph(self, departure_date: datetime.date) -> DayGraph:
+        # Graphs carry prices, so they are memoized per price table version too.
+        key = (departure_date, self.inventory.price_version)
+        with self._lock:
+            graph = self._graphs.get(key)
+            if graph is not None:
+                self._graphs.move_to_end(key)
+                return graph
+        graph = DayGraph(self.inventory.day(departure_date))
+        with self._lock:
+            graph = self._graphs.setdefault(key, graph)
+            self._graphs.move_to_end(key)
+            while len(self._graphs) > self.max_graphs:
+                self._graphs.popitem(last=False)
+        return graph
+
+    def warm(self, dates: List[datetime.date]):
+        """
+        Builds the graphs for ``dates`` at the current price version ahead of
+        the first search that needs them.
+        """
+        for departure_date in dates:
+            self.graph(departure_date)
+
+    def search(
+        self,
+        departure_date: datetime.date,
+        origin: int,
+        destination: int,
+        optimize: str = 'price',
+        seat_class: str = 'Economy',
+        max_connections: int = 1,
+        min_layover: int = 45,
+        limit: int = 5,
+        live: Optional[LiveState] = None,
+    ) -> List[Itinerary]:
+        """
+        Returns up to ``limit`` itineraries from ``origin`` to ``destination``,
+        cheapest (``optimize='price'``) or fastest (``optimize='duration'``) first.
+        Legs that are cancelled or sold out in their ``live`` state, when
+        given, are not used.
+        """
+        graph = self.graph(departure_date)
+        prices = graph.prices[seat_class]
+        seats = graph.seats[seat_class]
+        destinations = graph.destination
+        departures = graph.departure
+        arrivals = graph.arrival
+        bookable = graph.bookable
+        if live is not None:
+            seats, bookable = list(seats), list(bookable)
+            live_seats, live_statuses = live(departure_date, graph.flight_numbers)
+            for row, counts in enumerate(live_seats):
+                if counts:
+                    seats[row] = counts.get(seat_class, seats[row])
+            for row, status in enumerate(live_statuses):
+                if status is not None:
+                    bookable[row] = status != 'Cancelled'
+
+        # Candidate legs are ordered by the cost they add to a partial
+        # itinerary: their price, or for the fastest search their arrival time
+        # (their own duration when they are the first leg).
+        if optimize == 'price':
+            first_objective = next_objective = seat_class
+        else:
+            first_objective, next_objective = 'duration', 'arrival'
+
+        def cost_of(path_cost: float, path_start: int, row: int) -> float:
+            if optimize == 'price':
+                return path_cost + prices[row]
+            start = path_start if path_start >= 0 else departures[row]
+            return float(arrivals[row] - start)
+
+        def candidates(airport: int, first: bool, legs_left: int) -> List[int]:
+            objective = first_objective if first else next_objective
+            # The last allowed leg has to land at the destination.
+            if legs_left == 1:
+                return graph.by_route[objective][(airport, destination)]
+            return graph.by_airport[objective][airport]
+
+        def next_valid(rows: List[int], pos: int, earliest: int, visited: Tuple[int, ...]) -> int:
+            while pos < len(rows):
+                row = rows[pos]
+                if (bookable[row] and seats[row] > 0 and departures[row] >= earliest
+                        and destinations[row] not in visited):
+                    return pos
+                pos += 1
+            return -1
+
+        results: List[Itinerary] = []
+        pops: Dict[int, int] = {}
+        heap: list = []
+        counter = 0
+
+        # A heap entry is a candidate: ``parent`` (a partial itinerary) extended
+        # by the leg at ``rows[pos]``.
+        def push_candidate(parent: Tuple, rows: List[int], pos: int):
+            nonlocal counter
+            path, path_cost, path_start, path_arrival, visited = parent
+            counter += 1
+            heapq.heappush(heap, (cost_of(path_cost, path_start, rows[pos]), counter, parent, rows, pos))
+
+        def expand(parent: Tuple):
+            path, _, _, path_arrival, visited = parent
+            legs_left = max_connections + 1 - len(path)
+            if legs_left <= 0:
+                return
+            airport = destinations[path[-1]] if path else origin
+            earliest = path_arrival + min_layover if path else 0
+            rows = candidates(airport, not path, legs_left)
+            pos = next_valid(rows, 0, earliest, visited)
+            if pos >= 0:
+                push_candidate(parent, rows, pos)
+
+        expand(((), 0.0, -1, 0, (origin,)))
+        while heap and len(results) < limit:
+            _, _, parent, rows, pos = heapq.heappop(heap)
+            path, path_cost, path_start, path_arrival, visited = parent
+
+            # The sibling is the next-cheapest way to extend the same parent.
+            earliest = path_arrival + min_layover if path else 0
+            sibling = next_valid(rows, pos + 1, earliest, visited)
+            if sibling >= 0:
+                push_candidate(parent, rows, sibling)
+
+            row = rows[pos]
+            new_path = path + (row,)
+            new_start = path_start if path_start >= 0 else departures[row]
+            new_cost = path_cost + prices[row]
+
+            if destinations[row] == destination:
+                results.append(Itinerary(new_path, round(new_cost, 2), new_start, arrivals[row]))
+                continue
+
+            # Each leg only needs expanding as often as results are wanted:
+            # later expansions through it can only lead to worse itineraries.
+            pops[row] = pops.get(row, 0) + 1
+            if pops[row] > limit:
+                continue
+            expand((new_path, new_cost, new_start, arrivals[row], visited + (destinations[row],)))
+
+        return results
+
+
+def k_best_pairs(
+    first: Sequence[float],
+    second: Sequence[float],
+    k: int,
+    compatible: Optional[Callable[[int, int], bool]] = None,
+) -> List[Tuple[int, int]]:
+    """
+    Returns up to ``k`` index pairs (i, j) with the smallest
+    ``first[i] + second[j]``, in increasing order, without building the full
+    cross product. Both sequences must be sorted ascending.
+
+    Starting from (0, 0), every popped pair pushes (i + 1, j) and (i, j + 1),
+    so at most ~2k pairs are ever looked at when all pairs are compatible.
+    Pairs rejected by ``compatible`` are skipped but still expanded.
+    """
+    if not len(first) or not len(second) or k <= 0:
+        return []
+    heap = [(first[0] + second[0], 0, 0)]
+    seen = {(0, 0)}
+    pairs: List[Tuple[int, int]] = []
+    while heap and len(pairs) < k:
+        _, i, j = heapq.heappop(heap)
+        if compatible is None or compatible(i, j):
+            pairs.append((i, j))
+        for ni, nj in ((i + 1, j), (i, j + 1)):
+            if ni < len(first) and nj < len(second) and (ni, nj) not in seen:
+                seen.add((ni, nj))
+                heapq.heappush(heap, (first[ni] + second[nj], ni, nj))
+    return pairs
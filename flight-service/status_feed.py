@@ -0,0 +1,110 @@
+"""
+In-process publish/subscribe for flight status and gate changes.
+
+Subscribers register an ``asyncio.Queue`` for the (departure date, flight
+number) pairs they follow. A change is applied once to the override table
+that flight responses are built from and then put on the queue of every
+subscriber of that flight, so one change costs one broadcast no matter how
+many clients are watching. All methods are meant to be called from the
+event loop.
+"""
+import asyncio
+import datetime
+import os
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Events buffered per subscriber; a slow client loses the oldest ones first
+STATUS_QUEUE_SIZE = int(os.getenv("STATUS_QUEUE_SIZE", 100))
+# Seconds between keepalive comments on an idle stream
+STATUS_KEEPALIVE = int(os.getenv("STATUS_KEEPALIVE", 15))
+# Seconds between random status/gate changes to watched flights, for demos
+# only; 0 (the default) leaves real flights alone
+STATUS_SIMULATION_INTERVAL = int(os.getenv("STATUS_SIMULATION_INTERVAL", 0))
+
+FlightKey = Tuple[str, str]  # (departure date, flight number)
+
+
+class StatusFeed:
+    """
+    Current status overrides plus the subscribers of each flight.
+    """
+
+    def __init__(self, queue_size: int = STATUS_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Dict[FlightKey, Set[asyncio.Queue]] = {}
+        self._overrides: Dict[FlightKey, Dict[str, str]] = {}
+        self._event_id = 0
+
+    def subscribe(self, keys: Iterable[FlightKey]) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        for key in keys:
+            self._subscribers.setdefault(key, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue, keys: Iterable[FlightKey]):
+        for key in keys:
+            queues = self._subscribers.get(key)
+            if queues is None:
+                continue
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[key]
+
+    def watched(self) -> List[FlightKey]:
+        """
+        Returns the flights that currently have at least one subscriber.
+        """
+        return list(self._subscribers)
+
+    def current(self, departure_date: str, flight_number: str) -> Optional[Dict[str, str]]:
+        """
+        Returns the status/gate override of a flight, or None if unchanged.
+        """
+        return self._overrides.get((departure_date, flight_number))
+
+    def publish(
+        self,
+        departure_date: str,
+        flight_number: str,
+        previous: Dict[str, str],
+        status: Optional[str] = None,
+        gate: Optional[str] = None,
+    ) -> Optional[Dict]:
+        """
+        Records a change against the flight's ``previous`` status and gate and
+        fans it out to subscribers. Returns the event, or None if nothing
+        actually changed.
+        """
+        status = status or previous['status']
+        gate = gate or previous['gate']
+        if status == previous['status'] and gate == previous['gate']:
+            return None
+
+        key = (departure_date, flight_number)
+        self._overrides[key] = {'status': status, 'gate': gate}
+        self._event_id += 1
+        event = {
+            'id': self._event_id,
+            'departureDate': departure_date,
+            'flightNumber': flight_number,
+            'status': status,
+            'gate': gate,
+            'previousStatus': previous['status'],
+            'previousGate': previous['gate'],
+            'updatedAt': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        }
+        for queue in self._subscribers.get(key, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+        return event
+
+    def prune(self, before: datetime.date) -> int:
+        """
+        Drops overrides of flights that departed before ``before``.
+        """
+        cutoff = before.isoformat()
+        stale = [key for key in self._overrides if key[0] < cutoff]
+        for key in stale:
+            del self._overrides[key]
+        return len(stale)
@@ -16,6 +16,20 @@ async function getFlight() {
   );
 }
 
+async function getBulkFlights() {
+  const res = await fetch(`${BASE_URL}/flights/bulk?departure_date=2023-10-01&count=100000&page=2&page_size=10&seed=42`, {
+    method: "GET",
+    headers: {
+      "Content-Type": "application/json",
+      "X-Client-ID": "test-client-id",
+    },
+  });
+
+  const data = await res.json();
+  console.log(
+    `Get bulk flights response: ${res.status} - total ${data.total}, page ${data.page} - ${JSON.stringify(data.flights, null, 2)}`
+  );
+}
 
 
 function sleep(ms) {
@@ -59,6 +73,9 @@ async function testRateLimit() {
 getFlight().then(() => {
   console.log("Get flights test completed.");
 });
+getBulkFlights().then(() => {
+  console.log("Get bulk flights test completed.");
+});
 testRateLimit().then(() => {
   console.log("Rate limit test completed.");
 });
@@ -0,0 +1,86 @@
+import datetime
+
+import numpy as np
+import pytest
+
+import fare_engine
+from fare_engine import FareEngine
+from flight_inventory import FlightInventory
+from flight_snapshot import SnapshotStore
+
+
+TODAY = datetime.date(2030, 5, 17)
+
+
+@pytest.fixture
+def inventory(monkeypatch):
+    monkeypatch.setattr(fare_engine, "REPRICE_DAYS", 3)
+    return FlightInventory(flights_per_day=300, snapshots=SnapshotStore(None))
+
+
+class FakeSeats:
+    def __init__(self, live):
+        self.live = live
+
+    def get_many(self, departure_date, flight_numbers):
+        day = self.live.get(departure_date, {})
+        return [day.get(flight_number) for flight_number in flight_numbers]
+
+
+def test_reprice_publishes_a_new_version_over_the_same_rows(inventory):
+    engine = FareEngine(inventory)
+    base = inventory.base_day(TODAY)
+
+    assert engine.reprice(TODAY) == 1
+    assert inventory.price_version == 1
+    day = inventory.day(TODAY)
+    assert day is not base
+    assert day.schedule.data is base.schedule.data
+    assert not np.array_equal(day.schedule.prices, base.schedule.prices)
+
+    engine.reprice(TODAY)
+    assert inventory.price_version == 2
+    assert inventory.base_day(TODAY) is base
+
+
+def test_fares_stay_within_bounds_of_the_base_fare(inventory):
+    FareEngine(inventory).reprice(TODAY)
+    for offset in range(3):
+        departure_date = TODAY + datetime.timedelta(days=offset)
+        base = inventory.base_day(departure_date).schedule.prices
+        prices = inventory.day(departure_date).schedule.prices
+        assert np.all(prices >= np.round(0.5 * base, 2) - 0.01)
+        assert np.all(prices <= np.round(3.0 * base, 2) + 0.01)
+
+
+def test_searched_routes_get_dearer(inventory):
+    engine = FareEngine(inventory)
+    data = inventory.base_day(TODAY).schedule.data
+    origin, destination = int(data['origin'][0]), int(data['destination'][0])
+    on_route = (data['origin'] == origin) & (data['destination'] == destination)
+
+    engine.reprice(TODAY)
+    quiet = inventory.day(TODAY).schedule.prices.copy()
+    for _ in range(50):
+        engine.record_search(TODAY, origin, destination)
+    engine.reprice(TODAY)
+    busy = inventory.day(TODAY).schedule.prices
+
+    assert np.all(busy[on_route] > quiet[on_route])
+    assert (busy[on_route] / quiet[on_route]).min() > (busy[~on_route] / quiet[~on_route]).max()
+    # Demand is consumed by the run that used it.
+    engine.reprice(TODAY)
+    assert np.array_equal(inventory.day(TODAY).schedule.prices, quiet)
+
+
+def test_fuller_flights_get_dearer(inventory):
+    day = inventory.base_day(TODAY)
+    flight_number = day.schedule.flight_number(0)
+    FareEngine(inventory).reprice(TODAY)
+    empty = inventory.day(TODAY).schedule.prices[0].copy()
+
+    live = {TODAY.isoformat(): {flight_number: {'Economy': 1, 'Business': 1, 'First': 1}}}
+    FareEngine(inventory, FakeSeats(live)).reprice(TODAY)
+    full = inventory.day(TODAY).schedule.prices[0]
+    assert np.all(full >= empty)
+    assert full[0] > empty[0]
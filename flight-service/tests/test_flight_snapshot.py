@@ -0,0 +1,93 @@
+import datetime
+import json
+import os
+
+import numpy as np
+
+from flight_inventory import FlightInventory
+from flight_schedule import SCHEDULE_DTYPE, generate_schedule
+from flight_snapshot import SnapshotStore
+
+
+DAY = datetime.date(2030, 5, 17)
+
+
+def test_saved_days_load_back_read_only(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    schedule = generate_schedule(DAY, 50, seed=1)
+    store.save(DAY, schedule.data)
+
+    data = store.load(DAY, 50)
+    assert isinstance(data, np.memmap)
+    assert not data.flags.writeable
+    assert data.dtype == SCHEDULE_DTYPE
+    assert np.array_equal(data, schedule.data)
+
+
+def test_missing_or_mismatched_snapshots_load_as_none(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    assert store.load(DAY, 50) is None
+    store.save(DAY, generate_schedule(DAY, 50, seed=1).data)
+    assert store.load(DAY, 60) is None
+    assert store.load(DAY + datetime.timedelta(days=1), 50) is None
+
+
+def test_disabled_store_keeps_nothing():
+    store = SnapshotStore(None)
+    store.save(DAY, generate_schedule(DAY, 10, seed=1).data)
+    assert store.load(DAY, 10) is None
+    assert store.prune(DAY) == 0
+
+
+def test_changed_string_table_drops_snapshots(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    store.save(DAY, generate_schedule(DAY, 50, seed=1).data)
+    table_path = tmp_path / "strings.json"
+    table = json.loads(table_path.read_text())
+    table["airport_codes"] = table["airport_codes"][::-1]
+    table_path.write_text(json.dumps(table))
+
+    store = SnapshotStore(str(tmp_path))
+    assert store.load(DAY, 50) is None
+    assert json.loads(table_path.read_text())["airport_codes"] != table["airport_codes"]
+
+
+def test_prune_removes_only_earlier_days(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    for offset in range(4):
+        departure_date = DAY + datetime.timedelta(days=offset)
+        store.save(departure_date, generate_schedule(departure_date, 10, seed=offset).data)
+    assert store.prune(DAY + datetime.timedelta(days=2)) == 2
+    assert store.load(DAY + datetime.timedelta(days=1), 10) is None
+    assert store.load(DAY + datetime.timedelta(days=2), 10) is not None
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_prune_can_remove_days_past_a_window(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    for offset in range(4):
+        departure_date = DAY + datetime.timedelta(days=offset)
+        store.save(departure_date, generate_schedule(departure_date, 10, seed=offset).data)
+    assert store.prune(DAY + datetime.timedelta(days=1), until=DAY + datetime.timedelta(days=3)) == 2
+    assert [store.load(DAY + datetime.timedelta(days=offset), 10) is not None for offset in range(4)] == [False, True, True, False]
+
+
+def test_inventory_maps_the_same_day_across_instances(tmp_path):
+    today = datetime.date.today()
+    first = FlightInventory(flights_per_day=100, snapshots=SnapshotStore(str(tmp_path))).base_day(today)
+    second = FlightInventory(flights_per_day=100, snapshots=SnapshotStore(str(tmp_path))).base_day(today)
+    assert isinstance(second.schedule.data, np.memmap)
+    assert np.array_equal(first.schedule.data, second.schedule.data)
+    assert np.array_equal(second.schedule.data, generate_schedule(today, 100, seed=today.toordinal()).data)
+
+
+def test_only_days_in_the_snapshot_window_are_written(tmp_path):
+    today = datetime.date.today()
+    inventory = FlightInventory(flights_per_day=100, snapshots=SnapshotStore(str(tmp_path)), snapshot_days=3)
+    for departure_date in [today - datetime.timedelta(days=1), today + datetime.timedelta(days=3), datetime.date(9999, 12, 1)]:
+        day = inventory.base_day(departure_date)
+        assert np.array_equal(day.schedule.data, generate_schedule(departure_date, 100, seed=departure_date.toordinal()).data)
+    assert not list(tmp_path.glob("flights-*.npy"))
+
+    inventory.warm(today, days=5)
+    assert len(list(tmp_path.glob("flights-*.npy"))) == 3
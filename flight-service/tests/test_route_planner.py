@@ -0,0 +1,135 @@
+import datetime
+import itertools
+import random
+
+import pytest
+
+from flight_inventory import FlightInventory
+from flight_schedule import airport_codes, flight_classes
+from flight_snapshot import SnapshotStore
+from route_planner import RoutePlanner, k_best_pairs
+
+
+DAY = datetime.date(2030, 5, 17)
+MIN_LAYOVER = 45
+
+
+@pytest.fixture(scope="module")
+def planner():
+    return RoutePlanner(FlightInventory(flights_per_day=400, snapshots=SnapshotStore(None)))
+
+
+def all_itineraries(graph, origin, destination, seat_class, max_connections, seats=None, bookable=None):
+    """
+    Every valid itinerary, found by trying every sequence of legs.
+    """
+    seats = seats or graph.seats[seat_class]
+    bookable = bookable or graph.bookable
+    found = []
+
+    def extend(path, visited):
+        airport = graph.destination[path[-1]] if path else origin
+        # Every leg departing the airport, whatever the objective orders them by
+        for row in graph.by_airport['arrival'][airport]:
+            if not bookable[row] or seats[row] <= 0 or graph.destination[row] in visited:
+                continue
+            if path and graph.departure[row] < graph.arrival[path[-1]] + MIN_LAYOVER:
+                continue
+            legs = path + (row,)
+            if graph.destination[row] == destination:
+                found.append(legs)
+            elif len(legs) <= max_connections:
+                extend(legs, visited + (graph.destination[row],))
+
+    extend((), (origin,))
+    return found
+
+
+def leg_origins(graph):
+    return {row: airport for airport, rows in enumerate(graph.by_airport['arrival']) for row in rows}
+
+
+@pytest.mark.parametrize("optimize", ["price", "duration"])
+@pytest.mark.parametrize("max_connections", [0, 1, 2])
+def test_search_matches_brute_force(planner, optimize, max_connections):
+    graph = planner.graph(DAY)
+    origin_of = leg_origins(graph)
+    rng = random.Random(max_connections)
+    for _ in range(8):
+        origin, destination = rng.sample(range(len(airport_codes)), 2)
+        seat_class = rng.choice(flight_classes)
+        limit = rng.randint(1, 8)
+        found = planner.search(DAY, origin, destination, optimize, seat_class, max_connections, MIN_LAYOVER, limit)
+
+        prices = graph.prices[seat_class]
+        itineraries = all_itineraries(graph, origin, destination, seat_class, max_connections)
+        if optimize == 'price':
+            expected = sorted(round(sum(prices[leg] for leg in legs), 2) for legs in itineraries)
+            assert [itinerary.price for itinerary in found] == pytest.approx(expected[:limit])
+        else:
+            expected = sorted(graph.arrival[legs[-1]] - graph.departure[legs[0]] for legs in itineraries)
+            assert [itinerary.arrival_minute - itinerary.departure_minute for itinerary in found] == expected[:limit]
+
+        for itinerary in found:
+            assert origin_of[itinerary.rows[0]] == origin
+            assert graph.destination[itinerary.rows[-1]] == destination
+            for first, second in zip(itinerary.rows, itinerary.rows[1:]):
+                assert origin_of[second] == graph.destination[first]
+                assert graph.departure[second] >= graph.arrival[first] + MIN_LAYOVER
+
+
+def test_search_skips_legs_cancelled_or_sold_out_live(planner):
+    graph = planner.graph(DAY)
+    origin, destination = 0, 1
+    cheapest = planner.search(DAY, origin, destination, limit=3)
+    assert cheapest
+    sold_out, cancelled = cheapest[0].rows[0], cheapest[1].rows[0] if len(cheapest) > 1 else None
+
+    def live(departure_date, flight_numbers):
+        assert departure_date == DAY
+        seats = [None] * len(flight_numbers)
+        statuses = [None] * len(flight_numbers)
+        seats[sold_out] = {'Economy': 0}
+        if cancelled is not None:
+            statuses[cancelled] = 'Cancelled'
+        return seats, statuses
+
+    found = planner.search(DAY, origin, destination, limit=10, live=live)
+    used = {row for itinerary in found for row in itinerary.rows}
+    assert sold_out not in used
+    assert cancelled not in used
+
+    seats = list(graph.seats['Economy'])
+    seats[sold_out] = 0
+    bookable = list(graph.bookable)
+    if cancelled is not None:
+        bookable[cancelled] = False
+    prices = graph.prices['Economy']
+    expected = sorted(
+        round(sum(prices[leg] for leg in legs), 2)
+        for legs in all_itineraries(graph, origin, destination, 'Economy', 1, seats, bookable)
+    )
+    assert [itinerary.price for itinerary in found] == pytest.approx(expected[:10])
+
+
+def test_graphs_are_memoized_per_price_version(planner):
+    assert planner.graph(DAY) is planner.graph(DAY)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_k_best_pairs_matches_cross_product(seed):
+    rng = random.Random(seed)
+    first = sorted(round(rng.uniform(50, 500), 2) for _ in range(rng.randint(0, 30)))
+    second = sorted(round(rng.uniform(50, 500), 2) for _ in range(rng.randint(0, 30)))
+    k = rng.randint(0, 40)
+    blocked = {(rng.randrange(31), rng.randrange(31)) for _ in range(20)} if seed % 2 else set()
+
+    pairs = k_best_pairs(first, second, k, lambda i, j: (i, j) not in blocked)
+    expected = sorted(
+        first[i] + second[j]
+        for i, j in itertools.product(range(len(first)), range(len(second)))
+        if (i, j) not in blocked
+    )[:k]
+    assert [first[i] + second[j] for i, j in pairs] == pytest.approx(expected)
+    assert len(set(pairs)) == len(pairs)
+    assert not blocked & set(pairs)
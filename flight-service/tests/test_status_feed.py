@@ -0,0 +1,64 @@
+import datetime
+
+from status_feed import StatusFeed
+
+
+PREVIOUS = {'status': 'On Time', 'gate': 'A1'}
+
+
+def test_changes_reach_every_subscriber_of_the_flight():
+    feed = StatusFeed()
+    first = feed.subscribe([("2030-05-17", "DE100")])
+    second = feed.subscribe([("2030-05-17", "DE100"), ("2030-05-17", "UN200")])
+    other = feed.subscribe([("2030-05-17", "UN200")])
+
+    event = feed.publish("2030-05-17", "DE100", PREVIOUS, status="Delayed")
+    assert event['status'] == 'Delayed' and event['gate'] == 'A1'
+    assert event['previousStatus'] == 'On Time'
+    assert first.get_nowait() is event
+    assert second.get_nowait() is event
+    assert other.empty()
+    assert feed.current("2030-05-17", "DE100") == {'status': 'Delayed', 'gate': 'A1'}
+
+
+def test_publishing_no_change_is_a_no_op():
+    feed = StatusFeed()
+    queue = feed.subscribe([("2030-05-17", "DE100")])
+    assert feed.publish("2030-05-17", "DE100", PREVIOUS, status="On Time", gate="A1") is None
+    assert queue.empty()
+    assert feed.current("2030-05-17", "DE100") is None
+
+
+def test_event_ids_increase():
+    feed = StatusFeed()
+    first = feed.publish("2030-05-17", "DE100", PREVIOUS, gate="B2")
+    second = feed.publish("2030-05-17", "DE101", PREVIOUS, gate="B3")
+    assert second['id'] == first['id'] + 1
+
+
+def test_slow_subscribers_lose_the_oldest_events():
+    feed = StatusFeed(queue_size=2)
+    queue = feed.subscribe([("2030-05-17", "DE100")])
+    for gate in ("B1", "B2", "B3"):
+        feed.publish("2030-05-17", "DE100", PREVIOUS, gate=gate)
+    assert [queue.get_nowait()['gate'] for _ in range(2)] == ["B2", "B3"]
+
+
+def test_unsubscribe_stops_delivery_and_forgets_idle_flights():
+    feed = StatusFeed()
+    keys = [("2030-05-17", "DE100")]
+    queue = feed.subscribe(keys)
+    assert feed.watched() == keys
+    feed.unsubscribe(queue, keys)
+    assert feed.watched() == []
+    feed.publish("2030-05-17", "DE100", PREVIOUS, status="Cancelled")
+    assert queue.empty()
+
+
+def test_prune_drops_overrides_of_departed_flights():
+    feed = StatusFeed()
+    feed.publish("2030-05-16", "DE100", PREVIOUS, status="Delayed")
+    feed.publish("2030-05-17", "DE100", PREVIOUS, status="Delayed")
+    assert feed.prune(datetime.date(2030, 5, 17)) == 1
+    assert feed.current("2030-05-16", "DE100") is None
+    assert feed.current("2030-05-17", "DE100") is not None
@@ -0,0 +1,249 @@
+"""
+Stable, indexed per-city hotel catalogs behind a bounded TTL cache.
+
+A city's hotels are seeded from the (city, state) pair itself, so every build
+of a catalog has the same hotels with the same ids, and responses (and their
+ETags) stay the same from one request to the next. Built catalogs are kept
+for ``ttl`` seconds in an LRU of ``size`` cities. Builds are single-flight:
+when a cold city is requested by many threads at once, one builds it and the
+others wait for that build instead of repeating it.
+
+Each catalog indexes its hotels for filtered search the way the car fleet
+does: amenities are bit flags, with an inverted index of packed bitmaps (one
+bit per hotel) per amenity and per vendor, and hotels are pre-sorted by
+rating and by cheapest room. Requiring several amenities is an AND of their
+bitmaps, and a price range is a binary search over the price order. A grid
+index over the hotels' coordinates answers radius and bounding-box filters
+and nearest-first ordering.
+"""
+import hashlib
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from geo_index import GridIndex, haversine_km
+from hotel_catalog import amenitiesList, hotel_summary, vendors
+
+
+HOTELS_PER_CITY = int(os.getenv("HOTELS_PER_CITY", 100))
+HOTEL_CATALOG_CACHE_SIZE = int(os.getenv("HOTEL_CATALOG_CACHE_SIZE", 256))  # cities
+HOTEL_CATALOG_TTL = float(os.getenv("HOTEL_CATALOG_TTL", 600))  # seconds
+
+
+def catalog_key(city: str, state: str) -> Tuple[str, str]:
+    """
+    Normalizes a location, so "new york"/"ny" and "New York"/"NY" share a
+    catalog.
+    """
+    return city.strip().title(), state.strip().upper()
+
+
+class CityCatalog:
+    """
+    The hotels of one city: their seeds, search summaries and indexes, in
+    catalog order.
+    """
+
+    def __init__(self, city: str, state: str, size: int = HOTELS_PER_CITY):
+        self.city = city
+        self.state = state
+        digest = hashlib.blake2b(f"{city}|{state}".encode(), digest_size=8).digest()
+        rng = random.Random(int.from_bytes(digest, "big"))
+        self.seeds: List[int] = [rng.getrandbits(64) for _ in range(size)]
+        self.summaries: List[Dict] = [hotel_summary(seed, city, state) for seed in self.seeds]
+        self.rows: Dict[str, int] = {summary['_id']: i for i, summary in enumerate(self.summaries)}
+
+        # Bit i set when the hotel has amenitiesList[i]
+        self.amenity_bits = np.array(
+            [sum(1 << amenitiesList.index(amenity) for amenity in summary['amenities']) for summary in self.summaries],
+            dtype=np.uint32,
+        )
+        self.vendor_code = np.array([vendors.index(summary['vendor']) for summary in self.summaries], dtype=np.int8)
+        self.rating = np.array([summary['rating'] for summary in self.summaries])
+        self.min_price = np.array([summary['minPrice'] for summary in self.summaries])
+        self.latitude = np.array([summary['latitude'] for summary in self.summaries])
+        self.longitude = np.array([summary['longitude'] for summary in self.summaries])
+        self.grid = GridIndex(self.latitude, self.longitude)
+
+        # Hotels sorted by each sort key (ties in catalog order), with the
+        # price column in that order for binary search
+        self.orders: Dict[str, np.ndarray] = {
+            'rating': np.argsort(-self.rating, kind='stable'),
+            'price': np.argsort(self.min_price, kind='stable'),
+        }
+        self.sorted_price = self.min_price[self.orders['price']]
+
+        # amenity / vendor code -> packed bitmap of the hotels that have it
+        self.amenity_index: Dict[int, np.ndarray] = {
+            code: np.packbits((self.amenity_bits >> code) & 1 == 1) for code in range(len(amenitiesList))
+        }
+        self.vendor_index: Dict[int, np.ndarray] = {
+            int(code): np.packbits(self.vendor_code == code) for code in np.unique(self.vendor_code)
+        }
+
+    def __len__(self) -> int:
+        return len(self.seeds)
+
+    def search(
+        self,
+        amenities: Optional[List[str]] = None,
+        vendor: Optional[str] = None,
+        min_rating: Optional[float] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        near: Optional[Tuple[float, float]] = None,
+        radius_km: Optional[float] = None,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        sort_by: str = 'rating',
+        cursor: int = 0,
+        limit: int = 20,
+    ) -> Tuple[np.ndarray, Optional[int]]:
+        """
+        Returns up to ``limit`` catalog rows of hotels that have every one of
+        ``amenities`` and match the other filters, in ``sort_by`` order (best
+        rated, cheapest or nearest to ``near`` first) from position
+        ``cursor`` of that order, and the cursor of the next page (None on
+        the last page). Amenity names must be in ``amenitiesList``.
+
+        ``near`` is a (latitude, longitude) point; with ``radius_km`` only
+        hotels within that distance of it match, and sorting by 'distance'
+        needs it. ``bbox`` is a (south, west, north, east) box the hotels
+        must lie in.
+        """
+        bitmap = None
+        for amenity in amenities or []:
+            bitmap = self._and(bitmap, self.amenity_index[amenitiesList.index(amenity)])
+        if vendor is not None:
+            codes = [code for code, name in enumerate(vendors) if name.lower() == vendor.lower()]
+            vendor_bitmap = self.vendor_index.get(codes[0]) if codes else None
+            if vendor_bitmap is None:
+                return np.empty(0, dtype=np.intp), None
+            bitmap = self._and(bitmap, vendor_bitmap)
+
+        candidates = None
+        if bbox is not None:
+            candidates = self._rows_mask(self.grid.within_box(*bbox))
+        nearby = None
+        if near is not None and radius_km is not None:
+            nearby, _ = self.grid.within_radius(*near, radius_km)
+        elif near is not None and sort_by == 'distance':
+            nearby = np.argsort(haversine_km(*near, self.latitude, self.longitude), kind='stable')
+
+        if sort_by == 'distance':
+            order = nearby
+        else:
+            order = self.orders[sort_by]
+            if nearby is not None:
+                candidates = self._and(candidates, self._rows_mask(nearby))
+        start, end = 0, len(order)
+        if sort_by == 'price':
+            # The price range is a contiguous block of the price order.
+            if min_price is not None:
+                start = int(np.searchsorted(self.sorted_price, min_price, side='left'))
+            if max_price is not None:
+                end = int(np.searchsorted(self.sorted_price, max_price, side='right'))
+        start = max(start, cursor)
+        rows = order[start:end]
+        positions = np.arange(start, max(start, end))
+
+        mask = None if bitmap is None else np.unpackbits(bitmap, count=len(self)).view(bool)[rows]
+        if candidates is not None:
+            mask = self._and(mask, candidates[rows])
+        if sort_by != 'price':
+            if min_price is not None:
+                mask = self._and(mask, self.min_price[rows] >= min_price)
+            if max_price is not None:
+                mask = self._and(mask, self.min_price[rows] <= max_price)
+        if min_rating is not None:
+            mask = self._and(mask, self.rating[rows] >= min_rating)
+
+        if mask is not None:
+            rows = rows[mask]
+            positions = positions[mask]
+        if len(rows) <= limit:
+            return rows, None
+        return rows[:limit], int(positions[limit])
+
+    def _rows_mask(self, rows: np.ndarray) -> np.ndarray:
+        mask = np.zeros(len(self), dtype=bool)
+        mask[rows] = True
+        return mask
+
+    def distances(self, rows: np.ndarray, latitude: float, longitude: float) -> np.ndarray:
+        """
+        Returns the distances in km of the given hotels from a point.
+        """
+        return haversine_km(latitude, longitude, self.latitude[rows], self.longitude[rows])
+
+    @staticmethod
+    def _and(mask: Optional[np.ndarray], condition: np.ndarray) -> np.ndarray:
+        return condition if mask is None else mask & condition
+
+
+class CityCatalogCache:
+    """
+    Catalogs by (city, state), built with ``build(city, state)`` on a miss.
+    """
+
+    def __init__(
+        self,
+        build: Callable[[str, str], CityCatalog] = CityCatalog,
+        size: int = HOTEL_CATALOG_CACHE_SIZE,
+        ttl: float = HOTEL_CATALOG_TTL,
+    ):
+        self._build = build
+        self.size = size
+        self.ttl = ttl
+        self._catalogs: "OrderedDict[Tuple[str, str], Tuple[float, CityCatalog]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # key -> lock held by the thread building that catalog
+        self._building: Dict[Tuple[str, str], threading.Lock] = {}
+
+    def _fresh(self, key: Tuple[str, str]) -> Optional[CityCatalog]:
+        with self._lock:
+            entry = self._catalogs.get(key)
+            if entry is None:
+                return None
+            expires, catalog = entry
+            if expires <= time.monotonic():
+                del self._catalogs[key]
+                return None
+            self._catalogs.move_to_end(key)
+            return catalog
+
+    def cached(self, city: str, state: str) -> Optional[CityCatalog]:
+        """
+        Returns the city's catalog if it is cached and fresh, without building.
+        """
+        return self._fresh(catalog_key(city, state))
+
+    def get(self, city: str, state: str) -> CityCatalog:
+        """
+        Returns the city's catalog, building it if needed. Blocks while
+        another thread builds the same city.
+        """
+        key = catalog_key(city, state)
+        catalog = self._fresh(key)
+        if catalog is not None:
+            return catalog
+
+        with self._lock:
+            build_lock = self._building.setdefault(key, threading.Lock())
+        with build_lock:
+            # Whoever held the lock before us may have just built it.
+            catalog = self._fresh(key)
+            if catalog is not None:
+                return catalog
+            catalog = self._build(*key)
+            with self._lock:
+                self._catalogs[key] = (time.monotonic() + self.ttl, catalog)
+                self._catalogs.move_to_end(key)
+                while len(self._catalogs) > self.size:
+                    self._catalogs.popitem(last=False)
+                self._building.pop(key, None)
+        return catalog
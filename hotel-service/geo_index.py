@@ -0,0 +1,116 @@
+"""
+Grid index over latitude/longitude points for radius and bounding-box queries.
+
+Points are bucketed into square cells of ``cell_deg`` degrees and stored
+sorted by cell, so each cell is a contiguous slice of one array. A query
+only looks at the cells its area overlaps and filters those points exactly,
+so its cost follows the number of nearby points, not the size of the index.
+Longitudes are not wrapped: areas must not cross the antimeridian.
+"""
+import math
+import os
+from typing import Dict, Tuple
+
+import numpy as np
+
+
+EARTH_RADIUS_KM = 6371.0
+# Length of a degree of latitude on the same sphere haversine_km measures on,
+# so a box built with offset() covers every point within that distance
+KM_PER_DEGREE = EARTH_RADIUS_KM * math.pi / 180
+GRID_CELL_KM = float(os.getenv("GRID_CELL_KM", 1.0))
+
+
+def haversine_km(latitude, longitude, latitudes, longitudes) -> np.ndarray:
+    """
+    Great-circle distances in km from one point to an array of points.
+    """
+    lat1, lon1 = np.radians(latitude), np.radians(longitude)
+    lat2, lon2 = np.radians(latitudes), np.radians(longitudes)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def offset(latitude: float, longitude: float, north_km: float, east_km: float) -> Tuple[float, float]:
+    """
+    Returns the point ``north_km`` north and ``east_km`` east of a point.
+    """
+    return (
+        latitude + north_km / KM_PER_DEGREE,
+        longitude + east_km / (KM_PER_DEGREE * math.cos(math.radians(latitude))),
+    )
+
+
+class GridIndex:
+    """
+    Points by grid cell. Query results are indexes into the given arrays.
+    """
+
+    def __init__(self, latitudes, longitudes, cell_km: float = GRID_CELL_KM):
+        self.latitudes = np.asarray(latitudes, dtype=np.float64)
+        self.longitudes = np.asarray(longitudes, dtype=np.float64)
+        self.cell_deg = cell_km / KM_PER_DEGREE
+
+        cell_rows, cell_cols = self._cell(self.latitudes), self._cell(self.longitudes)
+        self.order = np.lexsort((cell_cols, cell_rows))
+        # (cell row, cell column) -> slice of ``order`` holding its points
+        self.cells: Dict[Tuple[int, int], slice] = {}
+        if len(self.order):
+            keys = np.stack((cell_rows[self.order], cell_cols[self.order]), axis=1)
+            boundaries = np.flatnonzero(np.any(np.diff(keys, axis=0) != 0, axis=1)) + 1
+            starts = np.concatenate(([0], boundaries))
+            ends = np.concatenate((boundaries, [len(self.order)]))
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                self.cells[(int(keys[start, 0]), int(keys[start, 1]))] = slice(start, end)
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def _cell(self, degrees):
+        return np.floor(np.asarray(degrees) / self.cell_deg).astype(np.int64)
+
+    def _candidates(self, south: float, west: float, north: float, east: float) -> np.ndarray:
+        """
+        Returns the points of every cell overlapping the box.
+        """
+        first_row, last_row = int(self._cell(south)), int(self._cell(north))
+        first_col, last_col = int(self._cell(west)), int(self._cell(east))
+        if (last_row - first_row + 1) * (last_col - first_col + 1) > len(self.cells):
+            # The box covers more cells than are occupied: walk those instead.
+            slices = [
+                span for (row, col), span in self.cells.items()
+                if first_row <= row <= last_row and first_col <= col <= last_col
+            ]
+        else:
+            slices = [
+                self.cells[(row, col)]
+                for row in range(first_row, last_row + 1)
+                for col in range(first_col, last_col + 1)
+                if (row, col) in self.cells
+            ]
+        if not slices:
+            return np.empty(0, dtype=np.intp)
+        return np.concatenate([self.order[span] for span in slices])
+
+    def within_box(self, south: float, west: float, north: float, east: float) -> np.ndarray:
+        """
+        Returns the points inside the box, in no particular order.
+        """
+        rows = self._candidates(south, west, north, east)
+        latitudes, longitudes = self.latitudes[rows], self.longitudes[rows]
+        inside = (latitudes >= south) & (latitudes <= north) & (longitudes >= west) & (longitudes <= east)
+        return rows[inside]
+
+    def within_radius(self, latitude: float, longitude: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the points within ``radius_km`` of a point, nearest first,
+        and their distances in km.
+        """
+        south, west = offset(latitude, longitude, -radius_km, -radius_km)
+        north, east = offset(latitude, longitude, radius_km, radius_km)
+        rows = self._candidates(south, west, north, east)
+        distances = haversine_km(latitude, longitude, self.latitudes[rows], self.longitudes[rows])
+        inside = distances <= radius_km
+        rows, distances = rows[inside], distances[inside]
+        nearest = np.argsort(distances, kind='stable')
+        return rows[nearest], distances[nearest]
@@ -0,0 +1,402 @@
+"""
+Seeded hotel generation, split into a list summary and an on-demand detail.
+
+A hotel is fully determined by its seed: ``hotel_summary`` draws only what a
+search result shows (name, vendor, address, rating, cheapest room,
+amenities), and ``hotel_detail`` replays the same draws and continues with
+the heavy sections (reviews, rooms, attractions, policies, FAQs). Lists pay
+for summaries only, and a detail is built when someone opens that hotel.
+
+Hotels are placed around their city's center, and every city has the pool's
+attractions placed around it too, seeded from the city. A hotel's nearby
+attractions are looked up in the city's grid index and carry their real
+distance from the hotel.
+"""
+import datetime
+import hashlib
+import math
+import os
+import random
+import uuid
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from geo_index import GridIndex, offset
+
+# Hotels whose detail can be opened after they were listed, most recent kept
+HOTEL_SOURCE_LIMIT = int(os.getenv("HOTEL_SOURCE_LIMIT", 100_000))
+# Built details kept for repeat views
+HOTEL_DETAIL_CACHE_SIZE = int(os.getenv("HOTEL_DETAIL_CACHE_SIZE", 1000))
+HOTEL_SPREAD_KM = 8.0  # hotels lie within this distance of the city center
+ATTRACTION_SPREAD_KM = 6.0
+NEARBY_ATTRACTION_KM = 5.0  # attractions listed in a hotel's detail, nearest first
+MAX_NEARBY_ATTRACTIONS = 5
+
+vendors = ['Marriott', 'Hilton', 'Hyatt', 'Sheraton', 'Radisson', 'InterContinental', 'Holiday Inn', 'Ritz-Carlton', 'Four Seasons', 'Wyndham']
+room_types = ['Standard', 'Deluxe', 'Suite']
+# (city, state) -> (latitude, longitude) of the center; other cities get a
+# stable made-up location within the contiguous US
+city_centers = {
+    ('New York', 'NY'): (40.7128, -74.0060), ('Los Angeles', 'CA'): (34.0522, -118.2437),
+    ('Chicago', 'IL'): (41.8781, -87.6298), ('Houston', 'TX'): (29.7604, -95.3698),
+    ('Phoenix', 'AZ'): (33.4484, -112.0740), ('Philadelphia', 'PA'): (39.9526, -75.1652),
+    ('San Antonio', 'TX'): (29.4241, -98.4936), ('San Diego', 'CA'): (32.7157, -117.1611),
+    ('Dallas', 'TX'): (32.7767, -96.7970), ('Austin', 'TX'): (30.2672, -97.7431),
+    ('San Francisco', 'CA'): (37.7749, -122.4194), ('Seattle', 'WA'): (47.6062, -122.3321),
+    ('Denver', 'CO'): (39.7392, -104.9903), ('Boston', 'MA'): (42.3601, -71.0589),
+    ('Miami', 'FL'): (25.7617, -80.1918), ('Orlando', 'FL'): (28.5383, -81.3792),
+    ('Atlanta', 'GA'): (33.7490, -84.3880), ('Las Vegas', 'NV'): (36.1699, -115.1398),
+    ('Nashville', 'TN'): (36.1627, -86.7816), ('New Orleans', 'LA'): (29.9511, -90.0715),
+    ('Washington', 'DC'): (38.9072, -77.0369), ('Portland', 'OR'): (45.5152, -122.6784),
+}
+streets = ['Main St', 'Ocean Blvd', '5th Ave', 'Sunset Rd', 'Market St', 'Elm St', 'Maple Ave', 'Broadway', 'Park Pl', 'Pine Ln', 'Grand Ave', 'University Dr', 'Highland Rd', 'Riverfront Pkwy', 'Liberty St', 'Willow Creek Ln', 'Cedarwood Blvd', 'Mill Pond Rd', 'Silverleaf Way', 'Forest Ridge Dr']
+
+hotelNames = [
+  'Azure Coast Retreat', 'Golden Bay Suites', 'CityView Inn', 'Palm Garden Lodge',
+  'Ocean Breeze Hotel', 'Downtown Deluxe', 'Harbor Haven', 'Skyline Resort',
+  'Desert Rose Oasis', 'Mountain Crest Lodge', 'Riverside Rendezvous',
+  'The Grand Central', 'Sunset Serenity Suites', 'Aqua Vista Resort',
+  'The Urban Nook', 'Tranquil Pines Inn', 'Crimson Sky Hotel',
+  'Sapphire Sands Resort', 'Emerald Gardens Hotel', 'Pinnacle Peak Lodge',
+  'Canyon Ridge Inn', 'Starfall Hotel & Suites', 'Lakeview Manor',
+  'The Gilded Compass', 'Vivid Bloom Resort', 'Orchid Heights Hotel',
+  'Moonlit Cove Inn', 'Terra Nova Suites',
+  'The Obsidian Palace', 'Whispering Pines Resort', 'Metropolitan Grand',
+  'Coral Sands Beachfront', 'Stone Creek Inn', 'The Beacon Hotel',
+  'Harmony Heights Retreat', 'Silver Stream Lodge', 'Olympus Towers',
+  'Mystic Falls Hotel', 'The Royal Bloom', 'Copperleaf Residences',
+  'Zephyr Sands Resort', 'Polaris Grand Hotel', 'Ironwood Manor',
+  'The Sanctuary Suites', 'Cascading Waters Hotel', 'The Velvet Sparrow Inn'
+]
+
+descriptions = [
+  'A luxurious stay near the city’s heart, featuring modern rooms and exceptional service.',
+  'Coastal bliss with scenic views and beach access.',
+  'Budget-friendly comfort close to major attractions and public transit.',
+  'Perfect for families and business travelers alike.',
+  'Contemporary hotel with full-service dining and rooftop views.',
+  'Nestled in a peaceful desert landscape, offering a serene escape with stunning views.',
+  'An eco-friendly retreat with lush gardens and sustainable practices.',
+  'Historic charm meets modern convenience in this beautifully restored hotel.',
+  'Ideal for adventurers, with easy access to hiking trails and outdoor activities.',
+  'Sophisticated urban living with state-of-the-art facilities and vibrant nightlife nearby.',
+  'Family-friendly resort featuring a water park, kids\' club, and diverse dining options.',
+  'Exclusive boutique hotel offering personalized service and unique, artfully designed rooms.',
+  'Overlooking the tranquil lake, a perfect spot for relaxation and water sports.',
+  'Experience unparalleled luxury with personalized concierge service and gourmet dining.',
+  'A vibrant and artistic hotel, perfect for creatives and those seeking inspiration.',
+  'Comfortable and convenient, located just minutes from the airport with shuttle service.',
+  'Charming countryside inn offering a cozy atmosphere and delicious home-cooked meals.',
+  'Modern design meets ultimate comfort in this new downtown hotspot.',
+  'Discover a hidden gem offering unparalleled tranquility, complete with a private beach and holistic wellness programs.',
+  'The quintessential business hotel, providing state-of-the-art conference facilities, executive lounges, and seamless connectivity.',
+  'Immerse yourself in local culture at this charming guesthouse, a short walk from historical landmarks and bustling markets.',
+  'An all-inclusive paradise designed for ultimate relaxation, featuring multiple pools, gourmet restaurants, and evening entertainment.',
+  'Your home away from home, these spacious suites come with fully equipped kitchens and separate living areas, perfect for extended stays.',
+  'Perched high above the city, enjoy panoramic skyline views from every room, complemented by a Michelin-starred restaurant and a rooftop bar.',
+  'A pet-friendly establishment that goes above and beyond, offering pet amenities, designated play areas, and special treats for your furry friends.',
+  'Experience sustainable luxury at its finest, with locally sourced cuisine, solar-powered facilities, and a commitment to environmental preservation.',
+  'This vibrant and trendy hotel boasts unique themed rooms, a lively lobby bar, and is situated in the heart of the city\'s entertainment district.',
+  'Designed for the discerning traveler, our hotel features bespoke services, an exclusive members-only lounge, and direct access to high-end shopping.',
+]
+
+reviewsPool = [
+  {'text': 'Exceptional service and spotless rooms. Truly a five-star experience!', 'rating': 5},
+  {'text': 'Amazing ocean view and very clean! Woke up to paradise every day.', 'rating': 5},
+  {'text': 'Would definitely stay again. Loved the breakfast spread; so many options!', 'rating': 4},
+  {'text': 'Not bad for the price, especially given the good location. A solid choice.', 'rating': 3},
+  {'text': 'Super friendly staff and cozy rooms. Felt very welcomed from arrival to departure.', 'rating': 4},
+  {'text': 'Close to everything important. Comfortable beds ensured a great night\'s sleep.', 'rating': 4},
+  {'text': 'Decent amenities overall, and elevator access was really helpful for our luggage.', 'rating': 3},
+  {'text': 'A bit noisy at night due to its very central location, but otherwise excellent.', 'rating': 3},
+  {'text': 'Loved the smart locks and seamless check-in process. Very modern and efficient.', 'rating': 5},
+  {'text': 'Fantastic pool area and friendly poolside service. The kids absolutely loved it!', 'rating': 5},
+  {'text': 'The hotel restaurant had delicious food and a truly great atmosphere for dinner.', 'rating': 4},
+  {'text': 'Quiet and relaxing, perfect for a peaceful getaway. Just what we needed.', 'rating': 5},
+  {'text': 'Great value for money, genuinely exceeded my expectations for a budget stay.', 'rating': 4},
+  {'text': 'Rooms were spacious and very well maintained, felt fresh and clean.', 'rating': 4},
+  {'text': 'The concierge was incredibly helpful with local tips and reservations. Top-notch assistance.', 'rating': 5},
+  {'text': 'Internet was fast and reliable, which was a huge plus for work and streaming.', 'rating': 4},
+  {'text': 'Parking was a bit tight, especially on busy nights, but we always found a spot eventually.', 'rating': 3},
+  {'text': 'Beautiful decor and very comfortable beds. Felt like a luxury stay without the huge price tag.', 'rating': 5},
+  {'text': 'An excellent choice for business travel; quiet, efficient, and well-equipped for meetings.', 'rating': 4},
+  {'text': 'Loved the direct beach access, truly wonderful to step right onto the sand!', 'rating': 5},
+  {'text': 'My only complaint was the slow check-in process; took longer than expected.', 'rating': 2},
+  {'text': 'The breakfast buffet was absolutely outstanding! Best I\'ve had in a hotel in years.', 'rating': 5},
+  {'text': 'Perfect for a family vacation, lots for the kids to do and great family-friendly amenities.', 'rating': 4},
+  {'text': 'Surprisingly quiet given its central location. Managed to get good rest despite being downtown.', 'rating': 4},
+  {'text': 'Could use an update in some areas, but still very clean and functional for a short stay.', 'rating': 3},
+  {'text': 'The gym facilities were top-notch and well-maintained. A great bonus for fitness enthusiasts.', 'rating': 4},
+  {'text': 'Hassle-free stay from start to finish. Staff went above and beyond to assist us.', 'rating': 5},
+  {'text': 'The view from our balcony was absolutely breathtaking. Worth every penny!', 'rating': 5},
+  {'text': 'Definitely recommend this place for a romantic escape; very charming and private.', 'rating': 5},
+  {'text': 'A bit far from major attractions, requiring taxis or public transport, but very peaceful.', 'rating': 3},
+  {'text': 'Excellent amenities for pets, truly pet-friendly with dedicated areas and treats.', 'rating': 5},
+  {'text': 'Room service was quick and the food was hot and delicious every time.', 'rating': 4},
+  {'text': 'Enjoyed the evening entertainment in the lobby, added a nice touch to the stay.', 'rating': 4},
+  {'text': 'Minor issue with the AC, but it was quickly resolved by maintenance.', 'rating': 3},
+  {'text': 'The beds were incredibly comfortable, honestly the best sleep I\'ve had in ages!', 'rating': 5},
+  {'text': 'Walking distance to many shops and restaurants, made exploring easy and fun.', 'rating': 4},
+  {'text': 'Good security measures in place, felt very safe throughout our stay.', 'rating': 4},
+  {'text': 'Loved the complimentary happy hour! A great way to unwind after a day of sightseeing.', 'rating': 5},
+  {'text': 'Friendly front desk staff but the wait for elevators was often long, especially during peak hours.', 'rating': 3},
+  {'text': 'The hotel grounds are beautiful and meticulously kept, felt very luxurious.', 'rating': 5},
+  {'text': 'Housekeeping was inconsistent; skipped our room one day, which was disappointing.', 'rating': 2},
+  {'text': 'The spa facilities were a wonderful addition, very relaxing and well-managed.', 'rating': 5},
+  {'text': 'Our room had a slight mildew smell, but it wasn\'t terrible enough to complain.', 'rating': 2},
+  {'text': 'The kids\' club was a lifesaver! Our children had a fantastic time and were well cared for.', 'rating': 5},
+  {'text': 'Located right next to a busy road, so expect some traffic noise, even on higher floors.', 'rating': 2},
+  {'text': 'The bar staff were incredibly attentive and made excellent cocktails.', 'rating': 4},
+  {'text': 'Pillows were a bit too soft for my liking, but that\'s a minor personal preference.', 'rating': 3},
+  {'text': 'The shuttle service was punctual and very convenient for getting to the convention center.', 'rating': 4},
+  {'text': 'We had an issue with a noisy neighbor, but the front desk handled it promptly and professionally.', 'rating': 4},
+  {'text': 'The decor felt a bit dated, but everything was clean and functional.', 'rating': 3},
+  {'text': 'Absolutely loved the rooftop pool and bar! Perfect for enjoying the sunset.', 'rating': 5},
+  {'text': 'The coffee shop in the lobby was a great perk for a quick morning pick-me-up.', 'rating': 4},
+  {'text': 'Valet parking was efficient and friendly, though a bit pricey.', 'rating': 3},
+  {'text': 'The view was partially obstructed by another building, which wasn\'t clear from the booking description.', 'rating': 2},
+  {'text': 'Every staff member we encountered was genuinely kind and helpful. Outstanding hospitality!', 'rating': 5},
+  {'text': 'The restaurant portions were small for the price, but the quality of food was high.', 'rating': 3},
+  {'text': 'Had a wonderful time exploring the nearby attractions, very convenient location for tourists.', 'rating': 4},
+  {'text': 'The check-out process was quick and smooth, no complaints there.', 'rating': 4},
+  {'text': 'Unfortunately, the hot water pressure was quite low during our stay.', 'rating': 2},
+  {'text': 'The communal areas were beautifully designed and comfortable.', 'rating': 4}
+]
+
+amenitiesList = ['Free Wi-Fi', 'Swimming Pool', 'Fitness Center', 'Spa', 'Restaurant',
+        'Bar/Lounge', 'Business Center', 'Conference Facilities', 'Room Service',
+        'Laundry Services', 'Gym', 'Indoor Pool', 'Outdoor Pool', 'Jacuzzi',
+        'Air Conditioning', 'Minibar', 'TV', 'Cable TV', 'Satellite TV', 'Internet']
+
+attractionsPool = [
+    {'name': 'Central Beach', 'type': 'Beach'},
+    {'name': 'City Museum', 'type': 'Museum'},
+    {'name': 'Downtown Park', 'type': 'Park'},
+    {'name': 'Shopping Center', 'type': 'Shopping Mall'},
+    {'name': 'Historic Theater', 'type': 'Theater'},
+    {'name': 'Waterfront Zoo', 'type': 'Zoo'},
+    {'name': 'Art Gallery', 'type': 'Art Gallery'},
+    {'name': 'Sports Stadium', 'type': 'Sports Stadium'}
+]
+
+faqPool = [
+    {'question': 'What time is check-in?', 'answer': 'Check-in is available from 3:00 PM.'},
+    {'question': 'Is parking available?', 'answer': 'Yes, complimentary parking is available for all guests.'},
+    {'question': 'Do you allow pets?', 'answer': 'Yes, we are a pet-friendly hotel with a small additional fee.'},
+    {'question': 'Is WiFi included?', 'answer': 'Yes, high-speed WiFi is complimentary throughout the hotel.'},
+    {'question': 'What amenities are available?', 'answer': 'We offer a fitness center, pool, spa, and restaurant.'},
+    {'question': 'Is there room service?', 'answer': 'Yes, 24-hour room service is available.'},
+    {'question': 'What is your cancellation policy?', 'answer': 'Cancellation policies vary by room type and booking rate.'}
+]
+
+usernamePool = ['TravelLover', 'AdventureSeeker', 'BusinessTraveler', 'FamilyFun', 'CoupleGetaway', 
+               'SoloExplorer', 'VacationVibes', 'CityBreaker', 'BeachBum', 'MountainHiker']
+
+
+def _seeded(*key: str) -> random.Random:
+    digest = hashlib.blake2b("|".join(key).encode(), digest_size=8).digest()
+    return random.Random(int.from_bytes(digest, "big"))
+
+
+def _scatter(rng: random.Random, center: Tuple[float, float], spread_km: float) -> Tuple[float, float]:
+    """
+    Returns a uniformly random point within ``spread_km`` of ``center``.
+    """
+    distance = spread_km * math.sqrt(rng.random())
+    bearing = rng.uniform(0, 2 * math.pi)
+    latitude, longitude = offset(*center, distance * math.cos(bearing), distance * math.sin(bearing))
+    return round(latitude, 6), round(longitude, 6)
+
+
+@lru_cache(maxsize=4096)
+def city_center(city: str, state: str) -> Tuple[float, float]:
+    center = city_centers.get((city, state))
+    if center is None:
+        rng = _seeded("center", city, state)
+        center = (round(rng.uniform(30.0, 47.0), 4), round(rng.uniform(-122.0, -75.0), 4))
+    return center
+
+
+class CityAttractions:
+    """
+    A city's attractions with a grid index over their coordinates.
+    """
+
+    def __init__(self, city: str, state: str):
+        rng = _seeded("attractions", city, state)
+        center = city_center(city, state)
+        self.attractions: List[Dict] = []
+        for attraction in attractionsPool:
+            latitude, longitude = _scatter(rng, center, ATTRACTION_SPREAD_KM)
+            self.attractions.append({**attraction, 'latitude': latitude, 'longitude': longitude})
+        self.index = GridIndex(
+            [attraction['latitude'] for attraction in self.attractions],
+            [attraction['longitude'] for attraction in self.attractions],
+        )
+
+    def near(self, latitude: float, longitude: float, radius_km: float = NEARBY_ATTRACTION_KM, limit: int = MAX_NEARBY_ATTRACTIONS) -> List[Dict]:
+        """
+        Returns the attractions within ``radius_km`` of a point, nearest
+        first, with their ``distance`` from it in km.
+        """
+        rows, distances = self.index.within_radius(latitude, longitude, radius_km)
+        return [
+            {**self.attractions[row], 'distance': round(float(distance), 2)}
+            for row, distance in zip(rows[:limit].tolist(), distances[:limit].tolist())
+        ]
+
+
+@lru_cache(maxsize=1024)
+def city_attractions(city: str, state: str) -> CityAttractions:
+    return CityAttractions(city, state)
+
+
+def _summary(seed: int, city: str, state: str) -> Tuple[Dict, random.Random, List[float], List[Dict]]:
+    """
+    Draws a hotel's summary fields. Returns them with the generator, ready
+    for the detail draws, the room prices and the reviews behind the rating.
+    """
+    rng = random.Random(seed)
+    hotel_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+    name = rng.choice(hotelNames)
+    vendor = rng.choice(vendors)
+    address = f"{rng.randint(100, 999)} {rng.choice(streets)}, {city}, {state}"
+    latitude, longitude = _scatter(rng, city_center(city, state), HOTEL_SPREAD_KM)
+    reviews = [rng.choice(reviewsPool) for _ in range(rng.randint(1, 10))]
+    prices = [float(rng.randint(50, 99) * (idx + 1)) for idx in range(len(room_types))]
+    amenities = rng.sample(amenitiesList, rng.randint(3, 8))
+
+    summary = {
+        '_id': hotel_id,
+        'name': name,
+        'vendor': vendor,
+        'address': address,
+        'city': city,
+        'state': state,
+        'country': "USA",
+        'latitude': latitude,
+        'longitude': longitude,
+        'rating': round(sum(review['rating'] for review in reviews) / len(reviews), 1),
+        'reviewCount': len(reviews),
+        'minPrice': min(prices),
+        'amenities': amenities,
+    }
+    return summary, rng, prices, reviews
+
+
+def hotel_summary(seed: int, city: str, state: str) -> Dict:
+    """
+    Returns the fields shown for a hotel in search results.
+    """
+    return _summary(seed, city, state)[0]
+
+
+def hotel_detail(seed: int, city: str, state: str) -> Dict:
+    """
+    Returns every field of the hotel, matching its summary.
+    """
+    summary, rng, prices, reviews = _summary(seed, city, state)
+    name = summary['name']
+    today = datetime.datetime.combine(datetime.date.today(), datetime.time())
+    site_name = name.lower().replace(' ', '').replace('&', 'and')
+
+    return {
+        '_id': summary['_id'],
+        'name': name,
+        'vendor': summary['vendor'],
+        'address': summary['address'],
+        'city': city,
+        'state': state,
+        'country': summary['country'],
+        'latitude': summary['latitude'],
+        'longitude': summary['longitude'],
+        'description': rng.choice(descriptions),
+        'postalCode': f"{rng.randint(10000, 99999)}",
+        'phoneNumber': f"+1-{rng.randint(100, 999)}-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+        'email': f"info@{site_name}.com",
+        'website': f"https://www.{site_name}.com",
+        'rating': summary['rating'],
+        'reviews': [
+            {
+                'username': rng.choice(usernamePool),
+                'rating': float(review['rating']),
+                'comment': review['text'],
+                'date': today - datetime.timedelta(days=rng.randint(1, 365)),
+            }
+            for review in reviews
+        ],
+        'roomDetails': [
+            {
+                'type': room,
+                'pricePerNight': price,
+                'mostPopular': room == 'Deluxe',
+                'cancellationPolicy': rng.choice(['Flexible', 'Moderate', 'Strict']),
+                'availableRooms': rng.randint(1, 10),
+            }
+            for room, price in zip(room_types, prices)
+        ],
+        'amenities': summary['amenities'],
+        'nearbyAttractions': city_attractions(city, state).near(summary['latitude'], summary['longitude']),
+        'policies': {
+            'checkin': {
+                'startTime': f"{rng.randint(14, 16)}:00",
+                'endTime': f"{rng.randint(18, 22)}:00",
+                'contactless': rng.choice([True, False]),
+                'express': rng.choice([True, False]),
+                'minAge': rng.randint(18, 21),
+            },
+            'checkout': {
+                'time': f"{rng.randint(10, 12)}:00",
+                'contactless': rng.choice([True, False]),
+                'express': rng.choice([True, False]),
+                'lateFeeApplicable': rng.choice([True, False]),
+            },
+            'petsAllowed': rng.choice([True, False]),
+            'childrenPolicy': rng.choice(['Children welcome', 'Adults only', 'Children allowed with supervision']),
+            'extraBeds': rng.choice(['Available upon request', 'Not available', 'Available for additional fee']),
+            'cribAvailability': rng.choice(['Available upon request', 'Not available', 'Available for additional fee']),
+            'accessMethods': ['Key Card', 'Mobile App', 'Digital Key'],
+            'safetyFeatures': ['Smoke Detectors', 'Fire Extinguishers', 'Security Cameras', '24/7 Front Desk'],
+            'houseKeepingPolicy': rng.choice(['Daily housekeeping', 'Housekeeping upon request', 'Every other day']),
+        },
+        'faq': [dict(faq) for faq in rng.sample(faqPool, rng.randint(2, 5))],
+    }
+
+
+class HotelDetails:
+    """
+    Details of listed hotels by id, built on first request.
+
+    Listing a hotel records where its detail comes from (seed, city and
+    state); the built details of the most recently opened hotels are kept.
+    """
+
+    def __init__(self, source_limit: int = HOTEL_SOURCE_LIMIT, cache_size: int = HOTEL_DETAIL_CACHE_SIZE):
+        self.source_limit = source_limit
+        self.cache_size = cache_size
+        self._sources: "OrderedDict[str, Tuple[int, str, str]]" = OrderedDict()
+        self._details: "OrderedDict[str, Dict]" = OrderedDict()
+
+    def remember(self, hotel_id: str, seed: int, city: str, state: str):
+        self._sources[hotel_id] = (seed, city, state)
+        self._sources.move_to_end(hotel_id)
+        if len(self._sources) > self.source_limit:
+            self._sources.popitem(last=False)
+
+    def get(self, hotel_id: str) -> Optional[Dict]:
+        """
+        Returns the hotel's detail, or None if it was never listed here.
+        """
+        detail = self._details.get(hotel_id)
+        if detail is not None:
+            self._details.move_to_end(hotel_id)
+            return detail
+        source = self._sources.get(hotel_id)
+        if source is None:
+            return None
+        detail = hotel_detail(*source)
+        self._details[hotel_id] = detail
+        if len(self._details) > self.cache_size:
+            self._details.popitem(last=False)
+        return detail
@@ -3,21 +3,26 @@ from fastapi import FastAPI, HTTPException, Depends, Query, status, Header, Requ
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from typing import Optional, List, Literal, Dict
+import asyncio
 import datetime
 import uvicorn
 import jwt
 import os
 import psycopg2
+import redis
 import uuid
-import random
 from dotenv import load_dotenv
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
 import json
 import sys
 
 # Add shared module to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'shared'))
 from redis_rate_limit import rate_limit
+from http_cache import conditional_json_response
+from hotel_catalog import HotelDetails, amenitiesList, room_types
+from room_inventory import RoomInventory, connect as connect_room_store
+from city_catalog import CityCatalog, CityCatalogCache
 
 
 load_dotenv() #loading env variables
@@ -125,11 +130,17 @@ if not test_db_connection():
     # You can choose to exit here if DB is critical: sys.exit(1)
     
     
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await asyncio.to_thread(load_room_reservations)
+    yield
+
 #fastapi  app
 app = FastAPI(
     title="Hotel Booking Service",
     description="Microservice for hotel booking and management",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -154,7 +165,7 @@ class RoomDetails(BaseModel):
     pricePerNight: float
     mostPopular: bool
     cancellationPolicy: str
-    availableRooms: int
+    availableRooms: int = Field(..., description="Rooms of this type in the hotel; see /hotels/{hotel_id}/availability for a stay")
 
 class Attraction(BaseModel):
     """
@@ -162,7 +173,9 @@ class Attraction(BaseModel):
     """
     name: str
     type: attraction
-    distance: float
+    distance: float = Field(..., description="Distance from the hotel in km")
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
 
 class Review(BaseModel):
     """
@@ -224,6 +237,8 @@ class Hotel(BaseModel):
     city: str
     state: str
     country: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     description: str
     postalCode: str
     phoneNumber: str
@@ -237,6 +252,25 @@ class Hotel(BaseModel):
     policies: HotelPolicy
     faq: List[FAQ]
     
+class HotelSummary(BaseModel):
+    """
+    The fields of a hotel shown in search results.
+    """
+    id: str = Field(alias="_id")
+    name: str
+    vendor: vendorNames
+    address: str
+    city: str
+    state: str
+    country: str
+    latitude: float
+    longitude: float
+    rating: float
+    reviewCount: int
+    minPrice: float
+    amenities: List[str]
+    distanceKm: Optional[float] = Field(None, description="Distance from the searched point, when one is given")
+
 class HotelTemplate(BaseModel):
     name: str
     vendor: List[str]
@@ -314,6 +348,73 @@ def get_current_user(authorization: str = Header(None)) -> dict:
     
     return verify_token(token)
 
+async def find_hotel(hotel_id: str, city: Optional[str] = None, state: Optional[str] = None) -> Optional[dict]:
+    """
+    Returns a hotel's detail, looking it up in the catalog of ``city`` if
+    this worker has not listed the hotel recently (or ever).
+    """
+    hotel = hotel_detail_cache.get(hotel_id)
+    if hotel is None and city and state:
+        catalog = await city_catalog(city, state)
+        row = catalog.rows.get(hotel_id)
+        if row is not None:
+            hotel_detail_cache.remember(hotel_id, catalog.seeds[row], catalog.city, catalog.state)
+            hotel = hotel_detail_cache.get(hotel_id)
+    return hotel
+
+async def reserve_rooms(booking_request: "BookingRequest") -> dict:
+    """
+    Takes the requested rooms for every night of the stay in the room
+    inventory and returns the stay. Raises a 409 if they are not all free.
+    """
+    hotel = booking_request.hotel
+    if booking_request.check_out is None or booking_request.room_type is None:
+        raise HTTPException(status_code=400, detail="check_in, check_out and room_type are required to reserve rooms")
+    if booking_request.room_type not in room_types:
+        raise HTTPException(status_code=400, detail=f"room_type must be one of {', '.join(room_types)}")
+    details = await find_hotel(hotel.id, hotel.city, hotel.state)
+    if details is None:
+        raise HTTPException(status_code=404, detail="Hotel not found")
+    capacity = [room['availableRooms'] for room in details['roomDetails']]
+    try:
+        reserved = await asyncio.to_thread(
+            room_inventory.reserve,
+            hotel.id,
+            capacity,
+            room_types.index(booking_request.room_type),
+            booking_request.check_in,
+            booking_request.check_out,
+            booking_request.rooms,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except redis.RedisError:
+        raise HTTPException(status_code=503, detail="Room inventory is unavailable, try again later")
+    if not reserved:
+        raise HTTPException(status_code=409, detail=f"Not enough {booking_request.room_type} rooms free for those dates")
+    return {
+        'hotelId': hotel.id,
+        'roomType': booking_request.room_type,
+        'checkIn': booking_request.check_in.isoformat(),
+        'checkOut': booking_request.check_out.isoformat(),
+        'rooms': booking_request.rooms,
+    }
+
+def release_rooms(stay: dict):
+    """
+    Gives the rooms of a stay back to the room inventory.
+    """
+    try:
+        room_inventory.release(
+            stay['hotelId'],
+            room_types.index(stay['roomType']),
+            datetime.date.fromisoformat(stay['checkIn']),
+            datetime.date.fromisoformat(stay['checkOut']),
+            stay['rooms'],
+        )
+    except redis.RedisError as e:
+        print(f"Could not release rooms {stay}: {e}")
+
 # User model for response
 class User(BaseModel):
     user_id: str  # Changed from int to str to handle UUID
@@ -330,6 +431,29 @@ class BookingRequest(BaseModel):
     insurance: Optional[Insurance] = None
     total: float = Field(..., description="Total amount for the booking")
     trip_id: Optional[str] = None
+    check_in: Optional[datetime.date] = Field(None, description="First night of the stay; reserves rooms when given")
+    check_out: Optional[datetime.date] = Field(None, description="Day of departure")
+    room_type: Optional[str] = Field(None, description="Room type to reserve, e.g. Deluxe")
+    rooms: int = Field(1, ge=1, le=9, description="Number of rooms to reserve")
+
+class RoomAvailability(BaseModel):
+    """
+    Rooms of one type free for every night of a stay.
+    """
+    type: str
+    pricePerNight: float
+    availableRooms: int
+    totalPrice: float
+
+class HotelAvailability(BaseModel):
+    """
+    Represents the rooms of a hotel free for a stay.
+    """
+    id: str = Field(alias="_id")
+    checkIn: datetime.date
+    checkOut: datetime.date
+    nights: int
+    rooms: List[RoomAvailability]
 
 class BookingResponse(BaseModel):
     message: str
@@ -359,8 +483,15 @@ async def book_hotel(
     bookings_conn = None
     hotel_cursor = None
     bookings_cursor = None
+    stay = None
+    booked = False
     
     try:
+        # Reserve the nights before writing anything, so that two bookings
+        # can never both get the last room
+        if booking_request.check_in is not None:
+            stay = await reserve_rooms(booking_request)
+
         # Extract data from request model
         hotel = booking_request.hotel
         insurance = booking_request.insurance
@@ -390,6 +521,8 @@ async def book_hotel(
             
             # Convert hotel object to JSON with datetime handling
             hotel_data = hotel.dict()
+            if stay is not None:
+                hotel_data['stay'] = stay
 
             user_id_short = current_user['user_id'][:8]
             booking_reference = f"BK{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}{user_id_short}"
@@ -455,6 +588,7 @@ async def book_hotel(
             # Two-phase commit: both transactions must succeed
             hotel_conn.commit()
             bookings_conn.commit()
+            booked = True
             
         except Exception as db_error:
             # Rollback both transactions on any error
@@ -484,6 +618,8 @@ async def book_hotel(
             detail=f"Booking failed: {str(e)}"
         )
     finally:
+        if stay is not None and not booked:
+            release_rooms(stay)
         if hotel_cursor:
             hotel_cursor.close()
         if bookings_cursor:
@@ -635,11 +771,14 @@ async def delete_user_booking(
                         detail="Booking not found with the provided reference"
                     )
             
-            # Delete from hotelbookings table using the UUID
+            # Delete from hotelbookings table using the UUID, keeping the
+            # stay so its rooms can be given back
             hotel_cursor.execute("""
                 DELETE FROM hotelbookings
                 WHERE hotelbookingid = %s AND userid = %s
+                RETURNING bookingdetails -> 'stay'
             """, (booking_id, current_user["user_id"]))
+            deleted = hotel_cursor.fetchone()
             
             # Delete from user_bookings table
             if booking_id == request_body.hotelid:
@@ -658,6 +797,9 @@ async def delete_user_booking(
             # Two-phase commit: both deletions must succeed
             hotel_conn.commit()
             bookings_conn.commit()
+
+            if deleted and deleted[0] is not None:
+                release_rooms(deleted[0])
             
         except Exception as db_error:
             # Rollback both transactions on any error
@@ -719,272 +861,222 @@ async def root(request: Request):
 
 
 
-def getRandom(items: List[str]) -> str:
-    """
-    Returns a random element from the provided list.
-    """
-    return random.choice(items)
-
-hotelNames = [
-  'Azure Coast Retreat', 'Golden Bay Suites', 'CityView Inn', 'Palm Garden Lodge',
-  'Ocean Breeze Hotel', 'Downtown Deluxe', 'Harbor Haven', 'Skyline Resort',
-  'Desert Rose Oasis', 'Mountain Crest Lodge', 'Riverside Rendezvous',
-  'The Grand Central', 'Sunset Serenity Suites', 'Aqua Vista Resort',
-  'The Urban Nook', 'Tranquil Pines Inn', 'Crimson Sky Hotel',
-  'Sapphire Sands Resort', 'Emerald Gardens Hotel', 'Pinnacle Peak Lodge',
-  'Canyon Ridge Inn', 'Starfall Hotel & Suites', 'Lakeview Manor',
-  'The Gilded Compass', 'Vivid Bloom Resort', 'Orchid Heights Hotel',
-  'Moonlit Cove Inn', 'Terra Nova Suites',
-  'The Obsidian Palace', 'Whispering Pines Resort', 'Metropolitan Grand',
-  'Coral Sands Beachfront', 'Stone Creek Inn', 'The Beacon Hotel',
-  'Harmony Heights Retreat', 'Silver Stream Lodge', 'Olympus Towers',
-  'Mystic Falls Hotel', 'The Royal Bloom', 'Copperleaf Residences',
-  'Zephyr Sands Resort', 'Polaris Grand Hotel', 'Ironwood Manor',
-  'The Sanctuary Suites', 'Cascading Waters Hotel', 'The Velvet Sparrow Inn'
-]
-
-descriptions = [
-  'A luxurious stay near the city’s heart, featuring modern rooms and exceptional service.',
-  'Coastal bliss with scenic views and beach access.',
-  'Budget-friendly comfort close to major attractions and public transit.',
-  'Perfect for families and business travelers alike.',
-  'Contemporary hotel with full-service dining and rooftop views.',
-  'Nestled in a peaceful desert landscape, offering a serene escape with stunning views.',
-  'An eco-friendly retreat with lush gardens and sustainable practices.',
-  'Historic charm meets modern convenience in this beautifully restored hotel.',
-  'Ideal for adventurers, with easy access to hiking trails and outdoor activities.',
-  'Sophisticated urban living with state-of-the-art facilities and vibrant nightlife nearby.',
-  'Family-friendly resort featuring a water park, kids\' club, and diverse dining options.',
-  'Exclusive boutique hotel offering personalized service and unique, artfully designed rooms.',
-  'Overlooking the tranquil lake, a perfect spot for relaxation and water sports.',
-  'Experience unparalleled luxury with personalized concierge service and gourmet dining.',
-  'A vibrant and artistic hotel, perfect for creatives and those seeking inspiration.',
-  'Comfortable and convenient, located just minutes from the airport with shuttle service.',
-  'Charming countryside inn offering a cozy atmosphere and delicious home-cooked meals.',
-  'Modern design meets ultimate comfort in this new downtown hotspot.',
-  'Discover a hidden gem offering unparalleled tranquility, complete with a private beach and holistic wellness programs.',
-  'The quintessential business hotel, providing state-of-the-art conference facilities, executive lounges, and seamless connectivity.',
-  'Immerse yourself in local culture at this charming guesthouse, a short walk from historical landmarks and bustling markets.',
-  'An all-inclusive paradise designed for ultimate relaxation, featuring multiple pools, gourmet restaurants, and evening entertainment.',
-  'Your home away from home, these spacious suites come with fully equipped kitchens and separate living areas, perfect for extended stays.',
-  'Perched high above the city, enjoy panoramic skyline views from every room, complemented by a Michelin-starred restaurant and a rooftop bar.',
-  'A pet-friendly establishment that goes above and beyond, offering pet amenities, designated play areas, and special treats for your furry friends.',
-  'Experience sustainable luxury at its finest, with locally sourced cuisine, solar-powered facilities, and a commitment to environmental preservation.',
-  'This vibrant and trendy hotel boasts unique themed rooms, a lively lobby bar, and is situated in the heart of the city\'s entertainment district.',
-  'Designed for the discerning traveler, our hotel features bespoke services, an exclusive members-only lounge, and direct access to high-end shopping.',
-]
-
-reviewsPool = [
-  {'text': 'Exceptional service and spotless rooms. Truly a five-star experience!', 'rating': 5},
-  {'text': 'Amazing ocean view and very clean! Woke up to paradise every day.', 'rating': 5},
-  {'text': 'Would definitely stay again. Loved the breakfast spread; so many options!', 'rating': 4},
-  {'text': 'Not bad for the price, especially given the good location. A solid choice.', 'rating': 3},
-  {'text': 'Super friendly staff and cozy rooms. Felt very welcomed from arrival to departure.', 'rating': 4},
-  {'text': 'Close to everything important. Comfortable beds ensured a great night\'s sleep.', 'rating': 4},
-  {'text': 'Decent amenities overall, and elevator access was really helpful for our luggage.', 'rating': 3},
-  {'text': 'A bit noisy at night due to its very central location, but otherwise excellent.', 'rating': 3},
-  {'text': 'Loved the smart locks and seamless check-in process. Very modern and efficient.', 'rating': 5},
-  {'text': 'Fantastic pool area and friendly poolside service. The kids absolutely loved it!', 'rating': 5},
-  {'text': 'The hotel restaurant had delicious food and a truly great atmosphere for dinner.', 'rating': 4},
-  {'text': 'Quiet and relaxing, perfect for a peaceful getaway. Just what we needed.', 'rating': 5},
-  {'text': 'Great value for money, genuinely exceeded my expectations for a budget stay.', 'rating': 4},
-  {'text': 'Rooms were spacious and very well maintained, felt fresh and clean.', 'rating': 4},
-  {'text': 'The concierge was incredibly helpful with local tips and reservations. Top-notch assistance.', 'rating': 5},
-  {'text': 'Internet was fast and reliable, which was a huge plus for work and streaming.', 'rating': 4},
-  {'text': 'Parking was a bit tight, especially on busy nights, but we always found a spot eventually.', 'rating': 3},
-  {'text': 'Beautiful decor and very comfortable beds. Felt like a luxury stay without the huge price tag.', 'rating': 5},
-  {'text': 'An excellent choice for business travel; quiet, efficient, and well-equipped for meetings.', 'rating': 4},
-  {'text': 'Loved the direct beach access, truly wonderful to step right onto the sand!', 'rating': 5},
-  {'text': 'My only complaint was the slow check-in process; took longer than expected.', 'rating': 2},
-  {'text': 'The breakfast buffet was absolutely outstanding! Best I\'ve had in a hotel in years.', 'rating': 5},
-  {'text': 'Perfect for a family vacation, lots for the kids to do and great family-friendly amenities.', 'rating': 4},
-  {'text': 'Surprisingly quiet given its central location. Managed to get good rest despite being downtown.', 'rating': 4},
-  {'text': 'Could use an update in some areas, but still very clean and functional for a short stay.', 'rating': 3},
-  {'text': 'The gym facilities were top-notch and well-maintained. A great bonus for fitness enthusiasts.', 'rating': 4},
-  {'text': 'Hassle-free stay from start to finish. Staff went above and beyond to assist us.', 'rating': 5},
-  {'text': 'The view from our balcony was absolutely breathtaking. Worth every penny!', 'rating': 5},
-  {'text': 'Definitely recommend this place for a romantic escape; very charming and private.', 'rating': 5},
-  {'text': 'A bit far from major attractions, requiring taxis or public transport, but very peaceful.', 'rating': 3},
-  {'text': 'Excellent amenities for pets, truly pet-friendly with dedicated areas and treats.', 'rating': 5},
-  {'text': 'Room service was quick and the food was hot and delicious every time.', 'rating': 4},
-  {'text': 'Enjoyed the evening entertainment in the lobby, added a nice touch to the stay.', 'rating': 4},
-  {'text': 'Minor issue with the AC, but it was quickly resolved by maintenance.', 'rating': 3},
-  {'text': 'The beds were incredibly comfortable, honestly the best sleep I\'ve had in ages!', 'rating': 5},
-  {'text': 'Walking distance to many shops and restaurants, made exploring easy and fun.', 'rating': 4},
-  {'text': 'Good security measures in place, felt very safe throughout our stay.', 'rating': 4},
-  {'text': 'Loved the complimentary happy hour! A great way to unwind after a day of sightseeing.', 'rating': 5},
-  {'text': 'Friendly front desk staff but the wait for elevators was often long, especially during peak hours.', 'rating': 3},
-  {'text': 'The hotel grounds are beautiful and meticulously kept, felt very luxurious.', 'rating': 5},
-  {'text': 'Housekeeping was inconsistent; skipped our room one day, which was disappointing.', 'rating': 2},
-  {'text': 'The spa facilities were a wonderful addition, very relaxing and well-managed.', 'rating': 5},
-  {'text': 'Our room had a slight mildew smell, but it wasn\'t terrible enough to complain.', 'rating': 2},
-  {'text': 'The kids\' club was a lifesaver! Our children had a fantastic time and were well cared for.', 'rating': 5},
-  {'text': 'Located right next to a busy road, so expect some traffic noise, even on higher floors.', 'rating': 2},
-  {'text': 'The bar staff were incredibly attentive and made excellent cocktails.', 'rating': 4},
-  {'text': 'Pillows were a bit too soft for my liking, but that\'s a minor personal preference.', 'rating': 3},
-  {'text': 'The shuttle service was punctual and very convenient for getting to the convention center.', 'rating': 4},
-  {'text': 'We had an issue with a noisy neighbor, but the front desk handled it promptly and professionally.', 'rating': 4},
-  {'text': 'The decor felt a bit dated, but everything was clean and functional.', 'rating': 3},
-  {'text': 'Absolutely loved the rooftop pool and bar! Perfect for enjoying the sunset.', 'rating': 5},
-  {'text': 'The coffee shop in the lobby was a great perk for a quick morning pick-me-up.', 'rating': 4},
-  {'text': 'Valet parking was efficient and friendly, though a bit pricey.', 'rating': 3},
-  {'text': 'The view was partially obstructed by another building, which wasn\'t clear from the booking description.', 'rating': 2},
-  {'text': 'Every staff member we encountered was genuinely kind and helpful. Outstanding hospitality!', 'rating': 5},
-  {'text': 'The restaurant portions were small for the price, but the quality of food was high.', 'rating': 3},
-  {'text': 'Had a wonderful time exploring the nearby attractions, very convenient location for tourists.', 'rating': 4},
-  {'text': 'The check-out process was quick and smooth, no complaints there.', 'rating': 4},
-  {'text': 'Unfortunately, the hot water pressure was quite low during our stay.', 'rating': 2},
-  {'text': 'The communal areas were beautifully designed and comfortable.', 'rating': 4}
-]
-getAddress = lambda: str(random.randint(100, 999)) + ' ' + random.choice(['Main St', 'Ocean Blvd', '5th Ave', 'Sunset Rd', 'Market St', 'Elm St', 'Maple Ave', 'Broadway', 'Park Pl', 'Pine Ln', 'Grand Ave', 'University Dr', 'Highland Rd', 'Riverfront Pkwy', 'Liberty St', 'Willow Creek Ln', 'Cedarwood Blvd', 'Mill Pond Rd', 'Silverleaf Way', 'Forest Ridge Dr'])
-
-amenitiesList = ['Free Wi-Fi', 'Swimming Pool', 'Fitness Center', 'Spa', 'Restaurant',
-        'Bar/Lounge', 'Business Center', 'Conference Facilities', 'Room Service',
-        'Laundry Services', 'Gym', 'Indoor Pool', 'Outdoor Pool', 'Jacuzzi',
-        'Air Conditioning', 'Minibar', 'TV', 'Cable TV', 'Satellite TV', 'Internet']
-
-attractionsPool = [
-    {'name': 'Central Beach', 'type': 'Beach', 'distance': 0.5},
-    {'name': 'City Museum', 'type': 'Museum', 'distance': 1.2},
-    {'name': 'Downtown Park', 'type': 'Park', 'distance': 0.8},
-    {'name': 'Shopping Center', 'type': 'Shopping Mall', 'distance': 1.5},
-    {'name': 'Historic Theater', 'type': 'Theater', 'distance': 2.0},
-    {'name': 'Waterfront Zoo', 'type': 'Zoo', 'distance': 3.0},
-    {'name': 'Art Gallery', 'type': 'Art Gallery', 'distance': 1.1},
-    {'name': 'Sports Stadium', 'type': 'Sports Stadium', 'distance': 2.5}
-]
-
-faqPool = [
-    {'question': 'What time is check-in?', 'answer': 'Check-in is available from 3:00 PM.'},
-    {'question': 'Is parking available?', 'answer': 'Yes, complimentary parking is available for all guests.'},
-    {'question': 'Do you allow pets?', 'answer': 'Yes, we are a pet-friendly hotel with a small additional fee.'},
-    {'question': 'Is WiFi included?', 'answer': 'Yes, high-speed WiFi is complimentary throughout the hotel.'},
-    {'question': 'What amenities are available?', 'answer': 'We offer a fitness center, pool, spa, and restaurant.'},
-    {'question': 'Is there room service?', 'answer': 'Yes, 24-hour room service is available.'},
-    {'question': 'What is your cancellation policy?', 'answer': 'Cancellation policies vary by room type and booking rate.'}
-]
-
-usernamePool = ['TravelLover', 'AdventureSeeker', 'BusinessTraveler', 'FamilyFun', 'CoupleGetaway', 
-               'SoloExplorer', 'VacationVibes', 'CityBreaker', 'BeachBum', 'MountainHiker']
-def available_hotels(count: int, city: str, state: str) -> List[Hotel]:
-    """
-    Returns a list of available hotels based on the count provided.
-    """
-    if not (1 <= count <= 20):
-        raise HTTPException(status_code=400, detail="Count must be between 1 and 20.")
-    
-    hotels = []
-    
-    for i in range(count):
-        # Generate basic hotel info
-        hotel_name = getRandom(hotelNames)
-        
-        # Generate reviews
-        review_count = random.randint(1, 10)
-        reviews = []
-        for _ in range(review_count):
-            review_data = getRandom(reviewsPool)
-            reviews.append(Review(
-                username=getRandom(usernamePool),
-                rating=float(review_data['rating']),
-                comment=review_data['text'],
-                date=datetime.datetime.now() - datetime.timedelta(days=random.randint(1, 365))
-            ))
-        
-        # Generate room details
-        room_details = []
-        rooms = ['Standard', 'Deluxe', 'Suite']
-        for idx, room in enumerate(rooms):
-            room_details.append(RoomDetails(
-                type=room,
-                pricePerNight=float(random.randint(50, 99) * (idx + 1)),
-                mostPopular=(idx == 1),  # Deluxe is most popular
-                cancellationPolicy=random.choice(['Flexible', 'Moderate', 'Strict']),
-                availableRooms=random.randint(1, 10)
-            ))
-        
-        # Generate attractions
-        attractions = []
-        selected_attractions = random.sample(attractionsPool, random.randint(1, 5))
-        for attr in selected_attractions:
-            attractions.append(Attraction(
-                name=attr['name'],
-                type=attr['type'],
-                distance=attr['distance']
-            ))
-        
-        # Generate FAQ
-        faqs = []
-        selected_faqs = random.sample(faqPool, random.randint(2, 5))
-        for faq in selected_faqs:
-            faqs.append(FAQ(
-                question=faq['question'],
-                answer=faq['answer']
-            ))
-        
-        # Create hotel object
-        hotel = Hotel(
-            name=hotel_name,
-            vendor=getRandom(['Marriott', 'Hilton', 'Hyatt', 'Sheraton', 'Radisson', 'InterContinental', 'Holiday Inn', 'Ritz-Carlton', 'Four Seasons', 'Wyndham']),
-            address=f"{getAddress()}, {city}, {state}",
-            city=city,
-            state=state,
-            country="USA",
-            description=getRandom(descriptions),
-            postalCode=f"{random.randint(10000, 99999)}",
-            phoneNumber=f"+1-{random.randint(100, 999)}-{random.randint(100, 999)}-{random.randint(1000, 9999)}",
-            email=f"info@{hotel_name.lower().replace(' ', '').replace('&', 'and')}.com",
-            website=f"https://www.{hotel_name.lower().replace(' ', '').replace('&', 'and')}.com",
-            rating=round(sum(r.rating for r in reviews) / len(reviews), 1) if reviews else 0.0,
-            reviews=reviews,
-            roomDetails=room_details,
-            amenities=random.sample(amenitiesList, random.randint(3, 8)),
-            nearbyAttractions=attractions,
-            policies=HotelPolicy(
-                checkin=CheckIn(
-                    startTime=f"{random.randint(14, 16)}:00",
-                    endTime=f"{random.randint(18, 22)}:00",
-                    contactless=random.choice([True, False]),
-                    express=random.choice([True, False]),
-                    minAge=random.randint(18, 21)
-                ),
-                checkout=Checkout(
-                    time=f"{random.randint(10, 12)}:00",
-                    contactless=random.choice([True, False]),
-                    express=random.choice([True, False]),
-                    lateFeeApplicable=random.choice([True, False])
-                ),
-                petsAllowed=random.choice([True, False]),
-                childrenPolicy=getRandom(['Children welcome', 'Adults only', 'Children allowed with supervision']),
-                extraBeds=getRandom(['Available upon request', 'Not available', 'Available for additional fee']),
-                cribAvailability=getRandom(['Available upon request', 'Not available', 'Available for additional fee']),
-                accessMethods=['Key Card', 'Mobile App', 'Digital Key'],
-                safetyFeatures=['Smoke Detectors', 'Fire Extinguishers', 'Security Cameras', '24/7 Front Desk'],
-                houseKeepingPolicy=getRandom(['Daily housekeeping', 'Housekeeping upon request', 'Every other day'])
-            ),
-            faq=faqs
-        )
-        
-        hotels.append(hotel)
-    
-    return hotels
+# Details of listed hotels, built when a hotel is opened
+hotel_detail_cache = HotelDetails()
+
+def build_city_catalog(city: str, state: str) -> CityCatalog:
+    """
+    Builds a city's catalog and makes its hotels' details available.
+    """
+    catalog = CityCatalog(city, state)
+    for seed, summary in zip(catalog.seeds, catalog.summaries):
+        hotel_detail_cache.remember(summary['_id'], seed, catalog.city, catalog.state)
+    return catalog
+
+# Per-city catalogs that back GET /hotels
+hotel_catalogs = CityCatalogCache(build_city_catalog)
+
+# Nightly rooms booked per hotel and room type, shared by all workers in Redis
+# and restored from the database by the first worker to start
+room_inventory = RoomInventory(connect_room_store(), len(room_types))
+
+def load_room_reservations():
+    """
+    Restores the room inventory from the stays of hotel bookings in the
+    database, unless another worker already did since the store was emptied.
+    """
+    try:
+        if not room_inventory.claim_restore():
+            return
+    except redis.RedisError as e:
+        print(f"Could not load room reservations: {e}")
+        return
+    try:
+        with get_db_cursor() as (cursor, conn):
+            cursor.execute("""
+                SELECT bookingdetails -> 'stay'
+                FROM hotelbookings
+                WHERE bookingdetails ? 'stay'
+            """)
+            rows = cursor.fetchall()
+        for (stay,) in rows:
+            room_inventory.restore(
+                stay['hotelId'],
+                room_types.index(stay['roomType']),
+                datetime.date.fromisoformat(stay['checkIn']),
+                datetime.date.fromisoformat(stay['checkOut']),
+                stay['rooms'],
+            )
+    except Exception as e:
+        print(f"Could not load room reservations: {e}")
+        try:
+            room_inventory.unclaim_restore()
+        except redis.RedisError:
+            pass
+        return
+    print(f"Loaded {len(rows)} room reservation(s)")
+
+async def city_catalog(city: str, state: str) -> CityCatalog:
+    """
+    Returns the city's catalog, building it off the event loop on a miss.
+    """
+    return hotel_catalogs.cached(city, state) or await asyncio.to_thread(hotel_catalogs.get, city, state)
+
+def parse_bbox(value: Optional[str]) -> Optional[tuple]:
+    """
+    Parses a "south,west,north,east" bounding box in degrees.
+    """
+    if value is None:
+        return None
+    try:
+        south, west, north, east = (float(part) for part in value.split(','))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be south,west,north,east")
+    if not (-90 <= south <= north <= 90 and -180 <= west <= east <= 180):
+        raise HTTPException(status_code=400, detail="bbox must be south,west,north,east")
+    return south, west, north, east
+
+def parse_amenities(values: Optional[List[str]]) -> List[str]:
+    """
+    Resolves amenity names, given repeated or comma-separated and in any
+    case, to their amenitiesList spelling.
+    """
+    names = {amenity.lower(): amenity for amenity in amenitiesList}
+    amenities = []
+    for value in values or []:
+        for name in value.split(','):
+            if not name.strip():
+                continue
+            amenity = names.get(name.strip().lower())
+            if amenity is None:
+                raise HTTPException(status_code=400, detail=f"Unknown amenity: {name.strip()}")
+            amenities.append(amenity)
+    return amenities
 
         
-@app.get("/hotels", response_model=List[Hotel])
+@app.get("/hotels", response_model=List[HotelSummary])
 async def get_hotels(
     request: Request,
-    count: int = Query(5, ge=1, le=20, description="Number of hotels to generate (1-20)."),
+    count: int = Query(5, ge=1, le=20, description="Number of hotels per page (1-20)."),
     city: str = Query("New York", description="City name for hotel location"),
     state: str = Query("NY", description="State for hotel location"),
+    amenities: Optional[List[str]] = Query(None, description="Required amenities, repeated or comma-separated, e.g. Spa,Gym."),
+    vendor: Optional[str] = Query(None, description="Hotel vendor, e.g. Hilton (case-insensitive)."),
+    min_rating: Optional[float] = Query(None, ge=0.0, le=5.0, description="Minimum rating."),
+    min_price: Optional[float] = Query(None, ge=0, description="Minimum price of the cheapest room per night."),
+    max_price: Optional[float] = Query(None, ge=0, description="Maximum price of the cheapest room per night."),
+    latitude: Optional[float] = Query(None, ge=-90, le=90, description="Latitude of a point to search around."),
+    longitude: Optional[float] = Query(None, ge=-180, le=180, description="Longitude of a point to search around."),
+    radius_km: Optional[float] = Query(None, gt=0, le=50, description="Only hotels within this distance of the point."),
+    bbox: Optional[str] = Query(None, description="Only hotels inside south,west,north,east (degrees), e.g. a map view."),
+    sort_by: Literal['rating', 'price', 'distance'] = Query('rating', description="Best rated, cheapest or nearest first."),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page."),
 ):
-    """returns a list of available hotels based on the count provided."""
+    """
+    Search the hotels of a city, best rated first by default. Filters
+    narrow the results; pass the X-Next-Cursor response header back as
+    ``cursor`` to get the next page. With ``latitude`` and ``longitude``
+    every hotel comes with its ``distanceKm`` from that point.
+    """
     await rate_limit(request, limit=5, window=60, service="hotel-service")
+    required = parse_amenities(amenities)
+    box = parse_bbox(bbox)
+    if (latitude is None) != (longitude is None):
+        raise HTTPException(status_code=400, detail="latitude and longitude must be given together")
+    near = None if latitude is None else (latitude, longitude)
+    if near is None and (radius_km is not None or sort_by == 'distance'):
+        raise HTTPException(status_code=400, detail="radius_km and sort_by=distance need latitude and longitude")
+    try:
+        start = int(cursor) if cursor is not None else 0
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     try:
-        return available_hotels(count, city, state)
+        catalog = await city_catalog(city, state)
+        rows, next_cursor = catalog.search(
+            amenities=required,
+            vendor=vendor,
+            min_rating=min_rating,
+            min_price=min_price,
+            max_price=max_price,
+            near=near,
+            radius_km=radius_km,
+            bbox=box,
+            sort_by=sort_by,
+            cursor=max(start, 0),
+            limit=count,
+        )
+        hotels = [catalog.summaries[row] for row in rows]
+        if near is not None:
+            distances = catalog.distances(rows, *near)
+            hotels = [{**hotel, 'distanceKm': round(float(distance), 2)} for hotel, distance in zip(hotels, distances)]
+        headers = {} if next_cursor is None else {"X-Next-Cursor": str(next_cursor)}
+        return conditional_json_response(request, hotels, headers=headers)
     except Exception as e:
         print(f"Error in get_hotels: {e}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@app.get("/hotels/{hotel_id}", response_model=Hotel)
+async def get_hotel(
+    hotel_id: str,
+    request: Request,
+    city: Optional[str] = Query(None, description="City the hotel was listed in; finds hotels this worker has not listed."),
+    state: Optional[str] = Query(None, description="State the hotel was listed in."),
+):
+    """
+    Returns every detail of a hotel from a /hotels search: reviews, rooms,
+    nearby attractions, policies and FAQs.
+    """
+    await rate_limit(request, limit=5, window=60, service="hotel-service")
+    hotel = await find_hotel(hotel_id, city, state)
+    if hotel is None:
+        raise HTTPException(status_code=404, detail="Hotel not found")
+    return conditional_json_response(request, hotel)
+
+
+@app.get("/hotels/{hotel_id}/availability", response_model=HotelAvailability)
+async def get_hotel_availability(
+    hotel_id: str,
+    request: Request,
+    check_in: datetime.date = Query(..., description="First night of the stay, YYYY-MM-DD."),
+    check_out: datetime.date = Query(..., description="Day of departure, YYYY-MM-DD."),
+    city: Optional[str] = Query(None, description="City the hotel was listed in; finds hotels this worker has not listed."),
+    state: Optional[str] = Query(None, description="State the hotel was listed in."),
+):
+    """
+    Returns how many rooms of each type are free on every night of the
+    stay, with the price of the stay.
+    """
+    await rate_limit(request, limit=5, window=60, service="hotel-service")
+    hotel = await find_hotel(hotel_id, city, state)
+    if hotel is None:
+        raise HTTPException(status_code=404, detail="Hotel not found")
+    capacity = [room['availableRooms'] for room in hotel['roomDetails']]
+    try:
+        free = await asyncio.to_thread(room_inventory.available, hotel_id, capacity, check_in, check_out)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except redis.RedisError:
+        raise HTTPException(status_code=503, detail="Room inventory is unavailable, try again later")
+    nights = (check_out - check_in).days
+    availability = {
+        '_id': hotel_id,
+        'checkIn': check_in,
+        'checkOut': check_out,
+        'nights': nights,
+        'rooms': [
+            {
+                'type': room['type'],
+                'pricePerNight': room['pricePerNight'],
+                'availableRooms': int(count),
+                'totalPrice': round(room['pricePerNight'] * nights, 2),
+            }
+            for room, count in zip(hotel['roomDetails'], free)
+        ],
+    }
+    # Availability changes with every booking: let clients revalidate each time
+    return conditional_json_response(request, availability, max_age=0)
+
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="localhost", port=8002, reload=True)
\ No newline at end of file
@@ -0,0 +1,185 @@
+"""
+Nightly room inventory per hotel and room type over a rolling calendar.
+
+The rooms booked per (room type, night) live in Redis, one hash per hotel
+with a field per room type and night, so every hotel-service worker sees the
+same counts. Hotels nobody booked take no space, and a hotel's hash expires
+once all of its nights have passed. The rooms of every type free for a whole
+stay are the capacities minus the maximum booked over the stay's nights, read
+in one HMGET. A reservation checks and books all of its nights in one Lua
+script on the server, so two bookings can never take the last room together,
+whichever workers they went through.
+"""
+import datetime
+import os
+from typing import List, Sequence
+
+import numpy as np
+import redis
+
+
+ROOM_HORIZON_DAYS = int(os.getenv("ROOM_HORIZON_DAYS", 365))  # bookable nights from today
+# Redis shared by all hotel-service workers; defaults to the seat store's, so
+# the stand-in run by run_all serves both
+ROOM_REDIS_URL = os.getenv("ROOM_REDIS_URL", os.getenv("SEAT_REDIS_URL", "redis://localhost:6379/1"))
+
+RESTORED_KEY = "rooms-restored"  # set once the booked stays were loaded into Redis
+
+# Books ARGV[1] rooms on every night field in ARGV[4..] of the hash at KEYS[1]
+# if none of them would go over the capacity ARGV[2], then keeps the hash for
+# ARGV[3] seconds. Returns 1 if booked, 0 (booking nothing) otherwise.
+RESERVE_ROOMS = """
+local rooms = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+for i = 4, #ARGV do
+    if tonumber(redis.call('HGET', KEYS[1], ARGV[i]) or 0) + rooms > capacity then
+        return 0
+    end
+end
+for i = 4, #ARGV do
+    redis.call('HINCRBY', KEYS[1], ARGV[i], rooms)
+end
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+# Gives ARGV[1] rooms back on every night field in ARGV[2..] of the hash at
+# KEYS[1], dropping nights with nothing left booked.
+RELEASE_ROOMS = """
+for i = 2, #ARGV do
+    if redis.call('HINCRBY', KEYS[1], ARGV[i], -tonumber(ARGV[1])) <= 0 then
+        redis.call('HDEL', KEYS[1], ARGV[i])
+    end
+end
+return 0
+"""
+
+
+def rooms_key(hotel_id: str) -> str:
+    return f"rooms:{hotel_id}"
+
+
+def connect() -> redis.Redis:
+    """
+    Returns a client for ROOM_REDIS_URL. It connects on first use, so
+    importing this module does not need Redis to be up.
+    """
+    return redis.Redis.from_url(ROOM_REDIS_URL, decode_responses=True)
+
+
+class RoomInventory:
+    """
+    Rooms booked per night for each hotel (by id) and room type (by index).
+    Room capacities are passed in by the caller and never stored.
+
+    Everything lets ``redis.RedisError`` propagate, so callers can refuse a
+    booking they cannot check.
+    """
+
+    def __init__(self, client, room_types: int, horizon_days: int = ROOM_HORIZON_DAYS):
+        self.client = client
+        self.room_types = room_types
+        self.horizon_days = horizon_days
+
+    def check_stay(self, check_in: datetime.date, check_out: datetime.date):
+        """
+        Raises ValueError unless the stay is at least a night and within the
+        bookable horizon.
+        """
+        today = datetime.date.today()
+        if check_out <= check_in:
+            raise ValueError("check_out must be after check_in")
+        if check_in < today:
+            raise ValueError("check_in must not be in the past")
+        if check_out > today + datetime.timedelta(days=self.horizon_days):
+            raise ValueError(f"Stays can only be booked up to {self.horizon_days} days ahead")
+
+    @staticmethod
+    def _nights(room_type: int, check_in: datetime.date, check_out: datetime.date) -> List[str]:
+        """
+        Returns the hash fields of a room type's nights from ``check_in`` to
+        the night before ``check_out``.
+        """
+        return [
+            f"{room_type}:{(check_in + datetime.timedelta(days=night)).isoformat()}"
+            for night in range((check_out - check_in).days)
+        ]
+
+    def _nights_ahead(self, room_type: int, check_in: datetime.date, check_out: datetime.date) -> List[str]:
+        """
+        Returns the hash fields of the stay's nights that have not passed.
+        """
+        return self._nights(room_type, max(check_in, datetime.date.today()), check_out)
+
+    def _ttl(self) -> int:
+        # The last bookable night passes a day after the horizon ends.
+        return (self.horizon_days + 1) * 24 * 3600
+
+    def available(self, hotel_id: str, capacity: Sequence[int], check_in: datetime.date, check_out: datetime.date) -> np.ndarray:
+        """
+        Returns the rooms of each type free on every night from ``check_in``
+        to the night before ``check_out``.
+        """
+        self.check_stay(check_in, check_out)
+        capacity = np.asarray(capacity, dtype=np.int32)
+        fields = [field for room_type in range(self.room_types) for field in self._nights(room_type, check_in, check_out)]
+        booked = np.array([int(count or 0) for count in self.client.hmget(rooms_key(hotel_id), fields)], dtype=np.int32)
+        return np.maximum(capacity - booked.reshape(self.room_types, -1).max(axis=1), 0)
+
+    def reserve(
+        self,
+        hotel_id: str,
+        capacity: Sequence[int],
+        room_type: int,
+        check_in: datetime.date,
+        check_out: datetime.date,
+        rooms: int = 1,
+    ) -> bool:
+        """
+        Books ``rooms`` rooms of a type for every night of the stay. Returns
+        False, booking nothing, if any night has fewer rooms free.
+        """
+        self.check_stay(check_in, check_out)
+        nights = self._nights(room_type, check_in, check_out)
+        # Plain EVAL, as for seats: the stand-in drops the connection on the
+        # NoScriptError an EVALSHA fallback relies on.
+        booked = self.client.eval(
+            RESERVE_ROOMS, 1, rooms_key(hotel_id), rooms, capacity[room_type], self._ttl(), *nights
+        )
+        return bool(booked)
+
+    def claim_restore(self) -> bool:
+        """
+        Returns True for the first worker to ask since the store was emptied;
+        that worker must ``restore`` the booked stays from the database.
+        """
+        return bool(self.client.set(RESTORED_KEY, 1, nx=True))
+
+    def unclaim_restore(self):
+        """
+        Lets the next worker that starts restore the stays, after a restore
+        that failed.
+        """
+        self.client.delete(RESTORED_KEY)
+
+    def restore(self, hotel_id: str, room_type: int, check_in: datetime.date, check_out: datetime.date, rooms: int = 1):
+        """
+        Books the nights still ahead of an already accepted reservation, e.g.
+        one loaded from the database at startup, without checking capacity.
+        """
+        nights = self._nights_ahead(room_type, check_in, check_out)
+        if not nights:
+            return
+        pipe = self.client.pipeline(transaction=True)
+        for night in nights:
+            pipe.hincrby(rooms_key(hotel_id), night, rooms)
+        pipe.expire(rooms_key(hotel_id), self._ttl())
+        pipe.execute()
+
+    def release(self, hotel_id: str, room_type: int, check_in: datetime.date, check_out: datetime.date, rooms: int = 1):
+        """
+        Gives back the rooms of a reservation for the nights still ahead.
+        """
+        nights = self._nights_ahead(room_type, check_in, check_out)
+        if nights:
+            self.client.eval(RELEASE_ROOMS, 1, rooms_key(hotel_id), rooms, *nights)
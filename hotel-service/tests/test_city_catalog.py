@@ -0,0 +1,131 @@
+import random
+import threading
+
+import numpy as np
+import pytest
+
+from city_catalog import CityCatalog, CityCatalogCache, catalog_key
+from geo_index import haversine_km
+from hotel_catalog import amenitiesList, vendors
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return CityCatalog("Austin", "TX", size=300)
+
+
+def test_catalogs_are_stable_per_location(catalog):
+    assert catalog_key(" austin ", "tx") == ("Austin", "TX")
+    again = CityCatalog("Austin", "TX", size=300)
+    assert [s['_id'] for s in again.summaries] == [s['_id'] for s in catalog.summaries]
+    assert CityCatalog("Dallas", "TX", size=300).summaries[0]['_id'] != catalog.summaries[0]['_id']
+    assert all(catalog.rows[summary['_id']] == row for row, summary in enumerate(catalog.summaries))
+
+
+def matches(summary, filters, distance):
+    if not set(filters.get('amenities', [])) <= set(summary['amenities']):
+        return False
+    if 'vendor' in filters and summary['vendor'].lower() != filters['vendor'].lower():
+        return False
+    if 'min_rating' in filters and summary['rating'] < filters['min_rating']:
+        return False
+    if 'min_price' in filters and summary['minPrice'] < filters['min_price']:
+        return False
+    if 'max_price' in filters and summary['minPrice'] > filters['max_price']:
+        return False
+    if 'radius_km' in filters and distance > filters['radius_km']:
+        return False
+    if 'bbox' in filters:
+        south, west, north, east = filters['bbox']
+        if not (south <= summary['latitude'] <= north and west <= summary['longitude'] <= east):
+            return False
+    return True
+
+
+def test_search_matches_brute_force_filter(catalog):
+    rng = random.Random(48)
+    center = (float(catalog.latitude.mean()), float(catalog.longitude.mean()))
+    for _ in range(300):
+        filters = {}
+        if rng.random() < 0.4:
+            filters['amenities'] = rng.sample(amenitiesList, rng.randint(1, 3))
+        if rng.random() < 0.3:
+            filters['vendor'] = rng.choice(vendors + ['Nobody']).upper()
+        if rng.random() < 0.3:
+            filters['min_rating'] = rng.choice([2.5, 3.5, 4.5])
+        if rng.random() < 0.3:
+            filters['min_price'] = rng.choice([55.0, 70.0, 90.0])
+        if rng.random() < 0.3:
+            filters['max_price'] = rng.choice([60.0, 80.0, 95.0])
+        sort_by = rng.choice(['rating', 'price', 'distance'])
+        near = None
+        if sort_by == 'distance' or rng.random() < 0.3:
+            near = (center[0] + rng.uniform(-0.05, 0.05), center[1] + rng.uniform(-0.05, 0.05))
+            if rng.random() < 0.5:
+                filters['radius_km'] = rng.uniform(1.0, 8.0)
+        if rng.random() < 0.2:
+            south, north = sorted(center[0] + rng.uniform(-0.08, 0.08) for _ in range(2))
+            west, east = sorted(center[1] + rng.uniform(-0.08, 0.08) for _ in range(2))
+            filters['bbox'] = (south, west, north, east)
+        limit = rng.randint(1, 40)
+
+        distances = haversine_km(*near, catalog.latitude, catalog.longitude) if near else np.zeros(len(catalog))
+        order = {
+            'rating': lambda row: -catalog.summaries[row]['rating'],
+            'price': lambda row: catalog.summaries[row]['minPrice'],
+            'distance': lambda row: distances[row],
+        }[sort_by]
+        expected = [
+            row for row in sorted(range(len(catalog)), key=order)
+            if matches(catalog.summaries[row], filters, distances[row])
+        ]
+
+        found, cursor = [], 0
+        while cursor is not None:
+            rows, cursor = catalog.search(near=near, sort_by=sort_by, cursor=cursor, limit=limit, **filters)
+            assert len(rows) <= limit
+            found.extend(rows.tolist())
+        if sort_by == 'distance':
+            # Equal distances may come in any order.
+            assert sorted(found) == sorted(expected)
+            assert np.all(np.diff(distances[found]) >= 0)
+        else:
+            assert found == expected
+
+
+def test_cold_city_is_built_once_under_concurrent_requests():
+    builds = []
+
+    def build(city, state):
+        builds.append((city, state))
+        return CityCatalog(city, state, size=20)
+
+    cache = CityCatalogCache(build, size=2, ttl=60)
+    barrier = threading.Barrier(50)
+    results = []
+
+    def get():
+        barrier.wait()
+        results.append(cache.get("austin", "tx"))
+
+    threads = [threading.Thread(target=get) for _ in range(50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert builds == [("Austin", "TX")]
+    assert all(result is results[0] for result in results)
+
+
+def test_cache_evicts_least_recently_used_and_expired_cities():
+    cache = CityCatalogCache(lambda city, state: CityCatalog(city, state, size=5), size=2, ttl=60)
+    austin = cache.get("Austin", "TX")
+    cache.get("Dallas", "TX")
+    cache.get("Austin", "TX")
+    cache.get("Houston", "TX")
+    assert cache.cached("Austin", "TX") is austin
+    assert cache.cached("Dallas", "TX") is None
+
+    expiring = CityCatalogCache(lambda city, state: CityCatalog(city, state, size=5), ttl=0)
+    expiring.get("Austin", "TX")
+    assert expiring.cached("Austin", "TX") is None
@@ -0,0 +1,68 @@
+import random
+
+import numpy as np
+import pytest
+
+from geo_index import GridIndex, haversine_km, offset
+
+
+CENTER = (30.27, -97.74)
+
+
+@pytest.fixture(scope="module")
+def points():
+    rng = np.random.default_rng(45)
+    return CENTER[0] + rng.uniform(-0.2, 0.2, 5000), CENTER[1] + rng.uniform(-0.2, 0.2, 5000)
+
+
+def test_offset_moves_by_the_given_distance():
+    north = offset(*CENTER, 10.0, 0.0)
+    east = offset(*CENTER, 0.0, 10.0)
+    assert haversine_km(*CENTER, *north) == pytest.approx(10.0, rel=1e-9)
+    assert haversine_km(*CENTER, *east) == pytest.approx(10.0, rel=1e-3)
+
+
+@pytest.mark.parametrize("north_km, east_km", [(1, 0), (-1, 0), (0, 1), (0, -1)])
+def test_points_just_inside_the_radius_are_found(north_km, east_km):
+    point = offset(*CENTER, 9.999 * north_km, 9.999 * east_km)
+    index = GridIndex([point[0]], [point[1]], cell_km=0.001)
+    rows, _ = index.within_radius(*CENTER, 10.0)
+    assert rows.tolist() == [0]
+
+
+def test_radius_queries_match_a_scan(points):
+    latitudes, longitudes = points
+    index = GridIndex(latitudes, longitudes, cell_km=1.5)
+    rng = random.Random(45)
+    for _ in range(200):
+        latitude = CENTER[0] + rng.uniform(-0.25, 0.25)
+        longitude = CENTER[1] + rng.uniform(-0.25, 0.25)
+        radius_km = rng.uniform(0.1, 12.0)
+
+        rows, distances = index.within_radius(latitude, longitude, radius_km)
+        scan = haversine_km(latitude, longitude, latitudes, longitudes)
+        expected = np.flatnonzero(scan <= radius_km)
+        assert sorted(rows.tolist()) == expected.tolist()
+        assert np.all(np.diff(distances) >= 0)
+        assert distances == pytest.approx(scan[rows])
+
+
+def test_box_queries_match_a_scan(points):
+    latitudes, longitudes = points
+    index = GridIndex(latitudes, longitudes)
+    rng = random.Random(46)
+    for _ in range(200):
+        south, north = sorted(CENTER[0] + rng.uniform(-0.25, 0.25) for _ in range(2))
+        west, east = sorted(CENTER[1] + rng.uniform(-0.25, 0.25) for _ in range(2))
+
+        rows = index.within_box(south, west, north, east)
+        inside = (latitudes >= south) & (latitudes <= north) & (longitudes >= west) & (longitudes <= east)
+        assert sorted(rows.tolist()) == np.flatnonzero(inside).tolist()
+
+
+def test_empty_index():
+    index = GridIndex([], [])
+    assert len(index) == 0
+    rows, distances = index.within_radius(*CENTER, 5.0)
+    assert len(rows) == 0 and len(distances) == 0
+    assert len(index.within_box(30.0, -98.0, 31.0, -97.0)) == 0
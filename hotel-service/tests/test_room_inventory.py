@@ -0,0 +1,110 @@
+import datetime
+import threading
+
+import fakeredis
+import numpy as np
+import pytest
+
+from room_inventory import RoomInventory, rooms_key
+
+
+TODAY = datetime.date.today()
+CAPACITY = [5, 3, 1]
+
+
+def nights(start, end):
+    return TODAY + datetime.timedelta(days=start), TODAY + datetime.timedelta(days=end)
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def worker(server, horizon_days=30):
+    return RoomInventory(fakeredis.FakeRedis(server=server, decode_responses=True), 3, horizon_days=horizon_days)
+
+
+@pytest.fixture
+def inventory(server):
+    return worker(server)
+
+
+def test_free_rooms_are_the_minimum_over_the_stay(inventory):
+    assert inventory.available("h1", CAPACITY, *nights(1, 4)).tolist() == CAPACITY
+    assert inventory.reserve("h1", CAPACITY, 0, *nights(2, 3), rooms=2)
+    assert inventory.reserve("h1", CAPACITY, 0, *nights(1, 3))
+    assert inventory.available("h1", CAPACITY, *nights(1, 4)).tolist() == [2, 3, 1]
+    # Check-out day is not a night of the stay.
+    assert inventory.available("h1", CAPACITY, *nights(3, 5)).tolist() == CAPACITY
+    assert inventory.available("h2", CAPACITY, *nights(1, 4)).tolist() == CAPACITY
+
+
+def test_a_reservation_books_all_nights_or_none(inventory):
+    assert inventory.reserve("h1", CAPACITY, 2, *nights(3, 4))
+    assert not inventory.reserve("h1", CAPACITY, 2, *nights(1, 5))
+    assert inventory.available("h1", CAPACITY, *nights(1, 3)).tolist() == CAPACITY
+
+
+def test_release_gives_the_rooms_back(inventory):
+    inventory.reserve("h1", CAPACITY, 1, *nights(0, 2), rooms=3)
+    inventory.release("h1", 1, *nights(0, 2), rooms=3)
+    assert inventory.available("h1", CAPACITY, *nights(0, 2)).tolist() == CAPACITY
+    inventory.release("unknown", 1, *nights(0, 2))
+
+
+def test_restore_skips_nights_already_past(inventory):
+    inventory.restore("h1", 0, *nights(-5, 2), rooms=5)
+    inventory.restore("h1", 1, *nights(-5, -1))
+    assert inventory.available("h1", CAPACITY, *nights(0, 2)).tolist() == [0, 3, 1]
+    assert inventory.available("h1", CAPACITY, *nights(2, 3)).tolist() == CAPACITY
+
+
+@pytest.mark.parametrize("check_in, check_out", [(2, 2), (3, 1), (-1, 2), (0, 31)])
+def test_invalid_stays_are_rejected(inventory, check_in, check_out):
+    with pytest.raises(ValueError):
+        inventory.available("h1", CAPACITY, *nights(check_in, check_out))
+    with pytest.raises(ValueError):
+        inventory.reserve("h1", CAPACITY, 0, *nights(check_in, check_out))
+
+
+def test_released_nights_are_dropped_and_hotels_expire(inventory):
+    inventory.reserve("h1", CAPACITY, 2, *nights(0, 10))
+    assert 0 < inventory.client.ttl(rooms_key("h1")) <= 31 * 24 * 3600
+    inventory.release("h1", 2, *nights(0, 10))
+    assert not inventory.client.exists(rooms_key("h1"))
+
+
+def test_workers_share_the_rooms(server):
+    first, second = worker(server), worker(server)
+    assert first.reserve("h1", CAPACITY, 2, *nights(5, 8))
+    assert not second.reserve("h1", CAPACITY, 2, *nights(6, 9))
+    # A cancel handled by the other worker frees the nights for everyone.
+    second.release("h1", 2, *nights(5, 8))
+    assert first.available("h1", CAPACITY, *nights(5, 8)).tolist() == CAPACITY
+
+
+def test_only_the_first_worker_restores_the_stays(server):
+    first, second = worker(server), worker(server)
+    assert first.claim_restore()
+    assert not second.claim_restore()
+    first.unclaim_restore()
+    assert second.claim_restore()
+
+
+def test_only_one_of_many_concurrent_bookings_gets_the_last_room(server, inventory):
+    barrier = threading.Barrier(50)
+    results = []
+
+    def book():
+        rooms = worker(server)
+        barrier.wait()
+        results.append(rooms.reserve("h1", CAPACITY, 2, *nights(5, 8)))
+
+    threads = [threading.Thread(target=book) for _ in range(50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results.count(True) == 1
+    assert np.array_equal(inventory.available("h1", CAPACITY, *nights(5, 8)), [5, 3, 0])
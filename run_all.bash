@@ -11,6 +11,14 @@ fi
 echo "🚀 Starting all microservices..."
 echo "========================================"
 
+# flight-service and flight-booking share the seat store in Redis. Without
+# SEAT_REDIS_URL, run the fake Redis stand-in in its own process for them.
+if [ -z "$SEAT_REDIS_URL" ]; then
+    echo "Starting the seat store stand-in on port 6390..."
+    (cd shared && python seat_inventory.py &)
+    export SEAT_REDIS_URL="redis://127.0.0.1:6390/0"
+fi
+
 # Start each microservice with uvicorn, from its own folder
 echo "Starting Car Booking Service on port 8001..."
 (cd car-booking && python main.py &)
@@ -21,6 +21,15 @@ function Start-Service {
     }
 }
 
+# flight-service and flight-booking share the seat store in Redis. Without
+# SEAT_REDIS_URL, run the fake Redis stand-in in its own window for them.
+if (-not $env:SEAT_REDIS_URL) {
+    Write-Host "Starting the seat store stand-in on port 6390..." -ForegroundColor Yellow
+    Start-Process powershell -ArgumentList "-Command", "cd 'shared'; python seat_inventory.py" -WindowStyle Normal
+    $env:SEAT_REDIS_URL = "redis://127.0.0.1:6390/0"
+    Start-Sleep -Seconds 1
+}
+
 # Start each microservice
 Start-Service "Car Booking Service" "car-booking" 8001
 Start-Service "Car Service" "car-service" 8010
@@ -0,0 +1,57 @@
+"""
+JSON responses for objects the services generate themselves.
+
+Search results are built by the services from fixed pools, so they do not
+need to be validated: they can be created with ``Model.model_construct`` and
+returned as a ``FastJSONResponse``, which skips FastAPI's response_model
+round trip (dump to dicts, validate, serialize again) and encodes models
+straight from their attributes, using field aliases like FastAPI does.
+"""
+import datetime
+import json
+from functools import lru_cache
+from typing import Any, List, Tuple
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # fall back to the standard library encoder
+    orjson = None
+
+
+@lru_cache(maxsize=None)
+def _field_keys(model: type) -> List[Tuple[str, str]]:
+    """
+    Returns (attribute, JSON key) pairs for a model class.
+    """
+    return [(name, field.alias or name) for name, field in model.model_fields.items()]
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return {key: getattr(obj, name) for name, key in _field_keys(type(obj))}
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        text = obj.isoformat()
+        # Match pydantic, which writes UTC as "Z"
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Encodes models, lists and dicts of them, dates and primitives as JSON.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse that encodes with ``dumps``; content is trusted as is.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,56 @@
+"""
+ETag and Cache-Control handling for search responses.
+
+The ETag is a hash of the encoded body, so identical results get identical
+tags whichever worker built them. A client or proxy that sends the tag back
+in If-None-Match gets an empty 304 while the results are unchanged, and a
+proxy may serve the response for ``max_age`` seconds without asking again.
+"""
+import hashlib
+import os
+from typing import Any, Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from fast_json import dumps
+
+# Seconds clients and proxies may reuse a search response without revalidating
+SEARCH_MAX_AGE = int(os.getenv("SEARCH_MAX_AGE", 30))
+
+
+def etag_for(body: bytes) -> str:
+    """
+    Returns a strong ETag for a response body.
+    """
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match uses weak comparison, so W/"x" also matches "x".
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def conditional_json_response(
+    request: Request,
+    content: Any,
+    max_age: int = SEARCH_MAX_AGE,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    Encodes ``content`` like FastJSONResponse, tags it, and answers with a
+    304 if the request already has that version. ``headers`` are sent with
+    both.
+    """
+    body = dumps(content)
+    etag = etag_for(body)
+    headers = {**(headers or {}), "ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
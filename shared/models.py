@@ -12,6 +12,7 @@ class StopDetail(BaseModel):
     arrivalTime: datetime.datetime # Use datetime for internal handling
     departureTime: datetime.datetime # Use datetime for internal handling
     layoverDuration: str # String format like "1h 30m"
+    layoverMinutes: int = 0 # Same layover in minutes, for sorting and filtering
     
 class Flight(BaseModel):
     """
@@ -24,6 +25,7 @@ class Flight(BaseModel):
     departureTime: datetime.datetime # Use datetime for internal handling
     arrivalTime: datetime.datetime # Use datetime for internal handling
     duration: str # String format like "5h 45m"
+    durationMinutes: int = 0 # Same duration in minutes, for sorting and filtering
     numberOfStops: int
     stops: List[StopDetail]
     status: Literal['On Time', 'Delayed', 'Cancelled']
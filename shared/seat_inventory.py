@@ -0,0 +1,272 @@
+import os
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import redis
+
+# Redis holding seat counters, fares and holds; flight-service and
+# flight-booking must share it. Without a Redis server, run the stand-in in
+# its own process with `python shared/seat_inventory.py` and set this to
+# redis://127.0.0.1:6390/0 (SEAT_STANDIN_PORT).
+SEAT_REDIS_URL = os.getenv("SEAT_REDIS_URL", "redis://localhost:6379/1")
+SEAT_STANDIN_PORT = int(os.getenv("SEAT_STANDIN_PORT", 6390))
+# Seconds a checkout may hold seats before they go back on sale
+SEAT_HOLD_TTL = int(os.getenv("SEAT_HOLD_TTL", 600))
+# Seat counters are dropped this long after they were last seeded
+SEAT_KEY_TTL = int(os.getenv("SEAT_KEY_TTL", 45 * 24 * 3600))
+
+HOLDS_KEY = "seat-holds"  # sorted set of hold ids scored by expiry time
+
+# Takes ARGV[2] seats of class ARGV[1] from the counters at KEYS[1] if that
+# many are left. Returns -1 for an untracked flight, 0 when short, 1 if taken.
+TAKE_SEATS = """
+local left = redis.call('HGET', KEYS[1], ARGV[1])
+if not left then
+    return -1
+end
+if tonumber(left) < tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('HINCRBY', KEYS[1], ARGV[1], -tonumber(ARGV[2]))
+return 1
+"""
+
+
+def seat_key(departure_date: str, flight_number: str) -> str:
+    return f"seats:{departure_date}:{flight_number}"
+
+
+def fare_key(departure_date: str, flight_number: str) -> str:
+    return f"fares:{departure_date}:{flight_number}"
+
+
+def hold_key(hold_id: str) -> str:
+    return f"seat-hold:{hold_id}"
+
+
+def connect() -> redis.Redis:
+    """
+    Returns a client for SEAT_REDIS_URL. It connects on first use, so
+    importing this module does not need Redis to be up.
+    """
+    return redis.Redis.from_url(SEAT_REDIS_URL, decode_responses=True)
+
+
+class SeatInventory:
+    """
+    Per-flight seat counters kept in a Redis hash (one field per class), next
+    to a hash of the fares the flight was last offered at.
+
+    Seats are taken by a Lua script that checks and decrements the counter in
+    one step on the server, so concurrent holds never oversell, never need a
+    lock and no reader ever sees a negative count. Holds are recorded in a
+    sorted set scored by expiry; whoever removes a hold id from that set
+    (confirm, release or the expiry sweep) owns it, which makes each of those
+    outcomes happen exactly once.
+
+    Reads used to decorate search results fall back to the generated counts
+    when Redis fails; everything that takes or returns seats lets
+    ``redis.RedisError`` propagate, so callers can refuse the sale.
+    """
+
+    def __init__(self, client, hold_ttl: int = SEAT_HOLD_TTL):
+        self.client = client
+        self.hold_ttl = hold_ttl
+
+    def seed_and_get(
+        self, flights: Iterable[Tuple[str, str, Dict[str, int], Dict[str, float]]]
+    ) -> List[Optional[Dict[str, int]]]:
+        """
+        Creates counters for flights seen for the first time (existing counters
+        are left alone), records the fares they are offered at and returns the
+        live seat counts, in one round trip. Each flight is given as
+        (departure_date, flight_number, initial_seats, prices).
+        """
+        flights = list(flights)
+        if not flights:
+            return []
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for departure_date, flight_number, seats, prices in flights:
+                key = seat_key(departure_date, flight_number)
+                for seat_class, count in seats.items():
+                    pipe.hsetnx(key, seat_class, count)
+                pipe.expire(key, SEAT_KEY_TTL)
+                pipe.hset(fare_key(departure_date, flight_number), mapping=prices)
+                pipe.expire(fare_key(departure_date, flight_number), SEAT_KEY_TTL)
+                pipe.hgetall(key)
+            replies = pipe.execute()
+        except redis.RedisError:
+            return [None] * len(flights)
+
+        live = []
+        position = 0
+        for _, _, seats, _ in flights:
+            position += len(seats) + 4
+            live.append({seat_class: int(count) for seat_class, count in replies[position - 1].items()})
+        return live
+
+    def get_many(self, departure_date: str, flight_numbers: List[str]) -> List[Optional[Dict[str, int]]]:
+        """
+        Returns the live seat counts of flights on a date in one round trip,
+        without seeding: None for flights that have no counters yet.
+        """
+        if not flight_numbers:
+            return []
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for flight_number in flight_numbers:
+                pipe.hgetall(seat_key(departure_date, flight_number))
+            replies = pipe.execute()
+        except redis.RedisError:
+            return [None] * len(flight_numbers)
+        return [{seat_class: int(count) for seat_class, count in seats.items()} or None for seats in replies]
+
+    def snapshot(self, departure_date: str) -> Dict[str, Dict[str, int]]:
+        """
+        Returns live seat counts for every tracked flight on a date, keyed by
+        flight number.
+        """
+        try:
+            keys = list(self.client.scan_iter(match=seat_key(departure_date, "*"), count=1000))
+            pipe = self.client.pipeline(transaction=False)
+            for key in keys:
+                pipe.hgetall(key)
+            replies = pipe.execute()
+        except redis.RedisError:
+            return {}
+        return {
+            key.rsplit(":", 1)[1]: {seat_class: int(count) for seat_class, count in seats.items()}
+            for key, seats in zip(keys, replies)
+        }
+
+    def fare(self, departure_date: str, flight_number: str, seat_class: str) -> Optional[float]:
+        """
+        Returns the fare a class of the flight was last offered at, or None
+        if the flight is not tracked.
+        """
+        price = self.client.hget(fare_key(departure_date, flight_number), seat_class)
+        return None if price is None else float(price)
+
+    def _take(self, key: str, seat_class: str, quantity: int) -> Optional[bool]:
+        """
+        Atomically takes seats. None if the flight is not tracked, False if
+        there are not enough seats left.
+        """
+        # Plain EVAL: the script is short, and the stand-in drops the
+        # connection on the NoScriptError an EVALSHA fallback relies on.
+        taken = self.client.eval(TAKE_SEATS, 1, key, seat_class, quantity)
+        return None if taken < 0 else bool(taken)
+
+    def reserve(self, departure_date: str, flight_number: str, seat_class: str, quantity: int = 1) -> Optional[float]:
+        """
+        Takes seats immediately, without a hold. Returns the fare per seat, or
+        None when there are not enough seats. Raises KeyError for flights the
+        inventory does not track, so they can never be sold unchecked.
+        """
+        price = self.fare(departure_date, flight_number, seat_class)
+        if price is None:
+            raise KeyError(seat_key(departure_date, flight_number))
+        taken = self._take(seat_key(departure_date, flight_number), seat_class, quantity)
+        if taken is None:
+            raise KeyError(seat_key(departure_date, flight_number))
+        return price if taken else None
+
+    def give_back(self, departure_date: str, flight_number: str, seat_class: str, quantity: int = 1):
+        """
+        Returns seats taken by ``reserve`` or a confirmed hold, e.g. when the
+        booking they were taken for could not be saved.
+        """
+        self.client.hincrby(seat_key(departure_date, flight_number), seat_class, quantity)
+
+    def hold(self, departure_date: str, flight_number: str, seat_class: str, quantity: int) -> Optional[Dict]:
+        """
+        Takes seats for ``hold_ttl`` seconds at the current fare, which the
+        hold keeps until it is confirmed. Returns the hold, or None when there
+        are not enough seats. Raises KeyError for untracked flights.
+        """
+        self.release_expired()
+        key = seat_key(departure_date, flight_number)
+        price = self.fare(departure_date, flight_number, seat_class)
+        if price is None:
+            raise KeyError(key)
+        taken = self._take(key, seat_class, quantity)
+        if taken is None:
+            raise KeyError(key)
+        if not taken:
+            return None
+
+        hold_id = str(uuid.uuid4())
+        expires_at = time.time() + self.hold_ttl
+        hold = {
+            "holdId": hold_id,
+            "departureDate": departure_date,
+            "flightNumber": flight_number,
+            "seatClass": seat_class,
+            "quantity": quantity,
+            "price": price,
+            "expiresAt": expires_at,
+        }
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hset(hold_key(hold_id), mapping=hold)
+        # Keep the record past its expiry so the sweep can still return the seats.
+        pipe.expire(hold_key(hold_id), self.hold_ttl + SEAT_KEY_TTL)
+        pipe.zadd(HOLDS_KEY, {hold_id: expires_at})
+        pipe.execute()
+        return hold
+
+    def get_hold(self, hold_id: str) -> Optional[Dict]:
+        data = self.client.hgetall(hold_key(hold_id))
+        if not data:
+            return None
+        data["quantity"] = int(data["quantity"])
+        data["price"] = float(data["price"])
+        data["expiresAt"] = float(data["expiresAt"])
+        return data
+
+    def confirm(self, hold_id: str) -> Optional[Dict]:
+        """
+        Turns a live hold into a sale; its seats stay taken. Returns None if
+        the hold is unknown, expired, released or already confirmed.
+        """
+        expires_at = self.client.zscore(HOLDS_KEY, hold_id)
+        if expires_at is None or expires_at < time.time():
+            return None
+        hold = self.get_hold(hold_id)
+        if hold is None or not self.client.zrem(HOLDS_KEY, hold_id):
+            return None
+        self.client.delete(hold_key(hold_id))
+        return hold
+
+    def release(self, hold_id: str) -> bool:
+        """
+        Cancels a hold and puts its seats back on sale.
+        """
+        hold = self.get_hold(hold_id)
+        if hold is None or not self.client.zrem(HOLDS_KEY, hold_id):
+            return False
+        self.give_back(hold["departureDate"], hold["flightNumber"], hold["seatClass"], hold["quantity"])
+        self.client.delete(hold_key(hold_id))
+        return True
+
+    def release_expired(self) -> int:
+        """
+        Releases every hold past its expiry. Returns the number released.
+        """
+        expired = self.client.zrangebyscore(HOLDS_KEY, "-inf", time.time())
+        return sum(1 for hold_id in expired if self.release(hold_id))
+
+
+seat_inventory = SeatInventory(connect())
+
+
+if __name__ == "__main__":
+    # Stand-in seat store for local runs without Redis. It lives in its own
+    # process, so it keeps the seats while the services restart.
+    import fakeredis
+
+    server = fakeredis.TcpFakeServer(("127.0.0.1", SEAT_STANDIN_PORT))
+    server.daemon_threads = True
+    print(f"⚠️ Serving a fake Redis seat store on redis://127.0.0.1:{SEAT_STANDIN_PORT}/0")
+    server.serve_forever()
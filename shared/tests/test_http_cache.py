@@ -0,0 +1,51 @@
+import json
+
+from starlette.requests import Request
+
+from http_cache import conditional_json_response, etag_for, etag_matches
+
+
+def request_with(headers=None):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+    })
+
+
+def test_etag_depends_only_on_the_body():
+    assert etag_for(b"[1,2]") == etag_for(b"[1,2]")
+    assert etag_for(b"[1,2]") != etag_for(b"[2,1]")
+    assert etag_for(b"").startswith('"') and etag_for(b"").endswith('"')
+
+
+def test_if_none_match_uses_weak_comparison():
+    etag = etag_for(b"x")
+    assert etag_matches(etag, etag)
+    assert etag_matches(f"W/{etag}", etag)
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches("", etag)
+
+
+def test_conditional_response_answers_304_for_a_known_version():
+    content = [{"id": 1, "price": 9.5}]
+    first = conditional_json_response(request_with(), content, max_age=30, headers={"X-Next-Cursor": "20"})
+    assert first.status_code == 200
+    assert json.loads(first.body) == content
+    assert first.headers["cache-control"] == "public, max-age=30"
+    assert first.headers["x-next-cursor"] == "20"
+
+    etag = first.headers["etag"]
+    again = conditional_json_response(request_with({"If-None-Match": etag}), content, headers={"X-Next-Cursor": "20"})
+    assert again.status_code == 304
+    assert again.body == b""
+    assert again.headers["etag"] == etag
+    assert again.headers["x-next-cursor"] == "20"
+
+    changed = conditional_json_response(request_with({"If-None-Match": etag}), content + [{"id": 2}])
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
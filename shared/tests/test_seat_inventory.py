@@ -0,0 +1,120 @@
+import threading
+import time
+
+import fakeredis
+import pytest
+
+from seat_inventory import SeatInventory, seat_key
+
+
+DATE = "2030-05-17"
+SEATS = {'Economy': 3, 'Business': 2, 'First': 1}
+PRICES = {'Economy': 199.0, 'Business': 650.0, 'First': 1400.0}
+
+
+@pytest.fixture
+def seats():
+    inventory = SeatInventory(fakeredis.FakeRedis(decode_responses=True))
+    inventory.seed_and_get([(DATE, "DE100", SEATS, PRICES)])
+    return inventory
+
+
+def test_seeding_keeps_live_counts_and_updates_fares(seats):
+    assert seats.reserve(DATE, "DE100", 'Economy') == 199.0
+    live = seats.seed_and_get([(DATE, "DE100", SEATS, {**PRICES, 'Economy': 210.0}), (DATE, "UN200", SEATS, PRICES)])
+    assert live == [{**SEATS, 'Economy': 2}, SEATS]
+    assert seats.fare(DATE, "DE100", 'Economy') == 210.0
+    assert seats.get_many(DATE, ["DE100", "XX1"]) == [{**SEATS, 'Economy': 2}, None]
+    assert seats.snapshot(DATE) == {"DE100": {**SEATS, 'Economy': 2}, "UN200": SEATS}
+
+
+def test_reserve_never_oversells(seats):
+    assert seats.reserve(DATE, "DE100", 'Business', 2) == 650.0
+    assert seats.reserve(DATE, "DE100", 'Business') is None
+    assert seats.get_many(DATE, ["DE100"])[0]['Business'] == 0
+    seats.give_back(DATE, "DE100", 'Business')
+    assert seats.reserve(DATE, "DE100", 'Business') == 650.0
+
+
+def test_untracked_flights_cannot_be_sold(seats):
+    with pytest.raises(KeyError):
+        seats.reserve(DATE, "XX1", 'Economy')
+    with pytest.raises(KeyError):
+        seats.hold(DATE, "XX1", 'Economy', 1)
+
+
+def test_concurrent_reservations_sell_each_seat_once(seats):
+    sold = []
+
+    def buy():
+        if seats.reserve(DATE, "DE100", 'Economy') is not None:
+            sold.append(1)
+
+    threads = [threading.Thread(target=buy) for _ in range(30)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(sold) == SEATS['Economy']
+    assert seats.get_many(DATE, ["DE100"])[0]['Economy'] == 0
+
+
+def test_readers_never_see_negative_counts(seats):
+    lowest = []
+    done = threading.Event()
+
+    def watch():
+        while not done.is_set():
+            lowest.append(min(seats.get_many(DATE, ["DE100"])[0].values()))
+
+    watcher = threading.Thread(target=watch)
+    watcher.start()
+    buyers = [threading.Thread(target=seats.reserve, args=(DATE, "DE100", 'First')) for _ in range(20)]
+    for thread in buyers:
+        thread.start()
+    for thread in buyers:
+        thread.join()
+    done.set()
+    watcher.join()
+    assert min(lowest) == 0
+
+
+def test_hold_keeps_its_fare_until_confirmed(seats):
+    hold = seats.hold(DATE, "DE100", 'First', 1)
+    assert hold['price'] == 1400.0
+    assert seats.hold(DATE, "DE100", 'First', 1) is None
+    seats.seed_and_get([(DATE, "DE100", SEATS, {**PRICES, 'First': 2000.0})])
+
+    confirmed = seats.confirm(hold['holdId'])
+    assert confirmed['price'] == 1400.0
+    assert seats.confirm(hold['holdId']) is None
+    assert not seats.release(hold['holdId'])
+    assert seats.get_many(DATE, ["DE100"])[0]['First'] == 0
+
+
+def test_released_holds_go_back_on_sale(seats):
+    hold = seats.hold(DATE, "DE100", 'Economy', 2)
+    assert seats.get_many(DATE, ["DE100"])[0]['Economy'] == 1
+    assert seats.release(hold['holdId'])
+    assert not seats.release(hold['holdId'])
+    assert seats.confirm(hold['holdId']) is None
+    assert seats.get_many(DATE, ["DE100"])[0]['Economy'] == 3
+
+
+def test_expired_holds_are_swept(seats):
+    seats.hold_ttl = 0
+    hold = seats.hold(DATE, "DE100", 'Economy', 3)
+    time.sleep(0.01)
+    assert seats.confirm(hold['holdId']) is None
+    assert seats.release_expired() == 1
+    assert seats.get_many(DATE, ["DE100"])[0]['Economy'] == 3
+    assert seats.client.exists(seat_key(DATE, "DE100"))
+
+
+def test_search_reads_survive_redis_failures():
+    server = fakeredis.FakeServer()
+    seats = SeatInventory(fakeredis.FakeRedis(server=server, decode_responses=True))
+    server.connected = False
+    assert seats.seed_and_get([(DATE, "DE100", SEATS, PRICES)]) == [None]
+    assert seats.get_many(DATE, ["DE100"]) == [None]
+    assert seats.snapshot(DATE) == {}
@@ -35,6 +35,7 @@ class StopDetail(BaseModel):
     arrivalTime: datetime.datetime # Use datetime for internal handling
     departureTime: datetime.datetime # Use datetime for internal handling
     layoverDuration: str # String format like "1h 30m"
+    layoverMinutes: int = 0 # Same layover in minutes, for sorting and filtering
 
 class Flight(BaseModel):
     """
@@ -47,6 +48,7 @@ class Flight(BaseModel):
     departureTime: datetime.datetime # Use datetime for internal handling
     arrivalTime: datetime.datetime # Use datetime for internal handling
     duration: str # String format like "5h 45m"
+    durationMinutes: int = 0 # Same duration in minutes, for sorting and filtering
     numberOfStops: int
     stops: List[StopDetail]
     status: Literal['On Time', 'Delayed', 'Cancelled']
@@ -79,6 +81,8 @@ class Attraction(BaseModel):
     name: str
     type: AttractionType
     distance: float
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
 
 class Review(BaseModel):
     """
@@ -140,6 +144,8 @@ class Hotel(BaseModel):
     city: str
     state: str
     country: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     description: str
     postalCode: str
     phoneNumber: str